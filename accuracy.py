@@ -0,0 +1,46 @@
+import numpy as np
+from postprocess import postprocess
+
+MATCH_IOU = 0.5
+
+def output_deviation(reference, output):
+  reference = np.asarray(reference, dtype=np.float32)
+  diff = np.abs(reference - np.asarray(output, dtype=np.float32))
+  return {
+    'Max Abs Deviation': float(diff.max()),
+    'Mean Abs Deviation': float(diff.mean()),
+    'Relative Deviation': float(diff.mean() / max(float(np.abs(reference).mean()), 1e-12)),
+  }
+
+def _iou(box, boxes):
+  x1 = np.maximum(box[0], boxes[:, 0])
+  y1 = np.maximum(box[1], boxes[:, 1])
+  x2 = np.minimum(box[2], boxes[:, 2])
+  y2 = np.minimum(box[3], boxes[:, 3])
+  intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+  areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+  return intersection / np.maximum((box[2] - box[0]) * (box[3] - box[1]) + areas - intersection, 1e-12)
+
+def detection_agreement(reference, detections, iou_threshold=MATCH_IOU):
+  """Share of reference detections greedily matched by a detection of the same class, over all images"""
+  matched, total, count = 0, 0, 0
+  for expected, actual in zip(reference, detections):
+    total += len(expected)
+    count += len(actual)
+    used = np.zeros(len(actual), dtype=bool)
+    for row in expected:
+      candidates = (actual[:, 5] == row[5]) & ~used
+      if not candidates.any():
+        continue
+      ious = np.where(candidates, _iou(row, actual), 0)
+      best = int(np.argmax(ious))
+      if ious[best] >= iou_threshold:
+        used[best] = True
+        matched += 1
+  return {'Reference Detections': total, 'Detections': count, 'Detection Agreement': matched / total if total else None}
+
+def compare_outputs(reference, output):
+  """Raw output deviation and agreement of postprocessed detections, outputs are (B, 4 + classes, anchors)"""
+  result = output_deviation(reference, output)
+  result.update(detection_agreement(postprocess(np.asarray(reference, dtype=np.float32)), postprocess(np.asarray(output, dtype=np.float32))))
+  return result
@@ -0,0 +1,240 @@
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import platform
+from runtimes import detect_runtime, ort_session_options
+
+DEFAULT_CACHE_SIZE = 10 * 1024 * 1024 * 1024
+
+def cache_root():
+  return os.environ.get('TESTPERF_ARTIFACT_CACHE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'temp', 'artifact_cache'))
+
+_file_hashes = {}
+def file_hash(file_path):
+  stat = os.stat(file_path)
+  key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime)
+  if key not in _file_hashes:
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+      for chunk in iter(lambda: f.read(1024 * 1024), b''):
+        digest.update(chunk)
+    _file_hashes[key] = digest.hexdigest()
+  return _file_hashes[key]
+
+_hardware = None
+def hardware_fingerprint():
+  global _hardware
+  if _hardware is None:
+    parts = [platform.system(), platform.machine(), platform.processor(), str(os.cpu_count())]
+    try:
+      import reports
+      accelerators = reports.enumerate_accelerators()
+      parts.extend(sorted(str(item['name']) for item in accelerators['gpu'] + accelerators['npu']))
+    except Exception:
+      pass
+    _hardware = hashlib.sha256('|'.join(parts).encode()).hexdigest()[:16]
+  return _hardware
+
+def runtime_version(runtime):
+  module = {'ort': 'onnxruntime', 'ov': 'openvino', 'torch': 'torch'}.get(runtime)
+  module = sys.modules.get(module) if module else None
+  if module is None:
+    return 'unknown'
+  version = getattr(module, '__version__', None)
+  if version is None and hasattr(module, 'get_version'):
+    version = module.get_version()
+  return str(version)
+
+def model_precision(model):
+  text = (str(getattr(model, 'model_path', '')) + ' ' + str(getattr(model, 'model_description', ''))).lower()
+  for precision in ('int8', 'bf16', 'fp16'):
+    if precision in text:
+      return precision
+  return 'fp32'
+
+def artifact_variant(model):
+  """Variant of the cached artifacts resolve() uses for the model, None when nothing is cached per model file"""
+  runtime = detect_runtime(model)
+  if runtime == 'ov':
+    return ''
+  if runtime != 'ort':
+    return None
+  providers = model.sess_data.get('providers', [])
+  if not providers or providers[0] == 'CPUExecutionProvider':
+    return 'optimized'
+  return f'epctx_{providers[0]}'
+
+def _dir_size(path):
+  size = 0
+  for root, _, files in os.walk(path):
+    for name in files:
+      try:
+        size += os.path.getsize(os.path.join(root, name))
+      except OSError:
+        pass
+  return size
+
+class ArtifactCache:
+  def __init__(self, root=None, max_size=DEFAULT_CACHE_SIZE):
+    self.root = root or cache_root()
+    self.max_size = max_size
+    self.manifest_path = os.path.join(self.root, 'manifest.json')
+    self.events = []
+    self.entries = {}
+    self.ort_optimization_level = None
+    os.makedirs(self.root, exist_ok=True)
+    self.manifest = self._load()
+
+  def _load(self):
+    try:
+      with open(self.manifest_path, 'r') as f:
+        return json.load(f)
+    except Exception:
+      return {}
+
+  def _save(self):
+    # Atomic replace, a half-written manifest is never visible to other runs
+    temp_path = f'{self.manifest_path}.{os.getpid()}.tmp'
+    with open(temp_path, 'w') as f:
+      json.dump(self.manifest, f, indent=1)
+    os.replace(temp_path, self.manifest_path)
+
+  def entry(self, source_path, runtime, precision, variant=''):
+    """Returns (key, directory, hit) for artifacts compiled from source_path, registers a new entry on miss"""
+    # Reads are measured, so only the first lookup of a run touches hashes and the manifest
+    memo_key = (os.path.abspath(source_path), runtime, precision, variant)
+    if memo_key in self.entries:
+      key, directory = self.entries[memo_key]
+      return key, directory, any(True for _ in os.scandir(directory))
+
+    description = {
+      'source': os.path.abspath(source_path),
+      'model_hash': file_hash(source_path),
+      'runtime': runtime,
+      'runtime_version': runtime_version(runtime),
+      'precision': precision,
+      'hardware': hardware_fingerprint(),
+      'variant': variant,
+    }
+    key = hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()[:24]
+    directory = os.path.join(self.root, key)
+
+    # Entries of the same source, runtime and hardware with another model hash or runtime version are stale
+    for stale_key, stale in list(self.manifest.items()):
+      if stale_key != key and all(stale.get(item) == description[item] for item in ('source', 'runtime', 'precision', 'variant', 'hardware')):
+        self._remove(stale_key)
+
+    hit = key in self.manifest and os.path.isdir(directory) and any(True for _ in os.scandir(directory))
+    if not hit:
+      os.makedirs(directory, exist_ok=True)
+      self.manifest[key] = dict(description, created=time.time(), size=0)
+    self.manifest[key]['last_used'] = time.time()
+    self._save()
+    self.entries[memo_key] = (key, directory)
+    self.events.append({'key': key, 'source': os.path.basename(source_path), 'runtime': runtime, 'precision': precision, 'variant': variant, 'status': 'hit' if hit else 'miss'})
+    print(f'{{ "Artifact Cache": "{"hit" if hit else "miss"}", "Key": "{key}", "Source": "{os.path.basename(source_path)}" }},')
+    return key, directory, hit
+
+  def _remove(self, key):
+    shutil.rmtree(os.path.join(self.root, key), ignore_errors=True)
+    self.manifest.pop(key, None)
+
+  def resolve(self, model, file_path):
+    """Configures the runtime of the model to use cached artifacts, returns the file path to be loaded"""
+    runtime = detect_runtime(model)
+    precision = model_precision(model)
+    variant = artifact_variant(model)
+    if runtime == 'ov':
+      _, directory, _ = self.entry(file_path, runtime, precision, variant)
+      model.core.set_property({'CACHE_DIR': directory})
+      return file_path
+    if runtime != 'ort':
+      return file_path
+
+    import onnxruntime as ort
+    options = ort_session_options(model)
+    if self.ort_optimization_level is None:
+      self.ort_optimization_level = options.graph_optimization_level
+    if variant == 'optimized':
+      # Serialized optimized graph, loaded without repeating optimizations
+      _, directory, hit = self.entry(file_path, runtime, precision, variant)
+      cached_path = os.path.join(directory, 'optimized.onnx')
+      if hit and os.path.exists(cached_path):
+        options.optimized_model_filepath = ''
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+        return cached_path
+      options.optimized_model_filepath = cached_path
+      options.graph_optimization_level = self.ort_optimization_level
+      return file_path
+
+    # Execution providers compiling the graph dump their compiled blobs as EP context model
+    _, directory, hit = self.entry(file_path, runtime, precision, variant)
+    cached_path = os.path.join(directory, 'model_ctx.onnx')
+    if hit and os.path.exists(cached_path):
+      options.add_session_config_entry('ep.context_enable', '0')
+      return cached_path
+    options.add_session_config_entry('ep.context_enable', '1')
+    options.add_session_config_entry('ep.context_file_path', cached_path)
+    return file_path
+
+  def attach(self, model):
+    model.artifact_cache = self
+    # Fingerprint enumerates accelerators, keep it out of the measured reads
+    hardware_fingerprint()
+    prepare_batch = model.prepare_batch
+
+    def cached_prepare_batch(batch_size):
+      prepare_batch(batch_size)
+      # Model hash and manifest update of the entry happen here, the measured 1st read only finds the memoized entry
+      file_path = model.get_model_file_path(batch_size)
+      variant = artifact_variant(model)
+      if variant is not None and model.read_path_override is None and os.path.exists(file_path):
+        self.entry(file_path, detect_runtime(model), model_precision(model), variant)
+
+    model.prepare_batch = cached_prepare_batch
+    if detect_runtime(model) == 'torch' and os.path.exists(getattr(model, 'model_path', '')):
+      _, directory, _ = self.entry(model.model_path, 'torch', model_precision(model), 'inductor')
+      os.environ['TORCHINDUCTOR_CACHE_DIR'] = directory
+      os.environ['TORCHINDUCTOR_FX_GRAPH_CACHE'] = '1'
+
+  def finalize(self):
+    """Updates entry sizes and evicts least recently used entries above the size limit"""
+    for key in list(self.manifest.keys()):
+      directory = os.path.join(self.root, key)
+      if not os.path.isdir(directory):
+        self.manifest.pop(key)
+        continue
+      self.manifest[key]['size'] = _dir_size(directory)
+    total = sum(item['size'] for item in self.manifest.values())
+    evicted = []
+    for key, item in sorted(self.manifest.items(), key=lambda x: x[1].get('last_used', 0)):
+      if total <= self.max_size:
+        break
+      total -= item['size']
+      evicted.append(key)
+      self._remove(key)
+    self._save()
+    return total, evicted
+
+  def report_rows(self, cold_read_time, warm_read_time):
+    total, evicted = self.finalize()
+    rows = [['Artifact cache', self.root]]
+    rows.append(['Cold Read (s)', cold_read_time])
+    rows.append(['Warm Read (s)', warm_read_time])
+    rows.append(['Cache Size (bytes)', total])
+    rows.append(['Cache Limit (bytes)', self.max_size])
+    rows.append(['Evicted Entries', len(evicted)])
+    rows.append([])
+    rows.append(['Key', 'Source', 'Runtime', 'Runtime Version', 'Precision', 'Variant', 'Status', 'Size (bytes)'])
+    for event in self.events:
+      entry = self.manifest.get(event['key'], {})
+      rows.append([event['key'], event['source'], event['runtime'], entry.get('runtime_version'), event['precision'], event['variant'], event['status'], entry.get('size')])
+    return rows
+
+def attach(model, max_size=DEFAULT_CACHE_SIZE):
+  cache = ArtifactCache(max_size=max_size)
+  cache.attach(model)
+  return cache
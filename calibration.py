@@ -0,0 +1,54 @@
+import time
+from time import perf_counter
+from class_model import Model
+from reports import summary_statistics
+
+CALIBRATION_RUNS = 10000
+
+def timer_resolution(samples=CALIBRATION_RUNS):
+  """Declared perf_counter resolution and the smallest/median observed tick"""
+  ticks = []
+  for _ in range(samples):
+    start = perf_counter()
+    end = perf_counter()
+    while end == start:
+      end = perf_counter()
+    ticks.append(end - start)
+  ticks.sort()
+  return time.get_clock_info('perf_counter').resolution, ticks[0], ticks[len(ticks) // 2]
+
+def harness_overhead(checkpoint, get_times, runs=CALIBRATION_RUNS):
+  """Runs the harness inference loop with an empty model, returns per-iteration times"""
+  model = Model()
+  model.total_inference_runs = runs
+  model.reset_inference_run()
+  checkpoint()
+  while model.next_inference_run():
+    model.inference()
+    checkpoint(False)
+  times = get_times()
+  return [times[idx] - times[idx - 1] for idx in range(1, len(times))]
+
+def calibrate(checkpoint, get_times, runs=CALIBRATION_RUNS):
+  resolution, min_tick, median_tick = timer_resolution(runs)
+  overhead = summary_statistics(harness_overhead(checkpoint, get_times, runs))
+  return {
+    'Timer Resolution (declared)': resolution,
+    'Timer Tick (minimum)': min_tick,
+    'Timer Tick (median)': median_tick,
+    'Harness Overhead (average)': overhead['Average'],
+    'Harness Overhead (median)': overhead['Median'],
+    'Harness Overhead (99th percentile)': overhead['99th Percentile'],
+    'Harness Overhead (minimum)': overhead['Minimum'],
+    'Calibration Runs': runs,
+  }
+
+def subtract_overhead(samples, overhead):
+  return [max(item - overhead, 0.0) for item in samples]
+
+def calibration_rows(calibration, subtracted):
+  rows = [['Harness calibration', 'Value']]
+  for key, value in calibration.items():
+    rows.append([key, value])
+  rows.append(['Overhead Subtracted', 'Yes' if subtracted else 'No'])
+  return rows
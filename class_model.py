@@ -1,4 +1,5 @@
 import os
+from time import perf_counter
 
 class Model:
   def __init__(self):
@@ -6,15 +7,32 @@ class Model:
     self.total_inference_runs = 100
     self.current_inference_run = 0
     self.model_description = 'No Description'
+    # One exported model and one session serving every batch size
+    self.supports_dynamic_batch = False
+    self.dynamic_batch = False
+    # Compiled artifacts cache, see artifact_cache.py
+    self.artifact_cache = None
+    # Explicit model file to be read instead of the batch model file
+    self.read_path_override = None
+    # Rotating pool of input samples fed before every inference run, see dataset.py
+    self.input_dataset = None
+    # Time spent feeding inputs since reset_inference_run()
+    self.input_feed_time = 0.0
     pass
   def prepare_batch(self, batch_size):
     pass
   def reset_inference_run(self):
     self.current_inference_run = 0
+    self.input_feed_time = 0.0
   def next_inference_run(self):
     if self.current_inference_run >= self.total_inference_runs:
       return False
     self.current_inference_run += 1
+    if self.input_dataset is not None:
+      start = perf_counter()
+      self.input_dataset.feed(self)
+      # Feeding is not a part of inference, harness loops exclude it from measured samples
+      self.input_feed_time += perf_counter() - start
     return True
   def read(self):
     pass
@@ -37,5 +55,14 @@ class Model:
     pass
   def get_file_path(self, file_name):
     return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'temp', file_name)
+  def get_model_file_path(self, batch_size):
+    return self.get_file_path(self.model_path.format(batch='dyn' if self.dynamic_batch else batch_size))
+  def get_model_read_path(self, batch_size):
+    if self.read_path_override is not None:
+      return self.read_path_override
+    file_path = self.get_model_file_path(batch_size)
+    if self.artifact_cache is not None:
+      return self.artifact_cache.resolve(self, file_path)
+    return file_path
   def __str__(self):
     return self.model_description
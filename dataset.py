@@ -0,0 +1,90 @@
+import os
+import numpy as np
+import preprocess
+from runtimes import set_input
+
+DEFAULT_POOL_SIZE = 32
+DEFAULT_SHAPE = (3, 640, 640)
+
+def dataset_path(count, shape=DEFAULT_SHAPE):
+  return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'temp', 'dataset', f'inputs_{count}x{"x".join(str(item) for item in shape)}_float32.npy')
+
+def create(count=DEFAULT_POOL_SIZE, path=None, shape=DEFAULT_SHAPE):
+  """Writes count preprocessed corpus frames as one (count, C, H, W) float32 .npy file, without cv2 or PIL
+  the synthesized frames are letterboxed directly, skipping JPEG/PNG encoding"""
+  channels, height, width = shape
+  if channels != 3 or height != width:
+    raise Exception(f'Dataset pool holds letterboxed RGB frames, input sample shape {tuple(shape)} is not supported')
+  path = path or dataset_path(count, shape)
+  os.makedirs(os.path.dirname(path), exist_ok=True)
+  temp_path = f'{path}.{os.getpid()}.tmp'
+  pool = np.lib.format.open_memmap(temp_path, mode='w+', dtype=np.float32, shape=(count, *shape))
+  try:
+    if preprocess.image_codec() is None:
+      frames = (preprocess.letterbox(preprocess.synthesize(idx), height) for idx in range(count))
+    else:
+      frames = (preprocess.load_frame(frame_path, height) for frame_path in preprocess.generate_corpus(count))
+    for idx, frame in enumerate(frames):
+      preprocess.to_tensor([frame], out=pool[idx:idx + 1])
+    pool.flush()
+  except Exception:
+    del pool
+    os.remove(temp_path)
+    raise
+  del pool
+  # Other backends may read the pool while it is being created, only complete file becomes visible
+  os.replace(temp_path, path)
+  return path
+
+def open_pool(count=DEFAULT_POOL_SIZE, shape=DEFAULT_SHAPE):
+  shape = tuple(shape)
+  path = dataset_path(count, shape)
+  if not os.path.exists(path):
+    create(count, path, shape)
+  # Copy-on-write mapping: pages are shared with the page cache and views stay writable for torch.from_numpy
+  return np.load(path, mmap_mode='c')
+
+def sample_shape(model):
+  """Shape of one sample of the input prepare() created"""
+  current = model.input_data
+  if isinstance(current, dict):
+    current = next(iter(current.values()))
+  return tuple(current.shape[1:])
+
+class Rotation:
+  """Hands out consecutive batches of the memory-mapped pool, slices never wrap so every batch is a view"""
+  def __init__(self, pool=None, count=DEFAULT_POOL_SIZE):
+    self.pool = pool
+    self.count = count
+    self.position = 0
+  def next(self, batch_size):
+    if batch_size > len(self.pool):
+      indices = np.arange(self.position, self.position + batch_size) % len(self.pool)
+      self.position = (self.position + batch_size) % len(self.pool)
+      return self.pool[indices]
+    if self.position + batch_size > len(self.pool):
+      self.position = 0
+    batch = self.pool[self.position:self.position + batch_size]
+    self.position += batch_size
+    return batch
+  def open(self, model):
+    """Opens or creates the pool for the input prepare() created, harness calls it before the measured loop"""
+    # Input shape is known once prepare() ran, e.g. synthetic models have other resolutions
+    shape = sample_shape(model)
+    if self.pool is None or tuple(self.pool.shape[1:]) != shape:
+      self.pool = open_pool(self.count, shape)
+      self.position = 0
+  def feed(self, model):
+    if self.pool is None:
+      self.open(model)
+    set_input(model, self.next(model.batch_size))
+
+def attach(model, count=DEFAULT_POOL_SIZE):
+  model.input_dataset = Rotation(count=count)
+  return model.input_dataset
+
+def calibration_batches(batch_size, count=DEFAULT_POOL_SIZE, shape=DEFAULT_SHAPE, offset=0):
+  """Batches covering count samples from offset once (at least one batch), calibration data for post-training
+  quantization. Corpus frames are generated by index, so slices with different offsets never share frames"""
+  rotation = Rotation(open_pool(offset + count, shape)[offset:])
+  return [np.ascontiguousarray(rotation.next(batch_size)) for _ in range(max(1, count // batch_size))]
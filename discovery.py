@@ -0,0 +1,229 @@
+import os
+import sys
+import ast
+import json
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+
+script_folder = os.path.dirname(os.path.abspath(__file__))
+
+# Runtime and tool modules a backend may import, probed once per interpreter and installation
+RUNTIMES = {
+  'onnxruntime': 'import onnxruntime as ort; info = {"version": ort.__version__, "providers": ort.get_available_providers()}',
+  'openvino': 'import openvino as ov; info = {"version": ov.get_version(), "devices": ov.Core().available_devices}',
+  'torch': 'import torch; info = {"version": torch.__version__, "cuda": torch.cuda.is_available()}',
+  'migraphx': 'import migraphx; info = {"version": getattr(migraphx, "__version__", "unknown")}',
+  'ultralytics': 'import ultralytics; info = {"version": ultralytics.__version__}',
+  'onnx': 'import onnx; info = {"version": onnx.__version__}',
+}
+# Shared repo modules branch on the runtime of the backend, runtimes they import are required only by that runtime's backends
+DISPATCHED = {'onnxruntime', 'openvino', 'torch', 'migraphx'}
+PROBE_TIMEOUT = 120
+
+def cache_path():
+  return os.path.join(script_folder, 'temp', 'discovery_cache.json')
+
+def _literal(node):
+  try:
+    return ast.literal_eval(node)
+  except Exception:
+    return None
+
+def _parse(path):
+  with open(path, 'r', encoding='utf-8') as f:
+    return ast.parse(f.read(), path)
+
+_modules = {}
+def _module(path):
+  """(definitions, units, statements) of a module, parsed and walked once per process: units hold the names and
+  import nodes of every top-level statement, definitions map defined names and statements list the rest by index"""
+  if path not in _modules:
+    definitions, units, statements = {}, [], []
+    for node in _parse(path).body:
+      walked = list(ast.walk(node))
+      units.append((set(item.id for item in walked if isinstance(item, ast.Name)), [item for item in walked if isinstance(item, (ast.Import, ast.ImportFrom))]))
+      targets = [target.id for target in node.targets if isinstance(target, ast.Name)] if isinstance(node, ast.Assign) else []
+      if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        definitions[node.name] = len(units) - 1
+      elif targets:
+        definitions.update((target, len(units) - 1) for target in targets)
+      else:
+        statements.append(len(units) - 1)
+    _modules[path] = (definitions, units, statements)
+  return _modules[path]
+
+def _repo_module(name):
+  path = os.path.join(script_folder, f'{name}.py')
+  return path if os.path.isfile(path) else None
+
+def _relative_module(path, level, name):
+  directory = os.path.dirname(path)
+  for _ in range(level - 1):
+    directory = os.path.dirname(directory)
+  module_path = os.path.join(directory, *name.split('.')) + '.py'
+  return module_path if os.path.isfile(module_path) else None
+
+def _collect(path, names, shared, imports, seen):
+  """Adds imports reachable from names of the module at path (every name when None) to imports, following relative
+  imports (code of the model family) and top-level repo modules (shared code) into the names they provide"""
+  definitions, units, statements = _module(path)
+  reached = [] if (path, None) in seen else list(statements)
+  seen.add((path, None))
+  pending = list(definitions) if names is None else [name for name in names if name in definitions]
+  # Definitions reach each other by name, module-level statements run on import
+  while pending:
+    name = pending.pop()
+    if (path, name) in seen:
+      continue
+    seen.add((path, name))
+    reached.append(definitions[name])
+    pending += [item for item in units[definitions[name]][0] if item in definitions]
+  referenced = set(item for index in reached for item in units[index][0])
+  nodes = [node for index in reached for node in units[index][1]]
+  for node in nodes:
+    if isinstance(node, ast.Import):
+      for alias in node.names:
+        module = alias.name.split('.')[0]
+        if not (shared and module in DISPATCHED):
+          imports.add(module)
+        if _repo_module(module):
+          _collect(_repo_module(module), None if (alias.asname or module) in referenced else [], True, imports, seen)
+    elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+      module = node.module.split('.')[0]
+      if not (shared and module in DISPATCHED):
+        imports.add(module)
+      if _repo_module(node.module):
+        _collect(_repo_module(node.module), [alias.name for alias in node.names if (alias.asname or alias.name) in referenced], True, imports, seen)
+    elif isinstance(node, ast.ImportFrom) and node.level > 0:
+      # from .common import name, or from . import common
+      if node.module:
+        modules = [(_relative_module(path, node.level, node.module), [alias.name for alias in node.names])]
+      else:
+        modules = [(_relative_module(path, node.level, alias.name), None) for alias in node.names]
+      for module_path, module_names in modules:
+        if module_path:
+          _collect(module_path, module_names, shared, imports, seen)
+
+def scan_backend(path):
+  """Requirements of a backend module read from its source and the sources it imports, nothing is imported"""
+  tree = _parse(path)
+  info = {'imports': [], 'providers': [], 'cuda': False, 'description': None, 'dynamic_batch': False, 'kind': 'script'}
+  imports = set()
+  _collect(path, None, False, imports, set())
+  for node in ast.walk(tree):
+    if isinstance(node, ast.ClassDef) and node.name == 'Model':
+      info['kind'] = 'backend'
+    elif isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Attribute):
+      name, value = node.targets[0].attr, _literal(node.value)
+      if name == 'sess_data' and isinstance(value, dict):
+        info['providers'] = list(value.get('providers', []))
+      elif name == 'device' and value == 'cuda':
+        info['cuda'] = True
+      elif name == 'model_description' and isinstance(value, str):
+        info['description'] = value
+      elif name == 'supports_dynamic_batch' and value is True:
+        info['dynamic_batch'] = True
+  info['imports'] = sorted(item for item in imports if item in RUNTIMES)
+  return info
+
+def scan(root=None):
+  """{'models.<family>.<backend>': info} for every module of the models tree"""
+  root = root or os.path.join(script_folder, 'models')
+  backends = {}
+  for family in sorted(os.listdir(root)):
+    directory = os.path.join(root, family)
+    if not os.path.isdir(directory) or family.startswith('_'):
+      continue
+    for name in sorted(os.listdir(directory)):
+      if name.endswith('.py') and name != 'common.py' and not name.startswith('_'):
+        backends[f'models.{family}.{name[:-3]}'] = scan_backend(os.path.join(directory, name))
+  return backends
+
+def _fingerprint(runtime):
+  # Module location and its modification time change with every install or upgrade, finding them imports nothing
+  spec = importlib.util.find_spec(runtime)
+  if spec is None:
+    return None
+  location = spec.origin or (list(spec.submodule_search_locations or []) + [''])[0]
+  try:
+    return f'{sys.executable}|{location}|{os.path.getmtime(location)}'
+  except OSError:
+    return f'{sys.executable}|{location}'
+
+def _probe(runtime):
+  import subprocess
+  code = RUNTIMES[runtime] + '; import json; print(json.dumps(info))'
+  try:
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, timeout=PROBE_TIMEOUT)
+    if result.returncode == 0:
+      return dict(json.loads(result.stdout.strip().splitlines()[-1]), available=True)
+    error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else f'exit code {result.returncode}'
+  except Exception as e:
+    error = str(e)
+  return {'available': False, 'error': error}
+
+def probe_runtimes(runtimes, refresh=False):
+  """Availability of runtimes, each probed in a subprocess once and cached until its installation changes"""
+  try:
+    with open(cache_path(), 'r') as f:
+      cache = json.load(f)
+  except Exception:
+    cache = {}
+  results, missing = {}, []
+  for runtime in runtimes:
+    fingerprint = _fingerprint(runtime)
+    if fingerprint is None:
+      results[runtime] = {'available': False, 'error': 'not installed'}
+    elif not refresh and cache.get(runtime, {}).get('fingerprint') == fingerprint:
+      results[runtime] = cache[runtime]['info']
+    else:
+      missing.append((runtime, fingerprint))
+  if missing:
+    with ThreadPoolExecutor(max_workers=len(missing)) as pool:
+      for (runtime, fingerprint), info in zip(missing, pool.map(lambda item: _probe(item[0]), missing)):
+        results[runtime] = info
+        cache[runtime] = {'fingerprint': fingerprint, 'info': info}
+    os.makedirs(os.path.dirname(cache_path()), exist_ok=True)
+    temp_path = f'{cache_path()}.{os.getpid()}.tmp'
+    with open(temp_path, 'w') as f:
+      json.dump(cache, f, indent=1)
+    os.replace(temp_path, cache_path())
+  return results
+
+def status(info, runtimes):
+  if info['kind'] != 'backend':
+    return 'script'
+  for runtime in info['imports']:
+    if not runtimes[runtime]['available']:
+      return f'missing {runtime}'
+  providers = runtimes.get('onnxruntime', {}).get('providers', [])
+  for provider in info['providers']:
+    if provider not in providers:
+      return f'missing {provider}'
+  if info['cuda'] and not runtimes.get('torch', {}).get('cuda'):
+    return 'missing CUDA'
+  return 'ready'
+
+def capability_matrix(refresh=False):
+  backends = scan()
+  runtimes = probe_runtimes(sorted(set(runtime for info in backends.values() for runtime in info['imports'])), refresh)
+  return backends, runtimes, {name: status(info, runtimes) for name, info in backends.items()}
+
+def print_list(refresh=False):
+  backends, runtimes, statuses = capability_matrix(refresh)
+  print('Runtimes:')
+  for runtime, info in runtimes.items():
+    details = ', '.join(f'{key}: {value}' for key, value in info.items() if key not in ('available', 'version'))
+    print(f'  {runtime:<12} {info.get("version", "-") if info["available"] else "-":<24} {details}')
+  print()
+  width = max(len(name) for name in backends) + 2
+  requires = {name: ', '.join(info['imports'] + (['cuda'] if info['cuda'] else [])) or '-' for name, info in backends.items()}
+  requires_width = max(len(item) for item in requires.values()) + 2
+  print(f'{"Backend":<{width}}{"Runtimes":<{requires_width}}{"Providers":<30}{"Dynamic":<9}Status')
+  for name, info in backends.items():
+    print(f'{name:<{width}}{requires[name]:<{requires_width}}{", ".join(info["providers"]) or "-":<30}{"yes" if info["dynamic_batch"] else "no":<9}{statuses[name]}')
+  ready = sum(1 for item in statuses.values() if item == 'ready')
+  print(f'\n{ready} of {sum(1 for info in backends.values() if info["kind"] == "backend")} backends are ready')
+
+if __name__ == '__main__':
+  print_list('--refresh' in sys.argv)
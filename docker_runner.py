@@ -53,6 +53,9 @@ Container Selection:
                              Supports negative indexing (e.g., -1 for last config)
 
 Container Management:
+  --export-cache <dir>       Mount a host export cache directory read-only into containers,
+                             exported models are looked up there instead of exporting again
+  --export-cache-writable    Mount the export cache writable (e.g. with --only-prepare to fill it)
   --dont-remove              Keep Docker containers after execution (don't use --rm)
   --shell                    Open an interactive shell in the container
                              (must be used with --single)
@@ -91,6 +94,8 @@ Configuration File:
     - only_prepare: (Optional) Only prepare the batch will be run, no inference will be run
     - docker_custom_run: (Optional) Custom docker run command
     - docker_hostname: (Optional) Hostname to set in container
+    - export_cache: (Optional) Host export cache directory mounted read-only, same as --export-cache
+    - suite: (Optional) Suite file run by suite_runner.py in one container instead of one container per test
     - tests: List of test cases to run
 
   Example 'docker_runner.json':
@@ -203,6 +208,13 @@ print("\nStarting docker operations...\n")
 # Get current script's folder
 script_folder = os.path.dirname(os.path.abspath(__file__))
 
+export_cache = None
+if '--export-cache' in sys.argv:
+    try:
+        export_cache = os.path.abspath(sys.argv[sys.argv.index('--export-cache') + 1])
+    except IndexError as e:
+        print(f'Error: Invalid --export-cache argument {e}, export cache is not mounted')
+
 # Second pass: Build and run containers
 for i in range(start_index, end_index):
     config = docker_configs[i]
@@ -256,6 +268,14 @@ for i in range(start_index, end_index):
     # Add volume mount for current script's folder
     docker_cmd.extend(['-v', f'{script_folder}:/root/testperf'])
 
+    # Shared export cache, read-only so containers only consume models exported once for the fleet
+    config_export_cache = export_cache or config.get('export_cache')
+    if config_export_cache:
+        os.makedirs(config_export_cache, exist_ok=True)
+        mount_mode = 'rw' if '--export-cache-writable' in sys.argv else 'ro'
+        docker_cmd.extend(['-v', f'{os.path.abspath(config_export_cache)}:/root/export_cache:{mount_mode}'])
+        docker_cmd.extend(['-e', 'TESTPERF_EXPORT_CACHE=/root/export_cache'])
+
     # Remove container after run
     docker_cmd.append('--rm')
 
@@ -276,37 +296,52 @@ for i in range(start_index, end_index):
             result = subprocess.run(docker_cmd, cwd=script_folder)
         exit(0)
 
-    # Add the command to run inside container
-    docker_cmd.extend(['sh', '-c', 'pip3 install -r /root/testperf/requirements.txt && python3 /root/testperf/test_perf.py '])
-
-    if '--case' in sys.argv:
-        try:
-            tests = [sys.argv[sys.argv.index('--case') + 1]]
-            print(f"Running single test: {tests}")
-        except Exception as e:
-            continue
+    if config.get('suite') and not '--case' in sys.argv:
+        # Whole suite in one container and one interpreter, see suite_runner.py
+        suite_cmd = f'python3 /root/testperf/suite_runner.py {config["suite"]}'
+        # Batch sizes of the suite file apply unless given on the command line
+        if '--batch-size' in sys.argv:
+            suite_cmd += f' --batch-size {",".join(map(str, batches))}'
+        if only_prepare:
+            suite_cmd += ' --only-prepare'
+        docker_cmd.extend(['sh', '-c', f'pip3 install -r /root/testperf/requirements.txt && {suite_cmd}'])
+        print(f"Command: {' '.join(docker_cmd)}")
+        if not '--fake' in sys.argv:
+            result = subprocess.run(docker_cmd, cwd=script_folder)
+            if result.returncode != 0:
+                print(f"Error: Suite {config['suite']} failed with exit code {result.returncode}, to continue from this point, use --continue {i}, or --single {i}")
+    else:
+        # Add the command to run inside container
+        docker_cmd.extend(['sh', '-c', 'pip3 install -r /root/testperf/requirements.txt && python3 /root/testperf/test_perf.py '])
+
+        if '--case' in sys.argv:
+            try:
+                tests = [sys.argv[sys.argv.index('--case') + 1]]
+                print(f"Running single test: {tests}")
+            except Exception as e:
+                continue
 
-    # Run each test
-    for test in tests:
-        print(f"\n--- Running test: {test} ---")
+        # Run each test
+        for test in tests:
+            print(f"\n--- Running test: {test} ---")
         
-        # Build the full command with test name and batches
-        test_cmd = docker_cmd.copy()
-        # Append test name and batch-size to the python command
-        test_cmd[-1] = test_cmd[-1] + f'{test} --batch-size {",".join(map(str, batches))}'
-        if only_prepare:
-            test_cmd[-1] = test_cmd[-1] + ' --only-prepare'
+            # Build the full command with test name and batches
+            test_cmd = docker_cmd.copy()
+            # Append test name and batch-size to the python command
+            test_cmd[-1] = test_cmd[-1] + f'{test} --batch-size {",".join(map(str, batches))}'
+            if only_prepare:
+                test_cmd[-1] = test_cmd[-1] + ' --only-prepare'
 
-        print(f"Command: {' '.join(test_cmd)}")
-        print()
+            print(f"Command: {' '.join(test_cmd)}")
+            print()
 
-        if not '--fake' in sys.argv:
-            # Run the docker command
-            result = subprocess.run(test_cmd, cwd=script_folder)
+            if not '--fake' in sys.argv:
+                # Run the docker command
+                result = subprocess.run(test_cmd, cwd=script_folder)
             
-            if result.returncode != 0:
-                print(f"Error: Test {test} failed with exit code {result.returncode}, to continue from this point, use --continue {i} --case {test}, or --single {i} --case {test}")
-                continue
+                if result.returncode != 0:
+                    print(f"Error: Test {test} failed with exit code {result.returncode}, to continue from this point, use --continue {i} --case {test}, or --single {i} --case {test}")
+                    continue
 
     if dont_remove == False:
         print(f"Removing image {docker_image}...")
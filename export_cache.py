@@ -0,0 +1,143 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+from contextlib import contextmanager
+from artifact_cache import file_hash
+
+LOCK_TIMEOUT = 3600
+EXPORTER_PACKAGES = ['ultralytics', 'torch', 'onnx']
+
+def export_cache_root():
+  return os.environ.get('TESTPERF_EXPORT_CACHE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'temp', 'export_cache'))
+
+def writable(root):
+  try:
+    os.makedirs(root, exist_ok=True)
+  except OSError:
+    return False
+  return os.access(root, os.W_OK)
+
+def exporter_versions():
+  # Package metadata only, importing torch to get a version would cost seconds
+  from importlib import metadata
+  versions = {}
+  for package in EXPORTER_PACKAGES:
+    try:
+      versions[package] = metadata.version(package)
+    except metadata.PackageNotFoundError:
+      versions[package] = None
+  return versions
+
+def export_key(weights_path, parameters):
+  description = {'weights': file_hash(weights_path), 'parameters': parameters, 'exporter': exporter_versions()}
+  return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()[:32], description
+
+@contextmanager
+def file_lock(path, timeout=LOCK_TIMEOUT):
+  """Exclusive lock on path, held by one process of the host (or of every container sharing the directory)"""
+  with open(path, 'a+b') as f:
+    start = time.time()
+    while True:
+      try:
+        if os.name == 'nt':
+          import msvcrt
+          f.seek(0)
+          msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+          import fcntl
+          fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        break
+      except OSError:
+        if time.time() - start > timeout:
+          raise Exception(f'Timed out waiting for lock {path}')
+        time.sleep(0.5)
+    try:
+      yield
+    finally:
+      if os.name == 'nt':
+        import msvcrt
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+      else:
+        import fcntl
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+def place(source_path, target_path):
+  """Atomically makes target_path a complete copy of source_path, hard link when possible"""
+  target_directory = os.path.dirname(os.path.abspath(target_path))
+  os.makedirs(target_directory, exist_ok=True)
+  temp_path = os.path.join(target_directory, f'.{os.path.basename(target_path)}.{os.getpid()}.tmp')
+  try:
+    os.link(source_path, temp_path)
+  except OSError:
+    shutil.copyfile(source_path, temp_path)
+  os.replace(temp_path, target_path)
+
+def fetch_weights(weights_path, url):
+  """Weights come from the cache, downloaded otherwise and stored to the cache for other hosts"""
+  if os.path.exists(weights_path):
+    return weights_path
+  root = export_cache_root()
+  cached_path = os.path.join(root, 'weights', os.path.basename(weights_path))
+  if os.path.exists(cached_path):
+    place(cached_path, weights_path)
+    return weights_path
+  import urllib.request
+  temp_path = f'{weights_path}.{os.getpid()}.tmp'
+  try:
+    urllib.request.urlretrieve(url, temp_path)
+  except Exception as e:
+    raise Exception(f'Failed to download YOLO model {e}')
+  os.replace(temp_path, weights_path)
+  if writable(root):
+    place(weights_path, cached_path)
+  return weights_path
+
+def cached_export(file_path, weights_path, parameters, export):
+  """Places the model exported from weights_path with parameters at file_path, export runs once per key
+
+  export(weights_path, target_path) is called with a private copy of the weights, so exporters writing next
+  to the weights do not race. A read-only cache is only looked up, misses are exported locally.
+  """
+  root = export_cache_root()
+  key, description = export_key(weights_path, parameters)
+  cached_path = os.path.join(root, f'{key}.onnx')
+  if os.path.exists(cached_path):
+    print(f'{{ "Export Cache": "hit", "Key": "{key}" }},')
+    place(cached_path, file_path)
+    return file_path
+
+  if not writable(root):
+    print(f'{{ "Export Cache": "miss", "Key": "{key}", "Read Only": true }},')
+    _export_to(weights_path, file_path, export)
+    return file_path
+
+  with file_lock(os.path.join(root, f'{key}.lock')):
+    # Another process may have exported while we were waiting for the lock
+    if not os.path.exists(cached_path):
+      print(f'{{ "Export Cache": "miss", "Key": "{key}" }},')
+      _export_to(weights_path, cached_path, export)
+      with open(os.path.join(root, f'{key}.json.tmp'), 'w') as f:
+        json.dump(dict(description, file=os.path.basename(file_path), created=time.time()), f, indent=1)
+      os.replace(os.path.join(root, f'{key}.json.tmp'), os.path.join(root, f'{key}.json'))
+    else:
+      print(f'{{ "Export Cache": "hit", "Key": "{key}" }},')
+  place(cached_path, file_path)
+  return file_path
+
+def _export_to(weights_path, target_path, export):
+  directory = os.path.dirname(os.path.abspath(target_path))
+  os.makedirs(directory, exist_ok=True)
+  work_directory = tempfile.mkdtemp(prefix='.export_', dir=directory)
+  try:
+    private_weights = os.path.join(work_directory, os.path.basename(weights_path))
+    shutil.copyfile(weights_path, private_weights)
+    temp_path = os.path.join(work_directory, 'model.onnx')
+    export(private_weights, temp_path)
+    # Rename within one directory is atomic, a half-written model is never visible at target_path
+    os.replace(temp_path, target_path)
+  finally:
+    shutil.rmtree(work_directory, ignore_errors=True)
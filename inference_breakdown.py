@@ -0,0 +1,85 @@
+from time import perf_counter
+from runtimes import detect_runtime
+from reports import summary_statistics
+
+PHASES = ['Input Binding', 'Compute', 'Output Fetch']
+
+def ort_device(sess):
+  providers = sess.get_providers()
+  return 'cuda' if providers and providers[0] in ('CUDAExecutionProvider', 'TensorrtExecutionProvider') else 'cpu'
+
+def _breakdown_ort(model, runs):
+  import onnxruntime as ort
+  sess = model.sess
+  device = ort_device(sess)
+  outputs = [item.name for item in sess.get_outputs()]
+  times = {phase: [] for phase in PHASES}
+  for _ in range(runs):
+    start = perf_counter()
+    binding = sess.io_binding()
+    for name, array in model.input_data.items():
+      binding.bind_ortvalue_input(name, ort.OrtValue.ortvalue_from_numpy(array, device, 0))
+    for name in outputs:
+      binding.bind_output(name, device)
+    binding.synchronize_inputs()
+    bound = perf_counter()
+    sess.run_with_iobinding(binding)
+    binding.synchronize_outputs()
+    computed = perf_counter()
+    binding.copy_outputs_to_cpu()
+    fetched = perf_counter()
+    times['Input Binding'].append(bound - start)
+    times['Compute'].append(computed - bound)
+    times['Output Fetch'].append(fetched - computed)
+  return times
+
+def _breakdown_ov(model, runs):
+  import openvino as ov
+  request = model.compiled_model.create_infer_request()
+  outputs = len(model.compiled_model.outputs)
+  times = {phase: [] for phase in PHASES}
+  for _ in range(runs):
+    start = perf_counter()
+    # Same sharing as CompiledModel.__call__: inputs shared, outputs copied
+    for name, array in model.input_data.items():
+      request.set_tensor(name, ov.Tensor(array, shared_memory=True))
+    bound = perf_counter()
+    request.infer()
+    computed = perf_counter()
+    for idx in range(outputs):
+      request.get_output_tensor(idx).data.copy()
+    fetched = perf_counter()
+    times['Input Binding'].append(bound - start)
+    times['Compute'].append(computed - bound)
+    times['Output Fetch'].append(fetched - computed)
+  return times
+
+def measure(model, runs):
+  """Returns per-phase times of the instrumented path and times of the plain inference() call"""
+  runtime = detect_runtime(model)
+  if runtime == 'ort':
+    times = _breakdown_ort(model, runs)
+  elif runtime == 'ov':
+    times = _breakdown_ov(model, runs)
+  else:
+    raise Exception(f'Inference breakdown is not supported for runtime {runtime}')
+  times['Plain Run'] = []
+  for _ in range(runs):
+    start = perf_counter()
+    model.inference()
+    times['Plain Run'].append(perf_counter() - start)
+  return runtime, times
+
+def breakdown_rows(breakdowns):
+  """Builds "Breakdown" sheet rows from {batch: (runtime, times)}"""
+  sheet = [['Batch', 'Runtime', 'Phase', 'Average (s)', 'Median (s)', '99th Percentile (s)', 'Share of Plain Run']]
+  for batch, (runtime, times) in breakdowns.items():
+    stats = {phase: summary_statistics(values) for phase, values in times.items()}
+    plain = stats['Plain Run']['Median']
+    for phase in PHASES + ['Plain Run']:
+      sheet.append([batch, runtime, phase, stats[phase]['Average'], stats[phase]['Median'], stats[phase]['99th Percentile'], stats[phase]['Median'] / plain if plain else None])
+    # Everything which is not kernel execution is framework marshalling
+    marshalling = plain - stats['Compute']['Median']
+    sheet.append([batch, runtime, 'Marshalling (Plain Run - Compute)', None, marshalling, None, marshalling / plain if plain else None])
+    sheet.append([])
+  return sheet
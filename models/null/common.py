@@ -0,0 +1,10 @@
+import sys
+
+# Simulated inference time for sleep and spin backends, in seconds
+def null_time(default=0.001):
+  if '--null-time' in sys.argv:
+    try:
+      return float(sys.argv[sys.argv.index('--null-time') + 1])
+    except Exception as e:
+      print(f'{{ "Error": "Failed to set null time {e}, using default {default}" }},')
+  return default
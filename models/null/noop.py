@@ -0,0 +1,8 @@
+from class_model import Model
+
+class Model(Model):
+  def __init__(self):
+    super().__init__()
+    self.model_description = 'Null model, inference does nothing (harness overhead)'
+  def inference(self):
+    return None
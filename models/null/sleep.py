@@ -0,0 +1,11 @@
+from time import sleep
+from class_model import Model
+from .common import null_time
+
+class Model(Model):
+  def __init__(self):
+    super().__init__()
+    self.inference_time = null_time()
+    self.model_description = f'Null model, inference sleeps for {self.inference_time} s (scheduler wake-up latency)'
+  def inference(self):
+    sleep(self.inference_time)
@@ -0,0 +1,13 @@
+from time import perf_counter
+from class_model import Model
+from .common import null_time
+
+class Model(Model):
+  def __init__(self):
+    super().__init__()
+    self.inference_time = null_time()
+    self.model_description = f'Null model, inference busy-spins for {self.inference_time} s (timer and harness accuracy)'
+  def inference(self):
+    end = perf_counter() + self.inference_time
+    while perf_counter() < end:
+      pass
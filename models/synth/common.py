@@ -0,0 +1,192 @@
+import os
+import sys
+import numpy as np
+
+# Synthetic workloads built with onnx.helper, no download, ultralytics or torch needed
+ARCHITECTURES = ['yolo', 'cnn', 'mlp']
+DEFAULTS = {
+  'yolo': {'depth': 0.33, 'width': 0.25, 'resolution': 640},
+  'cnn': {'depth': 2, 'width': 0.5, 'resolution': 640},
+  'mlp': {'depth': 4, 'width': 1.0, 'resolution': 32},
+}
+OPSET = 17
+# Random backbone features are small, head weights are scaled up to spread class logits
+HEAD_GAIN = 15.0
+SEED = 0
+
+def _argument(name, default, cast):
+  if name in sys.argv:
+    try:
+      return cast(sys.argv[sys.argv.index(name) + 1])
+    except Exception as e:
+      print(f'{{ "Error": "Failed to set {name[2:]} {e}, using default {default}" }},')
+  return default
+
+def synth_parameters():
+  """Architecture and its depth, width and resolution from --synth-arch, --synth-depth, --synth-width, --synth-resolution"""
+  arch = _argument('--synth-arch', 'yolo', str)
+  if arch not in ARCHITECTURES:
+    print(f'{{ "Error": "Unknown synthetic architecture {arch}, using yolo" }},')
+    arch = 'yolo'
+  defaults = DEFAULTS[arch]
+  return {
+    'arch': arch,
+    'depth': _argument('--synth-depth', defaults['depth'], float),
+    'width': _argument('--synth-width', defaults['width'], float),
+    'resolution': _argument('--synth-resolution', defaults['resolution'], int),
+  }
+
+def synth_model_path(half_precision=False):
+  """Model file name template with every generator parameter, {batch} is left for Model.get_model_file_path"""
+  params = synth_parameters()
+  return f'synth_{params["arch"]}_d{params["depth"]:g}_w{params["width"]:g}_r{params["resolution"]}' + ('_fp16' if half_precision else '') + '_{batch}b.onnx'
+
+def input_shape(batch_size):
+  resolution = synth_parameters()['resolution']
+  return (batch_size, 3, resolution, resolution)
+
+class GraphBuilder:
+  """Collects nodes and deterministic initializers, names are generated from a counter"""
+  def __init__(self, seed=SEED, dtype=np.float32):
+    self.rng = np.random.default_rng(seed)
+    self.dtype = dtype
+    self.nodes = []
+    self.initializers = []
+    self.counter = 0
+
+  def name(self, prefix):
+    self.counter += 1
+    return f'{prefix}_{self.counter}'
+
+  def weight(self, shape, fan_in, gain=1.0):
+    from onnx import numpy_helper
+    name = self.name('w')
+    # He initialization keeps activations in range through deep stacks
+    value = self.rng.standard_normal(shape) * np.sqrt(2.0 / fan_in) * gain
+    self.initializers.append(numpy_helper.from_array(value.astype(self.dtype), name))
+    return name
+
+  def constant(self, value, dtype=np.int64):
+    from onnx import numpy_helper
+    name = self.name('c')
+    self.initializers.append(numpy_helper.from_array(np.asarray(value, dtype=dtype), name))
+    return name
+
+  def node(self, op_type, inputs, **attributes):
+    from onnx import helper
+    output = self.name(op_type.lower())
+    self.nodes.append(helper.make_node(op_type, inputs, [output], name=output, **attributes))
+    return output
+
+  def conv(self, x, c_in, c_out, kernel=1, stride=1, activation=True, bias=None, gain=1.0):
+    weight = self.weight((c_out, c_in, kernel, kernel), c_in * kernel * kernel, gain)
+    bias = self.constant(np.zeros(c_out) if bias is None else bias, self.dtype)
+    y = self.node('Conv', [x, weight, bias], kernel_shape=[kernel, kernel], strides=[stride, stride], pads=[kernel // 2] * 4)
+    # SiLU as in YOLO, expressed with opset 17 operators
+    return self.node('Mul', [y, self.node('Sigmoid', [y])]) if activation else y
+
+  def gemm(self, x, n_in, n_out):
+    weight = self.weight((n_in, n_out), n_in)
+    bias = self.constant(np.zeros(n_out), self.dtype)
+    return self.node('Gemm', [x, weight, bias])
+
+  def c2f(self, x, c_in, c_out, n, shortcut=True):
+    hidden = c_out // 2
+    y = self.conv(x, c_in, 2 * hidden)
+    a = self.node('Slice', [y, self.constant([0]), self.constant([hidden]), self.constant([1])])
+    b = self.node('Slice', [y, self.constant([hidden]), self.constant([2 * hidden]), self.constant([1])])
+    parts = [a, b]
+    for _ in range(n):
+      z = self.conv(self.conv(parts[-1], hidden, hidden, 3), hidden, hidden, 3)
+      parts.append(self.node('Add', [parts[-1], z]) if shortcut else z)
+    return self.conv(self.node('Concat', parts, axis=1), (2 + n) * hidden, c_out)
+
+  def sppf(self, x, c_in, c_out):
+    hidden = c_in // 2
+    y = [self.conv(x, c_in, hidden)]
+    for _ in range(3):
+      y.append(self.node('MaxPool', [y[-1]], kernel_shape=[5, 5], strides=[1, 1], pads=[2, 2, 2, 2]))
+    return self.conv(self.node('Concat', y, axis=1), 4 * hidden, c_out)
+
+def _yolo(builder, x, depth, width, resolution, classes=80):
+  """YOLOv8-like backbone (Conv/C2f/SPPF) with a detect head on strides 8, 16 and 32, output is (B, 4 + classes, anchors)"""
+  channels = [max(8, int(round(c * width / 8)) * 8) for c in [64, 128, 256, 512, 1024]]
+  repeats = [max(1, int(round(n * depth))) for n in [3, 6, 6, 3]]
+  x = builder.conv(x, 3, channels[0], 3, 2)
+  features = []
+  for stage in range(4):
+    x = builder.conv(x, channels[stage], channels[stage + 1], 3, 2)
+    x = builder.c2f(x, channels[stage + 1], channels[stage + 1], repeats[stage])
+    if stage == 3:
+      x = builder.sppf(x, channels[4], channels[4])
+    if stage >= 1:
+      features.append((x, channels[stage + 1]))
+  outputs = []
+  # Low class prior and spread logits as in trained detectors, only a few anchors pass the confidence threshold
+  bias = np.concatenate([np.zeros(4), np.full(classes, -4.0)])
+  for feature, c in features:
+    y = builder.conv(builder.conv(feature, c, c, 3), c, 4 + classes, 1, activation=False, bias=bias, gain=HEAD_GAIN)
+    outputs.append(builder.node('Reshape', [y, builder.constant([0, 4 + classes, -1])]))
+  y = builder.node('Sigmoid', [builder.node('Concat', outputs, axis=2)])
+  # Boxes are decoded to pixels (cx, cy, w, h), class scores stay probabilities
+  return builder.node('Mul', [y, builder.constant(np.array([resolution] * 4 + [1] * classes).reshape(1, -1, 1), builder.dtype)])
+
+def _cnn(builder, x, depth, width, classes=1000):
+  """Plain VGG-like stack: five stride 2 stages of depth 3x3 convolutions, global pooling and a classifier"""
+  c_in = 3
+  for stage in range(5):
+    c_out = max(8, int(64 * width * 2 ** stage))
+    x = builder.conv(x, c_in, c_out, 3, 2)
+    for _ in range(max(0, int(depth) - 1)):
+      x = builder.conv(x, c_out, c_out, 3)
+    c_in = c_out
+  x = builder.node('Flatten', [builder.node('GlobalAveragePool', [x])])
+  return builder.gemm(x, c_in, classes)
+
+def _mlp(builder, x, depth, width, resolution, classes=1000):
+  """Flattened image through depth fully connected ReLU layers"""
+  n_in = 3 * resolution * resolution
+  hidden = max(16, int(1024 * width))
+  x = builder.node('Flatten', [x])
+  for _ in range(int(depth)):
+    x = builder.node('Relu', [builder.gemm(x, n_in, hidden)])
+    n_in = hidden
+  return builder.gemm(x, n_in, classes)
+
+def generate_model(file_path, batch_size, arch='yolo', depth=None, width=None, resolution=None, half_precision=False, dynamic=False, seed=SEED):
+  """Writes a synthetic ONNX model with deterministic weights, input 'images' and output 'output0' are float32"""
+  import onnx
+  from onnx import helper, TensorProto
+  defaults = DEFAULTS[arch]
+  depth = defaults['depth'] if depth is None else depth
+  width = defaults['width'] if width is None else width
+  resolution = defaults['resolution'] if resolution is None else resolution
+  builder = GraphBuilder(seed, np.float16 if half_precision else np.float32)
+  x = builder.node('Cast', ['images'], to=TensorProto.FLOAT16) if half_precision else 'images'
+  if arch == 'yolo':
+    y = _yolo(builder, x, depth, width, resolution)
+  elif arch == 'cnn':
+    y = _cnn(builder, x, depth, width)
+  else:
+    y = _mlp(builder, x, depth, width, resolution)
+  builder.nodes.append(helper.make_node('Cast' if half_precision else 'Identity', [y], ['output0'], **({'to': TensorProto.FLOAT} if half_precision else {})))
+  batch = 'batch' if dynamic else batch_size
+  graph = helper.make_graph(builder.nodes, f'synth_{arch}',
+                            [helper.make_tensor_value_info('images', TensorProto.FLOAT, [batch, 3, resolution, resolution])],
+                            [helper.make_tensor_value_info('output0', TensorProto.FLOAT, [batch, 84, 'anchors'] if arch == 'yolo' else [batch, 1000])],
+                            builder.initializers)
+  model = helper.make_model(graph, opset_imports=[helper.make_opsetid('', OPSET)], producer_name='testperf-synth')
+  model.ir_version = 8
+  onnx.checker.check_model(model)
+  temp_path = f'{file_path}.{os.getpid()}.tmp'
+  onnx.save(model, temp_path)
+  os.replace(temp_path, file_path)
+
+def try_export_model(file_path, batch_size, half_precision=False, dynamic=False):
+    if not os.path.exists(file_path):
+      try:
+        params = synth_parameters()
+        generate_model(file_path, batch_size, params['arch'], params['depth'], params['width'], params['resolution'], half_precision, dynamic)
+      except Exception as e:
+        raise Exception(f'Failed to generate model {e}')
+    pass
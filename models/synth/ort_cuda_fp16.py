@@ -0,0 +1,31 @@
+import os
+from class_model import Model
+import numpy as np
+import onnxruntime as ort
+from .common import try_export_model, synth_model_path, input_shape
+
+class Model(Model):
+  def __init__(self):
+    super().__init__()
+    self.sess = None
+    self.sess_data = {'providers': ['CUDAExecutionProvider']}
+    self.model_path = synth_model_path(half_precision=True)
+    self.supports_dynamic_batch = True
+    self.model_description = 'Synthetic model FP16 inference with using CUDA Execution Provider'
+    if not self.sess_data['providers'][0] in ort.get_available_providers():
+      raise Exception(f'CUDA Execution Provider is not available')
+  def prepare_batch(self, batch_size):
+    file_path = self.get_model_file_path(batch_size)
+    try_export_model(file_path, batch_size, half_precision=True, dynamic=self.dynamic_batch)
+  def read(self):
+    file_path = self.get_model_read_path(self.batch_size)
+    self.sess = ort.InferenceSession(file_path, **self.sess_data)
+  def prepare(self):
+    self.input_data = {
+      'images': np.random.randn(*input_shape(self.batch_size)).astype(np.float32),
+    }
+  def inference(self):
+    #return self.sess.run(['output0'], input_feed=self.input_data)
+    return self.sess.run([], input_feed=self.input_data)
+  def shutdown(self):
+    pass
@@ -0,0 +1,33 @@
+import os
+from class_model import Model
+import numpy as np
+import openvino as ov
+from .common import try_export_model, synth_model_path, input_shape
+
+class Model(Model):
+  def __init__(self):
+    super().__init__()
+    self.core = ov.Core()
+    self.ov_model = None
+    self.compiled_model = None
+    self.model_path = synth_model_path()
+    self.supports_dynamic_batch = True
+    self.model_description = 'Synthetic model inference with using OpenVINO'
+  def prepare_batch(self, batch_size):
+    file_path = self.get_model_file_path(batch_size)
+    try_export_model(file_path, batch_size, dynamic=self.dynamic_batch)
+  def read(self):
+    file_path = self.get_model_read_path(self.batch_size)
+    self.ov_model = self.core.read_model(file_path)
+    if self.dynamic_batch:
+      # Only batch axis stays dynamic, spatial size is fixed by the benchmark
+      self.ov_model.reshape({'images': [-1, *input_shape(1)[1:]]})
+    self.compiled_model = self.core.compile_model(self.ov_model, 'CPU')
+  def prepare(self):
+    self.input_data = {
+      'images': np.random.randn(*input_shape(self.batch_size)).astype(np.float32),
+    }
+  def inference(self):
+    return self.compiled_model(self.input_data)
+  def shutdown(self):
+    pass
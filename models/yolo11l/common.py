@@ -1,22 +1,42 @@
 import os
+import sys
+from export_cache import cached_export, fetch_weights
+from variants import derive
+from quantization import quantize
 
-def try_export_model(file_path, batch_size, half_precision=False):
+def _export(weights_path, target_path, batch_size, half_precision, dynamic):
+  from ultralytics import YOLO
+  model = YOLO(weights_path)
+  exported = model.export(format='onnx', imgsz=640, batch=batch_size, half=half_precision, dynamic=dynamic)
+  os.replace(exported, target_path)
+
+def try_export_model(file_path, batch_size, half_precision=False, dynamic=False):
     if not os.path.exists(file_path):
       try:
-        yolo_model_path = 'yolov11l.pt'
-        if not os.path.exists(yolo_model_path):
-          try:
-            import urllib.request
-            urllib.request.urlretrieve('https://github.com/ultralytics/assets/releases/download/v8.4.0/yolo11l.pt', yolo_model_path)
-          except Exception as e:
-            raise Exception(f'Failed to download YOLO model {e}')
-        if os.path.exists(yolo_model_path):
-          from ultralytics import YOLO
-          model = YOLO(yolo_model_path)
-          model.export(format='onnx', imgsz=640, batch=batch_size, half=half_precision)
-          os.rename(yolo_model_path[:-2] + 'onnx', file_path)
+        yolo_model_path = fetch_weights('yolov11l.pt', 'https://github.com/ultralytics/assets/releases/download/v8.4.0/yolo11l.pt')
+        if '--native-export' in sys.argv:
+          parameters = {'imgsz': 640, 'batch': batch_size, 'half': half_precision, 'dynamic': dynamic, 'opset': None}
+          cached_export(file_path, yolo_model_path, parameters,
+                        lambda weights_path, target_path: _export(weights_path, target_path, batch_size, half_precision, dynamic))
         else:
-          raise Exception(f'YOLO model file {yolo_model_path} not found')
+          # One dynamic FP32 export, batch and FP16 variants are derived from it by graph rewriting
+          base_path = os.path.join(os.path.dirname(file_path), os.path.basename(yolo_model_path)[:-len('.pt')] + '_base.onnx')
+          if not os.path.exists(base_path):
+            parameters = {'imgsz': 640, 'batch': 1, 'half': False, 'dynamic': True, 'opset': None}
+            cached_export(base_path, yolo_model_path, parameters,
+                          lambda weights_path, target_path: _export(weights_path, target_path, 1, False, True))
+          derive(base_path, file_path, {'images': ['batch' if dynamic else batch_size, 3, 640, 640]}, half_precision)
       except Exception as e:
         raise Exception(f'Failed to export model {e}')
     pass
+
+def try_quantize_model(file_path, batch_size, method, dynamic=False):
+    if not os.path.exists(file_path):
+      # INT8 model is quantized from the FP32 model of the same batch size, calibrated on the dataset pool
+      source_path = os.path.join(os.path.dirname(file_path), f'yolov11l_{"dyn" if dynamic else batch_size}b.onnx')
+      try_export_model(source_path, batch_size, dynamic=dynamic)
+      try:
+        quantize(source_path, file_path, method, batch_size)
+      except Exception as e:
+        raise Exception(f'Failed to quantize model {e}')
+    pass
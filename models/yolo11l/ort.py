@@ -10,12 +10,13 @@ class Model(Model):
     self.sess = None
     self.sess_data = {}
     self.model_path = 'yolov11l_{batch}b.onnx'
+    self.supports_dynamic_batch = True
     self.model_description = 'YOLOv11l inference with using default ONNX Runtime'
   def prepare_batch(self, batch_size):
-    file_path = self.get_file_path(self.model_path.format(batch=batch_size))
-    try_export_model(file_path, batch_size)
+    file_path = self.get_model_file_path(batch_size)
+    try_export_model(file_path, batch_size, dynamic=self.dynamic_batch)
   def read(self):
-    file_path = self.get_file_path(self.model_path.format(batch=self.batch_size))
+    file_path = self.get_model_read_path(self.batch_size)
     self.sess = ort.InferenceSession(file_path, **self.sess_data)
   def prepare(self):
     self.input_data = {
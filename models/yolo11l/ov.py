@@ -11,13 +11,17 @@ class Model(Model):
     self.ov_model = None
     self.compiled_model = None
     self.model_path = 'yolov11l_{batch}b.onnx'
+    self.supports_dynamic_batch = True
     self.model_description = 'YOLOv11l inference with using OpenVINO'
   def prepare_batch(self, batch_size):
-    file_path = self.get_file_path(self.model_path.format(batch=batch_size))
-    try_export_model(file_path, batch_size)
+    file_path = self.get_model_file_path(batch_size)
+    try_export_model(file_path, batch_size, dynamic=self.dynamic_batch)
   def read(self):
-    file_path = self.get_file_path(self.model_path.format(batch=self.batch_size))
+    file_path = self.get_model_read_path(self.batch_size)
     self.ov_model = self.core.read_model(file_path)
+    if self.dynamic_batch:
+      # Only batch axis stays dynamic, spatial size is fixed by the benchmark
+      self.ov_model.reshape({'images': [-1, 3, 640, 640]})
     self.compiled_model = self.core.compile_model(self.ov_model, 'CPU')
   def prepare(self):
     self.input_data = {
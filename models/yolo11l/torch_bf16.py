@@ -0,0 +1,39 @@
+import os
+import torch
+import numpy as np
+import torch_modes
+from class_model import Model
+from ultralytics import YOLO
+
+class Model(Model):
+  def __init__(self):
+    super().__init__()
+    self.model = None
+    self.device = 'cpu'
+    self.model_path = './yolov11l.pt'
+    self.supports_dynamic_batch = True
+    self.torch_mode = torch_modes.mode_from_args('raw')
+    self.model_description = torch_modes.describe('YOLOv11l inference with using Torch CPU BF16 autocast', self.torch_mode)
+  def read(self):
+    if not os.path.exists(self.model_path):
+      raise Exception(f'Model file {self.model_path} not found')
+    self.model = YOLO(self.model_path)
+    self.model.to(self.device)
+    self.model.model = self.model.model.fuse()
+  def prepare(self):
+    # Create random input tensor (B, C, H, W), autocast converts it to BF16 inside convolutions
+    self.input_data = torch.randn(
+        self.batch_size, 3, 640, 640,
+        dtype=torch.float32,
+        device=self.device
+    )
+    min_val = self.input_data.min()
+    max_val = self.input_data.max()
+    self.input_data = (self.input_data - min_val) / (max_val - min_val)
+  def inference(self):
+    with torch.no_grad(), torch.autocast('cpu', dtype=torch.bfloat16):
+      return torch_modes.run(self, self.torch_mode)
+  def shutdown(self):
+    if self.model is not None:
+      del self.model
+      self.model = None
@@ -1,6 +1,7 @@
 import os
 import torch
 import numpy as np
+import torch_modes
 from class_model import Model
 from ultralytics import YOLO
 
@@ -12,7 +13,9 @@ class Model(Model):
     if not torch.cuda.is_available():
       raise Exception('CUDA is not available')
     self.model_path = './yolov11l.pt'
-    self.model_description = 'YOLOv11l inference with using default Torch.Compile'
+    self.supports_dynamic_batch = True
+    self.torch_mode = torch_modes.mode_from_args('predictor')
+    self.model_description = torch_modes.describe('YOLOv11l inference with using default Torch.Compile', self.torch_mode)
   def read(self):
     if not os.path.exists(self.model_path):
       raise Exception(f'Model file {self.model_path} not found')
@@ -32,7 +35,7 @@ class Model(Model):
     self.input_data = (self.input_data - min_val) / (max_val - min_val)
   def inference(self):
     with torch.no_grad():
-      return self.model(self.input_data, verbose=False)
+      return torch_modes.run(self, self.torch_mode)
   def shutdown(self):
     if self.model is not None:
       del self.model
@@ -0,0 +1,31 @@
+import os
+from class_model import Model
+import numpy as np
+import onnxruntime as ort
+from .common import try_quantize_model
+
+class Model(Model):
+  def __init__(self):
+    super().__init__()
+    self.sess = None
+    self.sess_data = {}
+    self.model_path = 'yolov8n_{batch}b_int8_qdq.onnx'
+    # FP32 source of the quantized model, see quantization.compare
+    self.reference_model_path = 'yolov8n_{batch}b.onnx'
+    self.supports_dynamic_batch = True
+    self.model_description = 'YOLOv8n inference with using ONNX Runtime static INT8 (QDQ)'
+  def prepare_batch(self, batch_size):
+    file_path = self.get_model_file_path(batch_size)
+    try_quantize_model(file_path, batch_size, 'ort', dynamic=self.dynamic_batch)
+  def read(self):
+    file_path = self.get_model_read_path(self.batch_size)
+    self.sess = ort.InferenceSession(file_path, **self.sess_data)
+  def prepare(self):
+    self.input_data = {
+      'images': np.random.randn(self.batch_size, 3, 640, 640).astype(np.float32),
+    }
+  def inference(self):
+    #return self.sess.run(['output0'], input_feed=self.input_data)
+    return self.sess.run([], input_feed=self.input_data)
+  def shutdown(self):
+    pass
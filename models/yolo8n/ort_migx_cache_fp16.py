@@ -10,12 +10,13 @@ class Model(Model):
     self.sess = None
     self.sess_data = {'providers': ['MIGraphXExecutionProvider']}
     self.model_path = 'yolov8n_fp16{batch}b.onnx'
+    self.supports_dynamic_batch = True
     self.model_description = 'YOLOv8n FP16 inference with using MIGraphX Execution Provider with cache'
     if not self.sess_data['providers'][0] in ort.get_available_providers():
       raise Exception(f'MIGraphX Execution Provider is not available')
   def prepare_batch(self, batch_size):
-    file_path = self.get_file_path(self.model_path.format(batch=batch_size))
-    try_export_model(file_path, batch_size, half_precision=True)
+    file_path = self.get_model_file_path(batch_size)
+    try_export_model(file_path, batch_size, half_precision=True, dynamic=self.dynamic_batch)
     cache_path = file_path[:-4] + 'migx'
     if not os.path.exists(cache_path):
       try:
@@ -29,7 +30,7 @@ class Model(Model):
         raise Exception(f'Failed to save compiled model {e}')
   def read(self):
     #os.environ['ORT_MIGRAPHX_CACHE_PATH'] = self.get_file_path('')
-    file_path = self.get_file_path(self.model_path.format(batch=self.batch_size))
+    file_path = self.get_model_file_path(self.batch_size)
     os.environ['ORT_MIGRAPHX_MODEL_CACHE_PATH'] = file_path[:-4] + 'migx'
     self.sess = ort.InferenceSession(file_path, **self.sess_data)
   def prepare(self):
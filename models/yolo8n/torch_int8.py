@@ -0,0 +1,52 @@
+import os
+import torch
+import numpy as np
+import torch_modes
+import torch_precision
+from class_model import Model
+from ultralytics import YOLO
+
+class Model(Model):
+  def __init__(self):
+    super().__init__()
+    self.model = None
+    self.network = None
+    self.device = 'cpu'
+    self.weights_path = './yolov8n.pt'
+    self.model_path = 'yolov8n_int8_{batch}b.pt2'
+    self.torch_mode = torch_modes.mode_from_args('raw')
+    if self.torch_mode == 'predictor':
+      raise Exception('Quantized network runs without the ultralytics predictor, use raw or nms torch mode')
+    self.model_description = torch_modes.describe('YOLOv8n inference with using Torch CPU static INT8 (PT2E + Inductor)', self.torch_mode)
+  def prepare_batch(self, batch_size):
+    file_path = self.get_model_file_path(batch_size)
+    if os.path.exists(file_path):
+      return
+    if not os.path.exists(self.weights_path):
+      raise Exception(f'Model file {self.weights_path} not found')
+    # Calibration uses locally generated frames of the dataset pool, quantized program is exported per batch size
+    calibration = torch_precision.calibration_tensors(batch_size)
+    network = YOLO(self.weights_path).model.fuse().float().eval()
+    torch_precision.save_quantized(torch_precision.quantize_static(network, calibration), calibration[0], file_path)
+  def read(self):
+    file_path = self.get_model_read_path(self.batch_size)
+    if not os.path.exists(file_path):
+      raise Exception(f'Model file {file_path} not found')
+    self.network = torch_precision.compile_quantized(torch_precision.load_quantized(file_path))
+  def prepare(self):
+    # Create random input tensor (B, C, H, W)
+    self.input_data = torch.randn(
+        self.batch_size, 3, 640, 640,
+        dtype=torch.float32,
+        device=self.device
+    )
+    min_val = self.input_data.min()
+    max_val = self.input_data.max()
+    self.input_data = (self.input_data - min_val) / (max_val - min_val)
+  def inference(self):
+    with torch.no_grad():
+      return torch_modes.run(self, self.torch_mode)
+  def shutdown(self):
+    if self.network is not None:
+      del self.network
+      self.network = None
@@ -0,0 +1,164 @@
+import os
+import json
+from collections import defaultdict
+from runtimes import detect_runtime, ort_session_options, ov_device, torch_module
+
+DEFAULT_PROFILE_RUNS = 10
+
+def normalize(records, runs):
+  """Merges (op type, node name, seconds) records into rows sorted by total time"""
+  nodes = defaultdict(lambda: [0, 0.0])
+  for op_type, node_name, seconds in records:
+    nodes[(op_type, node_name)][0] += 1
+    nodes[(op_type, node_name)][1] += seconds
+  total = sum(item[1] for item in nodes.values())
+  rows = []
+  for (op_type, node_name), (calls, node_time) in sorted(nodes.items(), key=lambda x: -x[1][1]):
+    rows.append({
+      'op_type': op_type,
+      'node_name': node_name,
+      'calls': calls,
+      'total_time': node_time,
+      # Mean time per inference run, not per kernel call
+      'mean_time': node_time / runs if runs else node_time,
+      'share': node_time / total if total else 0.0,
+    })
+  return rows
+
+def summarize_by_op_type(rows):
+  op_types = defaultdict(lambda: [0, 0.0, 0.0])
+  for row in rows:
+    op_types[row['op_type']][0] += 1
+    op_types[row['op_type']][1] += row['total_time']
+    op_types[row['op_type']][2] += row['share']
+  return sorted(op_types.items(), key=lambda x: -x[1][1])
+
+def _profile_ort(model, runs):
+  # Backends without session options get them only for profiling, measured sessions are created as before
+  injected = 'sess_options' not in model.sess_data
+  options = ort_session_options(model)
+  prefix = options.profile_file_prefix
+  options.enable_profiling = True
+  options.profile_file_prefix = model.get_file_path('ort_profile')
+  try:
+    model.read()
+    model.prepare()
+    for _ in range(runs):
+      model.inference()
+    profile_path = model.sess.end_profiling()
+  finally:
+    if injected:
+      model.sess_data.pop('sess_options', None)
+    else:
+      options.enable_profiling = False
+      options.profile_file_prefix = prefix
+    model.read()
+  with open(profile_path, 'r') as f:
+    events = json.load(f)
+  os.remove(profile_path)
+  records = []
+  for event in events:
+    if event.get('cat') != 'Node' or not event.get('name', '').endswith('_kernel_time'):
+      continue
+    records.append((event.get('args', {}).get('op_name', ''), event['name'][:-len('_kernel_time')], event.get('dur', 0) / 1e6))
+  return records
+
+def _profile_ov(model, runs):
+  device = ov_device(model)
+  model.core.set_property(device, {'PERF_COUNT': True})
+  try:
+    model.read()
+    model.prepare()
+    request = model.compiled_model.create_infer_request()
+    records = []
+    for _ in range(runs):
+      request.infer(model.input_data)
+      # Profiling info only covers the last inference of the request
+      for item in request.profiling_info:
+        if str(item.status).endswith('EXECUTED'):
+          records.append((item.node_type, item.node_name, item.real_time.total_seconds()))
+  finally:
+    model.core.set_property(device, {'PERF_COUNT': False})
+    model.read()
+  return records
+
+def _profile_torch(model, runs):
+  import torch
+  from torch.profiler import profile, record_function, ProfilerActivity
+
+  activities = [ProfilerActivity.CPU]
+  if torch.cuda.is_available():
+    activities.append(ProfilerActivity.CUDA)
+
+  # Leaf modules are marked with record_function so time can be attributed to layers
+  hooks = []
+  module_names = {}
+  network = torch_module(model)
+  if network is not None:
+    def pre_hook(module, args):
+      module._op_profile_scope = record_function(module_names[module])
+      module._op_profile_scope.__enter__()
+    def post_hook(module, args, output):
+      module._op_profile_scope.__exit__(None, None, None)
+    for name, module in network.named_modules():
+      if name and not any(True for _ in module.children()):
+        module_names[module] = f'{type(module).__name__}|{name}'
+        hooks.append(module.register_forward_pre_hook(pre_hook))
+        hooks.append(module.register_forward_hook(post_hook))
+
+  try:
+    model.prepare()
+    with profile(activities=activities) as prof:
+      for _ in range(runs):
+        model.inference()
+      if torch.cuda.is_available():
+        torch.cuda.synchronize()
+  finally:
+    for hook in hooks:
+      hook.remove()
+
+  def event_time(event):
+    device_time = getattr(event, 'device_time_total', getattr(event, 'cuda_time_total', 0))
+    return (device_time if device_time else event.cpu_time_total) / 1e6
+
+  events = prof.key_averages()
+  scoped = [event for event in events if '|' in event.key]
+  records = []
+  if scoped:
+    for event in scoped:
+      op_type, node_name = event.key.split('|', 1)
+      # key_averages() aggregates calls, spread them back to keep calls count
+      records.extend([(op_type, node_name, event_time(event) / event.count)] * event.count)
+  else:
+    # Compiled graphs do not call module hooks, fall back to aten operators
+    for event in events:
+      if event.key.startswith('aten::'):
+        records.extend([(event.key, event.key, event.self_cpu_time_total / 1e6 / event.count)] * event.count)
+  return records
+
+def profile_model(model, runs=DEFAULT_PROFILE_RUNS):
+  runtime = detect_runtime(model)
+  if runtime == 'ort':
+    records = _profile_ort(model, runs)
+  elif runtime == 'ov':
+    records = _profile_ov(model, runs)
+  elif runtime == 'torch':
+    records = _profile_torch(model, runs)
+  else:
+    raise Exception(f'Operator profiling is not supported for runtime {runtime}')
+  return runtime, normalize(records, runs)
+
+def hotspots_rows(profiles, top=50):
+  """Builds "Hotspots" sheet rows from {batch: (runtime, rows)}"""
+  sheet = []
+  for batch, (runtime, rows) in profiles.items():
+    sheet.append([f'Batch {batch}', f'Runtime: {runtime}'])
+    sheet.append(['Op Type', 'Nodes', 'Total Time (s)', 'Share'])
+    for op_type, (nodes, op_time, share) in summarize_by_op_type(rows):
+      sheet.append([op_type, nodes, op_time, share])
+    sheet.append([])
+    sheet.append(['Op Type', 'Node Name', 'Calls', 'Total Time (s)', 'Mean Time per Run (s)', 'Share'])
+    for row in rows[:top]:
+      sheet.append([row['op_type'], row['node_name'], row['calls'], row['total_time'], row['mean_time'], row['share']])
+    sheet.append([])
+  return sheet
@@ -0,0 +1,82 @@
+from time import perf_counter
+from runtimes import detect_runtime
+from reports import summary_statistics
+
+DEFAULT_READ_RUNS = 5
+# SessionOptions settings of the backend carried over to the options used for the comparison
+SESSION_SETTINGS = ['intra_op_num_threads', 'inter_op_num_threads', 'execution_mode', 'execution_order', 'enable_cpu_mem_arena',
+                    'enable_mem_pattern', 'enable_mem_reuse', 'use_deterministic_compute', 'log_severity_level']
+
+def _measure(model, read_runs, inference_runs):
+  read_times = []
+  for _ in range(read_runs):
+    start = perf_counter()
+    model.read()
+    read_times.append(perf_counter() - start)
+  model.prepare()
+  model.inference()
+  inference_times = []
+  for _ in range(inference_runs):
+    start = perf_counter()
+    model.inference()
+    inference_times.append(perf_counter() - start)
+  return summary_statistics(read_times), summary_statistics(inference_times)
+
+def compare(model, inference_runs, read_runs=DEFAULT_READ_RUNS):
+  """Session creation and inference time for every graph optimization level and for offline optimized models"""
+  if detect_runtime(model) != 'ort':
+    raise Exception('Graph optimization comparison is supported only for ONNX Runtime backends')
+  import onnxruntime as ort
+  levels = [
+    ('ORT_DISABLE_ALL', ort.GraphOptimizationLevel.ORT_DISABLE_ALL),
+    ('ORT_ENABLE_BASIC', ort.GraphOptimizationLevel.ORT_ENABLE_BASIC),
+    ('ORT_ENABLE_EXTENDED', ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED),
+    ('ORT_ENABLE_ALL', ort.GraphOptimizationLevel.ORT_ENABLE_ALL),
+  ]
+  # Levels and config entries are set on separate options, sess_data of the backend is restored as it was
+  saved = dict(model.sess_data)
+  options = ort.SessionOptions()
+  if saved.get('sess_options') is not None:
+    for name in SESSION_SETTINGS:
+      setattr(options, name, getattr(saved['sess_options'], name))
+  model.sess_data['sess_options'] = options
+  source_path = model.get_model_file_path(model.batch_size)
+  offline_path = source_path[:-len('.onnx')] + '_opt'
+  results = []
+  try:
+    # Explicit path keeps other read path resolvers (artifact cache) out of the comparison
+    model.read_path_override = source_path
+    options.optimized_model_filepath = ''
+    for title, level in levels:
+      options.graph_optimization_level = level
+      results.append((title, *_measure(model, read_runs, inference_runs)))
+
+    # Offline optimization: serialize once with all optimizations, load with optimizations disabled
+    for title, extension, model_format in [('Offline ONNX + ORT_DISABLE_ALL', '.onnx', 'ONNX'), ('Offline ORT format + ORT_DISABLE_ALL', '.ort', 'ORT')]:
+      options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+      options.optimized_model_filepath = offline_path + extension
+      options.add_session_config_entry('session.save_model_format', model_format)
+      model.read()
+      options.optimized_model_filepath = ''
+      options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+      model.read_path_override = offline_path + extension
+      results.append((title, *_measure(model, read_runs, inference_runs)))
+      model.read_path_override = source_path
+  finally:
+    model.sess_data.clear()
+    model.sess_data.update(saved)
+    model.read_path_override = None
+    model.read()
+  return results
+
+def comparison_rows(comparisons):
+  """Builds "Graph Optimization" sheet rows from {batch: results}, differences are relative to ORT_ENABLE_ALL"""
+  sheet = [['Batch', 'Variant', 'Session Creation Average (s)', 'Session Creation Median (s)', 'Inference Median (s)', 'Inference 99th Percentile (s)', 'Session Creation vs ORT_ENABLE_ALL (%)', 'Inference vs ORT_ENABLE_ALL (%)']]
+  for batch, results in comparisons.items():
+    baseline = [item for item in results if item[0] == 'ORT_ENABLE_ALL'][0]
+    for title, read_stats, inference_stats in results:
+      sheet.append([batch, title, read_stats['Average'], read_stats['Median'], inference_stats['Median'], inference_stats['99th Percentile'],
+                    100 * (read_stats['Median'] - baseline[1]['Median']) / baseline[1]['Median'],
+                    100 * (inference_stats['Median'] - baseline[2]['Median']) / baseline[2]['Median']])
+    sheet.append([])
+  return sheet
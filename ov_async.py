@@ -0,0 +1,92 @@
+from time import perf_counter
+import numpy as np
+from runtimes import detect_runtime, ov_device
+from reports import summary_statistics
+
+DEFAULT_DURATION = 5.0
+SYNC_RUNS = 20
+
+def compile_throughput(model):
+  """Compiles the model of the backend once more with the THROUGHPUT hint, the plugin picks streams and threads"""
+  return model.core.compile_model(model.ov_model, ov_device(model), {'PERFORMANCE_HINT': 'THROUGHPUT'})
+
+def _property(compiled_model, name):
+  try:
+    return compiled_model.get_property(name)
+  except Exception:
+    return None
+
+def _sync_latency(model, runs=SYNC_RUNS):
+  model.inference()
+  times = []
+  for _ in range(runs):
+    start = perf_counter()
+    model.inference()
+    times.append(perf_counter() - start)
+  return summary_statistics(times)
+
+def benchmark(model, duration=DEFAULT_DURATION, requests=None):
+  """Keeps every infer request of an AsyncInferQueue busy for duration seconds, latency of each request is
+  measured from submission to its completion callback"""
+  if detect_runtime(model) != 'ov' or getattr(model, 'ov_model', None) is None:
+    raise Exception('Asynchronous throughput mode is supported only for OpenVINO backends')
+  import openvino as ov
+  compiled_model = compile_throughput(model)
+  optimal = _property(compiled_model, 'OPTIMAL_NUMBER_OF_INFER_REQUESTS')
+  queue = ov.AsyncInferQueue(compiled_model, requests or optimal or 0)
+  latencies, completions = [], []
+  def on_done(request, start):
+    end = perf_counter()
+    latencies.append(end - start)
+    completions.append(end)
+  queue.set_callback(on_done)
+  inputs = model.input_data
+
+  # Every request runs once before measuring, first inferences allocate per-stream memory
+  for _ in range(len(queue)):
+    queue.start_async(inputs, perf_counter(), share_inputs=True)
+  queue.wait_all()
+  latencies.clear()
+  completions.clear()
+
+  start = perf_counter()
+  while perf_counter() - start < duration:
+    # Waiting for an idle request first keeps queueing time out of request latency
+    queue.get_idle_request_id()
+    queue.start_async(inputs, perf_counter(), share_inputs=True)
+  queue.wait_all()
+  elapsed = perf_counter() - start
+
+  # Throughput of every full second shows whether the rate is sustained or drops (thermal, memory bandwidth)
+  seconds = np.bincount((np.array(completions) - start).astype(np.int64))[:int(elapsed)] * model.batch_size
+  sync = _sync_latency(model)
+  return {
+    'Sync Latency': sync,
+    'Sync Throughput (FPS)': model.batch_size / sync['Median'] if sync['Median'] else None,
+    'Infer Requests': len(queue),
+    'Optimal Infer Requests': optimal,
+    'Streams': _property(compiled_model, 'NUM_STREAMS'),
+    'Threads': _property(compiled_model, 'INFERENCE_NUM_THREADS'),
+    'Duration (s)': elapsed,
+    'Completed Requests': len(latencies),
+    'Throughput (FPS)': len(latencies) * model.batch_size / elapsed,
+    'Sustained Throughput (FPS)': float(np.median(seconds)) if len(seconds) else None,
+    'Minimum Throughput per Second (FPS)': float(seconds.min()) if len(seconds) else None,
+    'Request Latency': summary_statistics(latencies),
+  }
+
+def benchmark_rows(results):
+  """Builds "OpenVINO Async" sheet rows from {batch: result}"""
+  sheet = [['Batch', 'Mode', 'Infer Requests', 'Optimal Infer Requests', 'Streams', 'Threads', 'Duration (s)', 'Completed Requests', 'Throughput (FPS)',
+            'Sustained Throughput (FPS)', 'Minimum Throughput per Second (FPS)', 'Latency Average (s)', 'Latency Median (s)', 'Latency 99th Percentile (s)', 'Throughput vs Sync (x)']]
+  for batch, result in results.items():
+    sync = result['Sync Latency']
+    sheet.append([batch, 'Sync (LATENCY)', 1, None, None, None, None, SYNC_RUNS, result['Sync Throughput (FPS)'], None, None,
+                  sync['Average'], sync['Median'], sync['99th Percentile'], 1.0])
+    latency = result['Request Latency']
+    sheet.append([batch, 'Async (THROUGHPUT)', result['Infer Requests'], result['Optimal Infer Requests'], result['Streams'], result['Threads'], result['Duration (s)'],
+                  result['Completed Requests'], result['Throughput (FPS)'], result['Sustained Throughput (FPS)'], result['Minimum Throughput per Second (FPS)'],
+                  latency['Average'], latency['Median'], latency['99th Percentile'],
+                  result['Throughput (FPS)'] / result['Sync Throughput (FPS)'] if result['Sync Throughput (FPS)'] else None])
+    sheet.append([])
+  return sheet
@@ -0,0 +1,125 @@
+import queue
+import threading
+from time import perf_counter
+import numpy as np
+import preprocess
+import postprocess
+from runtimes import set_input, first_output
+
+DEFAULT_DEPTH = 2
+DEFAULT_RUNS = 50
+STAGES = ['Preprocess', 'Inference', 'Postprocess']
+
+def _serial(model, preprocessor, buffer, runs):
+  busy = {stage: 0.0 for stage in STAGES}
+  start = perf_counter()
+  for _ in range(runs):
+    stage_start = perf_counter()
+    preprocessor.next_batch(buffer)
+    preprocessed = perf_counter()
+    set_input(model, buffer)
+    output = first_output(model.inference())
+    inferred = perf_counter()
+    postprocess.postprocess(output)
+    busy['Preprocess'] += preprocessed - stage_start
+    busy['Inference'] += inferred - preprocessed
+    busy['Postprocess'] += perf_counter() - inferred
+  return perf_counter() - start, busy, {}
+
+def _pipelined(model, preprocessor, buffers, runs, depth):
+  """Stages run in own threads, buffers circulate free -> preprocessed -> free, outputs go to postprocess"""
+  free = queue.Queue()
+  for buffer in buffers:
+    free.put(buffer)
+  preprocessed = queue.Queue(maxsize=depth)
+  inferred = queue.Queue(maxsize=depth)
+  busy = {stage: 0.0 for stage in STAGES}
+  depths = {'Preprocessed Queue': [], 'Inferred Queue': []}
+  errors = []
+
+  def stage(name, work):
+    def run():
+      try:
+        for _ in range(runs):
+          work()
+      except Exception as e:
+        errors.append(e)
+    thread = threading.Thread(target=run, name=f'pipeline-{name}', daemon=True)
+    return thread
+
+  def preprocess_work():
+    buffer = free.get()
+    start = perf_counter()
+    preprocessor.next_batch(buffer)
+    busy['Preprocess'] += perf_counter() - start
+    depths['Preprocessed Queue'].append(preprocessed.qsize())
+    preprocessed.put(buffer)
+
+  def inference_work():
+    buffer = preprocessed.get()
+    start = perf_counter()
+    set_input(model, buffer)
+    # Runtimes may reuse output memory on next call, postprocessing gets a copy
+    output = np.array(first_output(model.inference()))
+    busy['Inference'] += perf_counter() - start
+    free.put(buffer)
+    depths['Inferred Queue'].append(inferred.qsize())
+    inferred.put(output)
+
+  def postprocess_work():
+    output = inferred.get()
+    start = perf_counter()
+    postprocess.postprocess(output)
+    busy['Postprocess'] += perf_counter() - start
+
+  threads = [stage('preprocess', preprocess_work), stage('inference', inference_work), stage('postprocess', postprocess_work)]
+  start = perf_counter()
+  for thread in threads:
+    thread.start()
+  # A failed stage would leave the others blocked on queues, so wait with a timeout and report the error
+  while any(thread.is_alive() for thread in threads) and not errors:
+    threads[-1].join(0.1)
+  elapsed = perf_counter() - start
+  if errors:
+    raise errors[0]
+  return elapsed, busy, depths
+
+def benchmark(model, runs=DEFAULT_RUNS, depth=DEFAULT_DEPTH, workers=None, corpus_size=preprocess.DEFAULT_CORPUS_SIZE):
+  """Serial preprocess -> inference -> postprocess loop against three pipelined stages for the current batch size"""
+  batch = model.batch_size
+  preprocessor = preprocess.Preprocessor(preprocess.generate_corpus(corpus_size), batch, workers)
+  try:
+    # Every buffer can be held by the preprocess stage, the queue and the inference stage at once
+    buffers = [preprocessor.next_batch() for _ in range(depth + 2)]
+    model.prepare()
+    set_input(model, buffers[0])
+    model.inference()
+    results = {}
+    for title, function in [('Serial', lambda: _serial(model, preprocessor, buffers[0], runs)), ('Pipelined', lambda: _pipelined(model, preprocessor, buffers, runs, depth))]:
+      elapsed, busy, depths = function()
+      results[title] = {
+        'Throughput (FPS)': batch * runs / elapsed,
+        'Utilization': {stage: busy[stage] / elapsed for stage in STAGES},
+        'Queue Depth': {name: (float(np.mean(values)), max(values)) for name, values in depths.items() if values},
+      }
+  finally:
+    preprocessor.close()
+    model.prepare()
+  results['Workers'] = preprocessor.workers
+  results['Depth'] = depth
+  return results
+
+def benchmark_rows(results):
+  """Builds "Pipeline" sheet rows from {batch: results}"""
+  sheet = [['Batch', 'Mode', 'Throughput (FPS)'] + [f'{stage} Utilization' for stage in STAGES] + ['Preprocessed Queue Average', 'Preprocessed Queue Max', 'Inferred Queue Average', 'Inferred Queue Max', 'Queue Size', 'Preprocess Workers']]
+  for batch, result in results.items():
+    for mode in ['Serial', 'Pipelined']:
+      item = result[mode]
+      depths = item['Queue Depth']
+      sheet.append([batch, mode, item['Throughput (FPS)']] + [item['Utilization'][stage] for stage in STAGES] +
+                   list(depths.get('Preprocessed Queue', (None, None))) + list(depths.get('Inferred Queue', (None, None))) + [result['Depth'], result['Workers']])
+    sheet.append([batch, 'Speedup', result['Pipelined']['Throughput (FPS)'] / result['Serial']['Throughput (FPS)']])
+    # Inference stage saturated: more inference instances help, otherwise pipelining already hides the rest
+    sheet.append([batch, 'Bottleneck', max(STAGES, key=lambda stage: result['Pipelined']['Utilization'][stage])])
+    sheet.append([])
+  return sheet
@@ -0,0 +1,225 @@
+import os
+from time import perf_counter
+import numpy as np
+from runtimes import detect_runtime, first_output
+from reports import summary_statistics
+
+CONF_THRESHOLD = 0.25
+IOU_THRESHOLD = 0.45
+MAX_DETECTIONS = 300
+# Candidates kept before NMS, same limit as ultralytics max_nms
+MAX_CANDIDATES = 30000
+DEFAULT_RUNS = 50
+
+def decode(output, conf_threshold=CONF_THRESHOLD):
+  """Splits (B, 4 + classes, anchors) YOLO output into per-image xyxy boxes, scores and classes above the threshold"""
+  output = np.asarray(output, dtype=np.float32)
+  scores_all = output[:, 4:, :]
+  classes_all = scores_all.argmax(axis=1)
+  best_all = np.take_along_axis(scores_all, classes_all[:, None, :], axis=1)[:, 0, :]
+  images = []
+  for image, (boxes, best, classes) in enumerate(zip(output[:, :4, :], best_all, classes_all)):
+    mask = best > conf_threshold
+    cx, cy, w, h = boxes[:, mask]
+    xyxy = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+    images.append((xyxy, best[mask], classes[mask]))
+  return images
+
+def nms(boxes, scores, classes, iou_threshold=IOU_THRESHOLD, max_det=MAX_DETECTIONS, max_candidates=MAX_CANDIDATES):
+  """Class-aware greedy NMS, returns kept indices sorted by score"""
+  order = np.argsort(-scores, kind='stable')[:max_candidates]
+  if len(order) == 0:
+    return order
+  # Offsetting boxes by class keeps classes apart in one pass, same trick as torchvision batched_nms
+  shifted = boxes[order] + (classes[order] * (boxes.max() + 1))[:, None]
+  x1, y1, x2, y2 = shifted.T
+  area = (x2 - x1) * (y2 - y1)
+  remaining = np.arange(len(order))
+  keep = []
+  # Python loop runs once per kept box, IoU against the rest is a vector operation
+  while len(remaining) and len(keep) < max_det:
+    idx, rest = remaining[0], remaining[1:]
+    keep.append(idx)
+    width = np.clip(np.minimum(x2[idx], x2[rest]) - np.maximum(x1[idx], x1[rest]), 0, None)
+    height = np.clip(np.minimum(y2[idx], y2[rest]) - np.maximum(y1[idx], y1[rest]), 0, None)
+    intersection = width * height
+    remaining = rest[intersection / (area[idx] + area[rest] - intersection + 1e-9) <= iou_threshold]
+  return order[keep]
+
+def postprocess(output, conf_threshold=CONF_THRESHOLD, iou_threshold=IOU_THRESHOLD, max_det=MAX_DETECTIONS):
+  """Returns per-image (N, 6) arrays of x1, y1, x2, y2, score, class"""
+  detections = []
+  for boxes, scores, classes in decode(output, conf_threshold):
+    keep = nms(boxes, scores, classes, iou_threshold, max_det)
+    detections.append(np.concatenate([boxes[keep], scores[keep, None], classes[keep, None].astype(np.float32)], axis=1))
+  return detections
+
+def append_nms(source_path, target_path, conf_threshold=CONF_THRESHOLD, iou_threshold=IOU_THRESHOLD, max_det=MAX_DETECTIONS):
+  """Appends NonMaxSuppression to the exported model, same algorithm as postprocess(): best class of each box,
+  per-class NMS and up to max_det detections of every image. Outputs are selected (batch, class, box) indices,
+  boxes and scores ordered by image and descending score"""
+  import onnx
+  from onnx import helper, TensorProto
+  model = onnx.load(source_path)
+  opset = max(item.version for item in model.opset_import if item.domain in ('', 'ai.onnx'))
+  if opset < 11:
+    raise Exception('In-graph NMS requires opset 11 or newer')
+  graph = model.graph
+  raw = graph.output[0].name
+
+  def constant(name, data_type, dims, values):
+    return helper.make_node('Constant', [], [name], value=helper.make_tensor(name, data_type, dims, values))
+
+  # Shape inference of the exported model is not required, everything below is computed from the raw output
+  nodes = [
+    constant('nms_axes', TensorProto.INT64, [1], [1]),
+    constant('nms_box_begin', TensorProto.INT64, [1], [0]),
+    constant('nms_box_end', TensorProto.INT64, [1], [4]),
+    constant('nms_score_end', TensorProto.INT64, [1], [2 ** 31 - 1]),
+    helper.make_node('Slice', [raw, 'nms_box_begin', 'nms_box_end', 'nms_axes'], ['nms_boxes_cxcywh']),
+    helper.make_node('Transpose', ['nms_boxes_cxcywh'], ['nms_boxes'], perm=[0, 2, 1]),
+    helper.make_node('Slice', [raw, 'nms_box_end', 'nms_score_end', 'nms_axes'], ['nms_all_scores']),
+    constant('nms_max_boxes', TensorProto.INT64, [1], [max_det]),
+    constant('nms_iou', TensorProto.FLOAT, [1], [iou_threshold]),
+    constant('nms_conf', TensorProto.FLOAT, [1], [conf_threshold]),
+  ]
+  scores = 'nms_all_scores'
+  boxes = 'nms_boxes'
+  # FP16 exports keep NMS inputs in float, NonMaxSuppression is defined for float only
+  if graph.output[0].type.tensor_type.elem_type == TensorProto.FLOAT16:
+    nodes.append(helper.make_node('Cast', ['nms_all_scores'], ['nms_all_scores_f32'], to=TensorProto.FLOAT))
+    nodes.append(helper.make_node('Cast', ['nms_boxes'], ['nms_boxes_f32'], to=TensorProto.FLOAT))
+    scores, boxes = 'nms_all_scores_f32', 'nms_boxes_f32'
+  nodes += [
+    # Scores of every class but the best one are zeroed, NonMaxSuppression keeps a box once as in postprocess()
+    helper.make_node('ArgMax', [scores], ['nms_best_class'], axis=1, keepdims=1),
+    helper.make_node('Shape', [scores], ['nms_scores_shape']),
+    constant('nms_zero', TensorProto.INT64, [], [0]),
+    constant('nms_one', TensorProto.INT64, [], [1]),
+    helper.make_node('Gather', ['nms_scores_shape', 'nms_one'], ['nms_class_count']),
+    helper.make_node('Range', ['nms_zero', 'nms_class_count', 'nms_one'], ['nms_class_range']),
+    constant('nms_class_shape', TensorProto.INT64, [3], [1, -1, 1]),
+    helper.make_node('Reshape', ['nms_class_range', 'nms_class_shape'], ['nms_classes']),
+    helper.make_node('Equal', ['nms_classes', 'nms_best_class'], ['nms_best_mask']),
+    constant('nms_score_zero', TensorProto.FLOAT, [], [0.0]),
+    helper.make_node('Where', ['nms_best_mask', scores, 'nms_score_zero'], ['nms_scores']),
+    helper.make_node('NonMaxSuppression', [boxes, 'nms_scores', 'nms_max_boxes', 'nms_iou', 'nms_conf'], ['nms_candidates'], center_point_box=1),
+    # Candidate scores are gathered by (batch, class, box), boxes by (batch, box)
+    helper.make_node('GatherND', ['nms_scores', 'nms_candidates'], ['nms_candidate_scores']),
+    helper.make_node('Gather', ['nms_candidates', 'nms_zero'], ['nms_candidate_images'], axis=1),
+    # Scores are probabilities in [0, 1], so score - 2 * image sorts by image first and by descending score next
+    helper.make_node('Cast', ['nms_candidate_images'], ['nms_candidate_images_f32'], to=TensorProto.FLOAT),
+    constant('nms_image_stride', TensorProto.FLOAT, [], [2.0]),
+    helper.make_node('Mul', ['nms_candidate_images_f32', 'nms_image_stride'], ['nms_image_offset']),
+    helper.make_node('Sub', ['nms_candidate_scores', 'nms_image_offset'], ['nms_sort_key']),
+    helper.make_node('Shape', ['nms_candidate_scores'], ['nms_candidate_count']),
+    helper.make_node('TopK', ['nms_sort_key', 'nms_candidate_count'], ['nms_sorted_key', 'nms_order'], axis=0),
+    helper.make_node('Gather', ['nms_candidates', 'nms_order'], ['nms_sorted_candidates'], axis=0),
+    helper.make_node('Gather', ['nms_candidate_scores', 'nms_order'], ['nms_sorted_scores'], axis=0),
+    helper.make_node('Gather', ['nms_candidate_images', 'nms_order'], ['nms_sorted_images'], axis=0),
+    # Rank of a candidate within its image is its position minus the number of candidates of previous images
+    helper.make_node('Gather', ['nms_scores_shape', 'nms_zero'], ['nms_image_count']),
+    helper.make_node('Range', ['nms_zero', 'nms_image_count', 'nms_one'], ['nms_images']),
+    constant('nms_column_shape', TensorProto.INT64, [2], [-1, 1]),
+    helper.make_node('Reshape', ['nms_sorted_images', 'nms_column_shape'], ['nms_sorted_images_column']),
+    helper.make_node('Equal', ['nms_sorted_images_column', 'nms_images'], ['nms_image_mask']),
+    helper.make_node('Cast', ['nms_image_mask'], ['nms_image_onehot'], to=TensorProto.INT64),
+  ]
+  # ReduceSum takes axes as an input since opset 13
+  if opset >= 13:
+    nodes.append(constant('nms_first_axis', TensorProto.INT64, [1], [0]))
+    nodes.append(helper.make_node('ReduceSum', ['nms_image_onehot', 'nms_first_axis'], ['nms_image_candidates'], keepdims=0))
+  else:
+    nodes.append(helper.make_node('ReduceSum', ['nms_image_onehot'], ['nms_image_candidates'], axes=[0], keepdims=0))
+  nodes += [
+    helper.make_node('CumSum', ['nms_image_candidates', 'nms_zero'], ['nms_image_start'], exclusive=1),
+    helper.make_node('Gather', ['nms_image_start', 'nms_sorted_images'], ['nms_candidate_start']),
+    helper.make_node('ConstantOfShape', ['nms_candidate_count'], ['nms_ones'], value=helper.make_tensor('nms_ones_value', TensorProto.INT64, [1], [1])),
+    helper.make_node('CumSum', ['nms_ones', 'nms_zero'], ['nms_position'], exclusive=1),
+    helper.make_node('Sub', ['nms_position', 'nms_candidate_start'], ['nms_rank']),
+    helper.make_node('Less', ['nms_rank', 'nms_max_boxes'], ['nms_keep_mask']),
+    helper.make_node('NonZero', ['nms_keep_mask'], ['nms_keep_nonzero']),
+    constant('nms_flat_shape', TensorProto.INT64, [1], [-1]),
+    helper.make_node('Reshape', ['nms_keep_nonzero', 'nms_flat_shape'], ['nms_keep']),
+    helper.make_node('Gather', ['nms_sorted_candidates', 'nms_keep'], ['selected_indices'], axis=0),
+    helper.make_node('Gather', ['nms_sorted_scores', 'nms_keep'], ['selected_scores'], axis=0),
+    constant('nms_box_columns', TensorProto.INT64, [2], [0, 2]),
+    helper.make_node('Gather', ['selected_indices', 'nms_box_columns'], ['nms_box_indices'], axis=1),
+    helper.make_node('GatherND', [boxes, 'nms_box_indices'], ['selected_boxes']),
+  ]
+  graph.node.extend(nodes)
+  del graph.output[:]
+  graph.output.extend([
+    helper.make_tensor_value_info('selected_indices', TensorProto.INT64, ['detections', 3]),
+    helper.make_tensor_value_info('selected_boxes', TensorProto.FLOAT, ['detections', 4]),
+    helper.make_tensor_value_info('selected_scores', TensorProto.FLOAT, ['detections']),
+  ])
+  temp_path = f'{target_path}.{os.getpid()}.tmp'
+  onnx.save(model, temp_path)
+  os.replace(temp_path, target_path)
+  return target_path
+
+def _output_bytes(result):
+  if isinstance(result, (list, tuple)):
+    return sum(np.asarray(item).nbytes for item in result)
+  if hasattr(result, 'to_tuple'):
+    return sum(np.asarray(item).nbytes for item in result.to_tuple())
+  return np.asarray(result).nbytes
+
+def _time(function, runs):
+  times = []
+  for _ in range(runs):
+    start = perf_counter()
+    function()
+    times.append(perf_counter() - start)
+  return summary_statistics(times)
+
+def benchmark(model, runs=DEFAULT_RUNS):
+  """Raw inference, NumPy postprocessing and inference with the NMS subgraph appended, for the current batch size"""
+  model.prepare()
+  raw_result = model.inference()
+  output = first_output(raw_result)
+  result = {
+    'Raw Output (bytes)': _output_bytes(raw_result),
+    'Detections': sum(len(item) for item in postprocess(output)),
+    'Raw Inference': _time(model.inference, runs),
+    'NumPy Postprocess': _time(lambda: postprocess(output), runs),
+  }
+  result['Raw Inference + NumPy Postprocess'] = _time(lambda: postprocess(first_output(model.inference())), runs)
+
+  runtime = detect_runtime(model)
+  if runtime not in ('ort', 'ov'):
+    return result
+  source_path = model.get_model_file_path(model.batch_size)
+  nms_path = append_nms(source_path, source_path[:-len('.onnx')] + '_nms.onnx')
+  if runtime == 'ort':
+    import onnxruntime as ort
+    sess = ort.InferenceSession(nms_path, **model.sess_data)
+    run = lambda: sess.run([], input_feed=model.input_data)
+  else:
+    compiled_model = model.core.compile_model(model.core.read_model(nms_path), 'CPU')
+    run = lambda: compiled_model(model.input_data)
+  nms_result = run()
+  result['In-Graph NMS Output (bytes)'] = _output_bytes(nms_result)
+  result['In-Graph Detections'] = len(first_output(nms_result))
+  result['In-Graph NMS Inference'] = _time(run, runs)
+  return result
+
+def benchmark_rows(results):
+  """Builds "Postprocessing" sheet rows from {batch: result}"""
+  stages = ['Raw Inference', 'NumPy Postprocess', 'Raw Inference + NumPy Postprocess', 'In-Graph NMS Inference']
+  sheet = [['Batch', 'Stage', 'Average (s)', 'Median (s)', '99th Percentile (s)', 'Per Image Median (s)', 'Output (bytes)', 'Detections']]
+  for batch, result in results.items():
+    for stage in stages:
+      if stage not in result:
+        continue
+      stats = result[stage]
+      in_graph = stage.startswith('In-Graph')
+      sheet.append([batch, stage, stats['Average'], stats['Median'], stats['99th Percentile'], stats['Median'] / batch,
+                    result['In-Graph NMS Output (bytes)' if in_graph else 'Raw Output (bytes)'],
+                    result['In-Graph Detections' if in_graph else 'Detections']])
+    if 'In-Graph NMS Inference' in result:
+      sheet.append([batch, 'Output Transfer Saved (bytes)', None, None, None, None, result['Raw Output (bytes)'] - result['In-Graph NMS Output (bytes)'], None])
+      sheet.append([batch, 'In-Graph vs Raw + NumPy (%)', None, 100 * (result['In-Graph NMS Inference']['Median'] - result['Raw Inference + NumPy Postprocess']['Median']) / result['Raw Inference + NumPy Postprocess']['Median'], None, None, None, None])
+    sheet.append([])
+  return sheet
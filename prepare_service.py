@@ -0,0 +1,75 @@
+import os
+import sys
+import json
+import subprocess
+from time import perf_counter
+from concurrent.futures import ThreadPoolExecutor
+
+# Arguments of test_perf.py which change what prepare_batch() produces, forwarded to workers
+FORWARDED_FLAGS = ['--dynamic-batch', '--dynamic-batch-compare', '--native-export']
+FORWARDED_OPTIONS = ['--synth-arch', '--synth-depth', '--synth-width', '--synth-resolution']
+
+def forwarded_arguments(argv):
+  arguments = [flag for flag in FORWARDED_FLAGS if flag in argv]
+  for option in FORWARDED_OPTIONS:
+    if option in argv and argv.index(option) + 1 < len(argv):
+      arguments += [option, argv[argv.index(option) + 1]]
+  return arguments
+
+def _run(model_name, batch, arguments):
+  """Runs prepare_batch(batch) of model_name in a fresh interpreter, returns (batch, output lines, result)"""
+  command = [sys.executable, os.path.abspath(__file__), model_name, str(batch)] + arguments
+  result = subprocess.run(command, capture_output=True, text=True)
+  lines = result.stdout.strip().splitlines()
+  try:
+    status = json.loads(lines[-1])
+    lines = lines[:-1]
+  except (IndexError, ValueError):
+    error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else f'exit code {result.returncode}'
+    status = {'Batch': batch, 'Error': error}
+  return batch, lines, status
+
+def prepare(model_name, model, batches, workers, argv=None):
+  """Prepares batches in isolated worker processes, export and compilation libraries stay out of this process
+
+  Batches sharing one model file (dynamic batch) are prepared once. Raises if any batch failed, like the in-process loop.
+  """
+  arguments = forwarded_arguments(sys.argv if argv is None else argv)
+  unique = {}
+  for batch in batches:
+    try:
+      key = model.get_model_file_path(batch)
+    except Exception:
+      key = batch
+    unique.setdefault(key, batch)
+  results = {}
+  with ThreadPoolExecutor(max_workers=workers) as pool:
+    for batch, lines, status in pool.map(lambda batch: _run(model_name, batch, arguments), unique.values()):
+      print(f'{{ "Preparing Batch Size": {batch}, "Worker": true }},')
+      for line in lines:
+        print(line)
+      if 'Error' in status:
+        print(f'{{ "Error": "Failed to prepare batch {batch} {status["Error"]}" }},')
+      else:
+        print(f'{{ "Prepared Batch Size": {batch}, "Time": {status["Time"]} }},')
+      results[batch] = status
+  failed = [batch for batch, status in results.items() if 'Error' in status]
+  if failed:
+    raise Exception(f'Failed to prepare batch sizes {failed}')
+  return results
+
+if __name__ == '__main__':
+  # Worker: python prepare_service.py <model> <batch> [forwarded arguments]
+  sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+  model_name, batch = sys.argv[1], int(sys.argv[2])
+  try:
+    test_model = __import__(model_name, fromlist=['Model'])
+    model = test_model.Model()
+    if ('--dynamic-batch' in sys.argv or '--dynamic-batch-compare' in sys.argv) and model.supports_dynamic_batch:
+      model.dynamic_batch = True
+    start = perf_counter()
+    model.prepare_batch(batch)
+    print(json.dumps({'Batch': batch, 'Time': perf_counter() - start}))
+  except Exception as e:
+    print(json.dumps({'Batch': batch, 'Error': str(e)}))
+    sys.exit(1)
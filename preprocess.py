@@ -0,0 +1,165 @@
+import os
+from time import perf_counter
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+DEFAULT_CORPUS_SIZE = 64
+DEFAULT_RUNS = 20
+# Typical camera frame sizes, letterbox has to both down- and upscale
+FRAME_SIZES = [(1920, 1080), (1280, 720), (640, 480), (1080, 1920)]
+
+def corpus_path():
+  return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'temp', 'corpus')
+
+def _encode(path, image):
+  jpeg = path.endswith('.jpg')
+  try:
+    import cv2
+    cv2.imwrite(path, image[:, :, ::-1], [cv2.IMWRITE_JPEG_QUALITY, 90] if jpeg else [])
+  except ImportError:
+    from PIL import Image
+    Image.fromarray(image).save(path, **({'quality': 90} if jpeg else {}))
+
+def image_codec():
+  """Image library used for encoding, decoding and resizing frames, None when neither cv2 nor PIL is installed"""
+  from importlib.util import find_spec
+  for name in ('cv2', 'PIL'):
+    if find_spec(name) is not None:
+      return name
+  return None
+
+def synthesize(idx, seed=0):
+  """HWC uint8 RGB frame idx of the synthetic corpus, every frame depends only on its index"""
+  rng = np.random.default_rng((seed, idx))
+  width, height = FRAME_SIZES[idx % len(FRAME_SIZES)]
+  # Gradient background with noise and boxes, compresses like a natural image
+  y, x = np.mgrid[0:height, 0:width]
+  image = np.stack([x * 255 // width, y * 255 // height, (x + y) * 255 // (width + height)], axis=-1).astype(np.int16)
+  image += rng.integers(-20, 20, size=(height, width, 3), dtype=np.int16)
+  for _ in range(rng.integers(3, 12)):
+    x0, y0 = rng.integers(0, width - 64), rng.integers(0, height - 64)
+    image[y0:y0 + rng.integers(32, height // 3), x0:x0 + rng.integers(32, width // 3)] = rng.integers(0, 255, size=3)
+  return np.clip(image, 0, 255).astype(np.uint8)
+
+def generate_corpus(count=DEFAULT_CORPUS_SIZE, directory=None, seed=0):
+  """Deterministic synthetic JPEG/PNG frames, generated locally once"""
+  directory = directory or corpus_path()
+  os.makedirs(directory, exist_ok=True)
+  paths = []
+  for idx in range(count):
+    width, height = FRAME_SIZES[idx % len(FRAME_SIZES)]
+    path = os.path.join(directory, f'frame_{idx:05d}_{width}x{height}.' + ('png' if idx % 4 == 3 else 'jpg'))
+    paths.append(path)
+    if not os.path.exists(path):
+      _encode(path, synthesize(idx, seed))
+  return paths
+
+def decode(path):
+  try:
+    import cv2
+    image = cv2.imread(path, cv2.IMREAD_COLOR)
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+  except ImportError:
+    from PIL import Image
+    with Image.open(path) as image:
+      return np.asarray(image.convert('RGB'))
+
+def letterbox(image, size=640, color=114):
+  """Resizes keeping aspect ratio and pads to size x size, same as ultralytics LetterBox with center=True"""
+  height, width = image.shape[:2]
+  ratio = min(size / height, size / width)
+  new_width, new_height = int(round(width * ratio)), int(round(height * ratio))
+  if (new_width, new_height) != (width, height):
+    codec = image_codec()
+    if codec == 'cv2':
+      import cv2
+      image = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+    elif codec == 'PIL':
+      from PIL import Image
+      image = np.asarray(Image.fromarray(image).resize((new_width, new_height), Image.BILINEAR))
+    else:
+      # Nearest neighbour keeps frames usable as inputs without an image library
+      rows = np.minimum((np.arange(new_height) + 0.5) / ratio, height - 1).astype(np.int64)
+      columns = np.minimum((np.arange(new_width) + 0.5) / ratio, width - 1).astype(np.int64)
+      image = image[rows][:, columns]
+  result = np.full((size, size, 3), color, dtype=np.uint8)
+  top, left = (size - new_height) // 2, (size - new_width) // 2
+  result[top:top + new_height, left:left + new_width] = image
+  return result
+
+def load_frame(path, size=640):
+  return letterbox(decode(path), size)
+
+def to_tensor(frames, out=None):
+  """HWC uint8 frames to NCHW float32 in [0, 1], written into out if provided"""
+  batch = np.stack(frames)
+  if out is None:
+    out = np.empty((batch.shape[0], 3, batch.shape[1], batch.shape[2]), dtype=np.float32)
+  np.multiply(batch.transpose(0, 3, 1, 2), np.float32(1 / 255), out=out, casting='unsafe')
+  return out
+
+class Preprocessor:
+  """Decodes and letterboxes frames of a corpus into NCHW batches with a pool of workers"""
+  def __init__(self, paths, batch_size, workers=None, size=640):
+    self.paths = paths
+    self.batch_size = batch_size
+    self.size = size
+    self.workers = workers or os.cpu_count()
+    self.pool = ThreadPoolExecutor(max_workers=self.workers)
+    self.position = 0
+  def next_paths(self):
+    paths = [self.paths[(self.position + idx) % len(self.paths)] for idx in range(self.batch_size)]
+    self.position = (self.position + self.batch_size) % len(self.paths)
+    return paths
+  def next_batch(self, out=None):
+    # cv2 releases the GIL while decoding and resizing, threads scale with cores
+    frames = list(self.pool.map(lambda path: load_frame(path, self.size), self.next_paths()))
+    return to_tensor(frames, out)
+  def close(self):
+    self.pool.shutdown()
+
+def benchmark(model, runs=DEFAULT_RUNS, workers=None, corpus_size=DEFAULT_CORPUS_SIZE):
+  """Preprocessing-only, inference-only and end-to-end frames per second for the current batch size"""
+  from runtimes import set_input
+  batch = model.batch_size
+  preprocessor = Preprocessor(generate_corpus(corpus_size), batch, workers)
+  try:
+    buffer = preprocessor.next_batch()
+    start = perf_counter()
+    for _ in range(runs):
+      preprocessor.next_batch(buffer)
+    preprocess_time = perf_counter() - start
+
+    model.prepare()
+    set_input(model, buffer)
+    model.inference()
+    start = perf_counter()
+    for _ in range(runs):
+      model.inference()
+    inference_time = perf_counter() - start
+
+    start = perf_counter()
+    for _ in range(runs):
+      set_input(model, preprocessor.next_batch(buffer))
+      model.inference()
+    end_to_end_time = perf_counter() - start
+  finally:
+    preprocessor.close()
+    model.prepare()
+  frames = batch * runs
+  return {
+    'Workers': preprocessor.workers,
+    'Preprocessing FPS': frames / preprocess_time,
+    'Inference FPS': frames / inference_time,
+    'End-to-End FPS': frames / end_to_end_time,
+    'Preprocessing per Frame (s)': preprocess_time / frames,
+    'Preprocessing Share': preprocess_time / end_to_end_time,
+  }
+
+def benchmark_rows(results):
+  """Builds "Preprocessing" sheet rows from {batch: result}"""
+  columns = ['Workers', 'Preprocessing FPS', 'Inference FPS', 'End-to-End FPS', 'Preprocessing per Frame (s)', 'Preprocessing Share']
+  sheet = [['Batch'] + columns]
+  for batch, result in results.items():
+    sheet.append([batch] + [result[column] for column in columns])
+  return sheet
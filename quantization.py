@@ -0,0 +1,151 @@
+import os
+from time import perf_counter
+import numpy as np
+from export_cache import cached_export
+from runtimes import detect_runtime, set_input, first_output
+from reports import summary_statistics
+
+DEFAULT_CALIBRATION_SIZE = 32
+DEFAULT_EVALUATION_SIZE = 32
+DEFAULT_RUNS = 20
+
+def _version(package):
+  from importlib import metadata
+  try:
+    return metadata.version(package)
+  except metadata.PackageNotFoundError:
+    return None
+
+def _input_name(model_path):
+  import onnx
+  model = onnx.load(model_path, load_external_data=False)
+  initializers = set(item.name for item in model.graph.initializer)
+  return [item.name for item in model.graph.input if item.name not in initializers][0]
+
+def head_nodes(model_path):
+  """Names of nodes between the last convolutions and the outputs, detection heads concatenate box
+  coordinates in pixels with class scores in [0, 1] and a shared INT8 scale would erase the scores"""
+  import onnx
+  model = onnx.load(model_path, load_external_data=False)
+  producers = {output: node for node in model.graph.node for output in node.output}
+  names, pending = set(), [item.name for item in model.graph.output]
+  while pending:
+    node = producers.get(pending.pop())
+    if node is None or node.name in names or node.op_type in ('Conv', 'MatMul', 'Gemm'):
+      continue
+    names.add(node.name)
+    pending.extend(node.input)
+  return sorted(name for name in names if name)
+
+def calibration_inputs(model_path, batch_size, count=DEFAULT_CALIBRATION_SIZE):
+  """Input feeds made of the locally generated dataset pool, see dataset.py"""
+  import dataset
+  name = _input_name(model_path)
+  return [{name: batch} for batch in dataset.calibration_batches(batch_size, count)]
+
+def quantize_ort(source_path, target_path, calibration):
+  """ONNX Runtime static QDQ quantization: per-channel INT8 weights, UINT8 activations"""
+  from onnxruntime.quantization import quantize_static, CalibrationDataReader, QuantFormat, QuantType
+  from onnxruntime.quantization.shape_inference import quant_pre_process
+
+  class Reader(CalibrationDataReader):
+    def __init__(self):
+      self.feeds = iter(calibration)
+    def get_next(self):
+      return next(self.feeds, None)
+
+  preprocessed_path = f'{target_path}.pre.onnx'
+  try:
+    # Shape inference and graph cleanup make more nodes eligible for quantization
+    quant_pre_process(source_path, preprocessed_path, skip_symbolic_shape=True)
+    quantize_static(preprocessed_path, target_path, Reader(), quant_format=QuantFormat.QDQ, per_channel=True,
+                    activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8, nodes_to_exclude=head_nodes(preprocessed_path))
+  finally:
+    if os.path.exists(preprocessed_path):
+      os.remove(preprocessed_path)
+
+def quantize_nncf(source_path, target_path, calibration):
+  """NNCF post-training quantization of the ONNX model, QDQ placement follows OpenVINO CPU plugin patterns"""
+  import onnx
+  import nncf
+  model = onnx.load(source_path)
+  quantized = nncf.quantize(model, nncf.Dataset(calibration), preset=nncf.QuantizationPreset.MIXED, subset_size=len(calibration),
+                            ignored_scope=nncf.IgnoredScope(names=head_nodes(source_path), validate=False))
+  onnx.save(quantized, target_path)
+
+# method: (quantizer, package defining its behavior)
+QUANTIZERS = {
+  'ort': (quantize_ort, 'onnxruntime'),
+  'nncf': (quantize_nncf, 'nncf'),
+}
+
+def quantize(source_path, target_path, method, batch_size, calibration_size=DEFAULT_CALIBRATION_SIZE):
+  """Places the INT8 model quantized from source_path at target_path, quantization runs once per export cache key"""
+  quantizer, package = QUANTIZERS[method]
+  # Calibration takes the first samples of the pool, compare() evaluates on the following ones
+  parameters = {'quantization': method, 'quantizer': _version(package), 'excluded': 'head',
+                'calibration': {'source': 'dataset', 'offset': 0, 'count': calibration_size, 'batch': batch_size}}
+  cached_export(target_path, source_path, parameters,
+                lambda source, target: quantizer(source, target, calibration_inputs(source, batch_size, calibration_size)))
+  return target_path
+
+def _reference(model, reference_path):
+  runtime = detect_runtime(model)
+  if runtime == 'ort':
+    import onnxruntime as ort
+    sess = ort.InferenceSession(reference_path, providers=model.sess.get_providers())
+    return lambda feed: sess.run([], input_feed=feed)
+  if runtime == 'ov':
+    compiled_model = model.core.compile_model(reference_path, 'CPU')
+    return lambda feed: compiled_model(feed)
+  raise Exception(f'Quantization comparison is not supported for runtime {runtime}')
+
+def _measure(run, runs):
+  run()
+  times = []
+  for _ in range(runs):
+    start = perf_counter()
+    run()
+    times.append(perf_counter() - start)
+  return summary_statistics(times)
+
+def compare(model, runs=DEFAULT_RUNS, evaluation_size=DEFAULT_EVALUATION_SIZE, calibration_size=DEFAULT_CALIBRATION_SIZE):
+  """INT8 backend against its FP32 source model in the same runtime, accuracy is measured on dataset samples
+  following the calibration ones, so it is out of sample"""
+  import accuracy
+  import dataset
+  if getattr(model, 'reference_model_path', None) is None:
+    raise Exception('Quantization comparison is supported only for quantized backends')
+  reference_path = model.get_file_path(model.reference_model_path.format(batch='dyn' if model.dynamic_batch else model.batch_size))
+  reference = _reference(model, reference_path)
+  model.prepare()
+  name = next(iter(model.input_data))
+  feed = dict(model.input_data)
+  results = {
+    'FP32': {'Time': _measure(lambda: reference(feed), runs)},
+    'INT8': {'Time': _measure(model.inference, runs)},
+  }
+  expected, actual = [], []
+  try:
+    for batch in dataset.calibration_batches(model.batch_size, evaluation_size, dataset.sample_shape(model), offset=calibration_size):
+      expected.append(first_output(reference({name: batch})))
+      set_input(model, batch)
+      actual.append(first_output(model.inference()))
+  finally:
+    model.prepare()
+  results['INT8'].update(accuracy.compare_outputs(np.concatenate(expected), np.concatenate(actual)))
+  results['INT8']['Evaluation Samples'] = f'{calibration_size}..{calibration_size + evaluation_size - 1}'
+  return results
+
+def comparison_rows(comparisons):
+  """Builds "Quantization" sheet rows from {batch: results}, deviations are against the FP32 source model"""
+  metrics = ['Evaluation Samples', 'Max Abs Deviation', 'Mean Abs Deviation', 'Relative Deviation', 'Reference Detections', 'Detections', 'Detection Agreement']
+  sheet = [['Batch', 'Precision', 'Average (s)', 'Median (s)', '99th Percentile (s)', 'Throughput (FPS)', 'Speedup vs FP32'] + metrics]
+  for batch, results in comparisons.items():
+    baseline = results['FP32']['Time']['Median']
+    for title, result in results.items():
+      stats = result['Time']
+      sheet.append([batch, title, stats['Average'], stats['Median'], stats['99th Percentile'], batch / stats['Median'] if stats['Median'] else None,
+                    baseline / stats['Median'] if stats['Median'] else None] + [result.get(metric) for metric in metrics])
+    sheet.append([])
+  return sheet
@@ -6,7 +6,17 @@ import platform
 from copy import deepcopy
 from shutil import copy, which
 
-def performance_report(model,model_name, read_times, inference_times, warm_up_times, batches):
+# Above this amount of samples per batch the report switches to a write-only workbook
+STREAMING_THRESHOLD = 10000
+# Amount of points kept for per-run charts in the write-only workbook
+CHART_POINTS = 1000
+
+def performance_report(model,model_name, read_times, inference_times, warm_up_times, batches, streaming=None, extra_sheets=None):
+  if streaming is None:
+    streaming = max([len(inference_times[batch]) for batch in batches] + [0]) > STREAMING_THRESHOLD
+  if streaming:
+    return streaming_performance_report(model, model_name, read_times, inference_times, warm_up_times, batches, extra_sheets)
+  workbook_path = None
   try:
     import openpyxl
     from openpyxl.chart import LineChart, Reference, Series
@@ -244,17 +254,62 @@ def performance_report(model,model_name, read_times, inference_times, warm_up_ti
     inference_sheet.add_chart(chart, get_column_letter(len(batches) + 2) + "33")
     main_sheet.add_chart(deepcopy(chart), "P35")
 
+    try:
+        distribution_sheet = wb.create_sheet("Distribution")
+        _distribution_sheet(distribution_sheet, {batches[idx]: inference_table[idx] for idx in range(len(batches))}, batches)
+    except Exception as e:
+        print(f'{{ "Error": "Failed to generate distribution analysis {e}" }},')
+
+    _extra_sheets(wb, extra_sheets)
+
     report_datetime = datetime.datetime.now()
     main_sheet.title = "Overview"
     main_sheet.column_dimensions[get_column_letter(1)].width = 30
+    _overview_info(main_sheet, model, model_name, batches, report_datetime)
+
+    workbook_path = _save_workbook(wb, model_name, report_datetime)
+
+  except Exception as e:
+    print(f'{{ "Error": "Failed to load openpyxl {e}" }}')
+  return workbook_path
+
+def suite_report(name, results):
+  """Combined workbook and JSON of suite_runner results, one row per case and batch size"""
+  import json
+  import openpyxl
+  report_datetime = datetime.datetime.now()
+  wb = openpyxl.Workbook()
+  sheet = wb.active
+  sheet.title = "Suite"
+  columns = ["Average", "Median", "90th Percentile", "99th Percentile", "Minimum", "Maximum"]
+  sheet.append(["Case", "Description", "Status", "Mode", "Batch", "First Read (s)", "Warm Up (s)"] + [f"{column} (s)" for column in columns] + ["Runs", "Case Time (s)", "Workbook"])
+  for result in results:
+    inference = result.get("Inference") or {None: []}
+    for batch, samples in inference.items():
+      stats = summary_statistics(samples)
+      sheet.append([result["Case"], result.get("Description"), result["Status"], result["Mode"], batch, result.get("First Read"),
+                    result.get("Warm Up", {}).get(batch)] + [stats.get(column) for column in columns] +
+                   [len(samples), result["Time"], result.get("Workbook")])
+  workbook_path = _save_workbook(wb, f"suite_{name}", report_datetime)
+  json_path = os.path.join(os.path.dirname(__file__), 'reports', report_datetime.strftime("%Y%m%d"), workbook_path[:-len('.xlsx')] + '.json')
+  with open(json_path, 'w') as f:
+    json.dump([{key: value for key, value in result.items() if key != "Inference"} for result in results], f, indent=1, default=str)
+  return workbook_path
+
+def _overview_info(main_sheet, model, model_name, batches, report_datetime, merge=True):
+    def merge_last_row(end_column):
+        # Write-only worksheets cannot merge cells
+        if merge:
+            main_sheet.merge_cells(start_row=main_sheet.max_row, start_column=2, end_row=main_sheet.max_row, end_column=end_column)
+
     main_sheet.append(['Model:', model_name])
-    main_sheet.merge_cells(start_row=main_sheet.max_row, start_column=2, end_row=main_sheet.max_row, end_column=10)
+    merge_last_row(10)
     main_sheet.append(['Description:', str(model)])
-    main_sheet.merge_cells(start_row=main_sheet.max_row, start_column=2, end_row=main_sheet.max_row, end_column=10)
+    merge_last_row(10)
     main_sheet.append(['Run Command:', ' '.join(sys.argv)])
-    main_sheet.merge_cells(start_row=main_sheet.max_row, start_column=2, end_row=main_sheet.max_row, end_column=10)
+    merge_last_row(10)
     main_sheet.append(['Report Date:', report_datetime.strftime('%Y-%m-%d %H:%M:%S')])
-    main_sheet.merge_cells(start_row=main_sheet.max_row, start_column=2, end_row=main_sheet.max_row, end_column=6)
+    merge_last_row(6)
     main_sheet.append(['Batches:', *batches])
     main_sheet.append(['Total Inference Runs:', model.total_inference_runs])
     main_sheet.append([])
@@ -267,7 +322,7 @@ def performance_report(model,model_name, read_times, inference_times, warm_up_ti
     except Exception as e:
         main_sheet.append([f'Cannot get OS information {e}'])
     main_sheet.append(['Python Version:', sys.version])
-    main_sheet.merge_cells(start_row=main_sheet.max_row, start_column=2, end_row=main_sheet.max_row, end_column=10)
+    merge_last_row(10)
 
     try:
         main_sheet.append(['CPU:', platform.processor()])
@@ -306,6 +361,31 @@ def performance_report(model,model_name, read_times, inference_times, warm_up_ti
     except Exception as e:
         main_sheet.append([f'Cannot get environment variables {e}'])
 
+def comparison_rows(batches, baseline_title, baseline_times, baseline_warm_up_times, title, times, warm_up_times):
+    """Per batch comparison of two measured variants, difference is relative to the baseline"""
+    rows = [["Batch", f"{baseline_title} Warm Up (s)", f"{title} Warm Up (s)",
+             f"{baseline_title} Average (s)", f"{title} Average (s)",
+             f"{baseline_title} Median (s)", f"{title} Median (s)",
+             f"{baseline_title} 99th Percentile (s)", f"{title} 99th Percentile (s)", "Median Difference (%)"]]
+    for batch in batches:
+        baseline = summary_statistics([item for item in baseline_times.get(batch, []) if not isinstance(item, dict)])
+        variant = summary_statistics([item for item in times.get(batch, []) if not isinstance(item, dict)])
+        if not baseline or not variant:
+            continue
+        rows.append([batch, baseline_warm_up_times.get(batch), warm_up_times.get(batch),
+                     baseline["Average"], variant["Average"], baseline["Median"], variant["Median"],
+                     baseline["99th Percentile"], variant["99th Percentile"],
+                     100 * (variant["Median"] - baseline["Median"]) / baseline["Median"] if baseline["Median"] else None])
+    return rows
+
+def _extra_sheets(wb, extra_sheets):
+    # Additional analysis tables provided by the harness, {sheet name: rows}
+    for title, rows in (extra_sheets or {}).items():
+        sheet = wb.create_sheet(title)
+        for row in rows:
+            sheet.append(row)
+
+def _save_workbook(wb, model_name, report_datetime):
     workbook_path = f"{platform.node().lower()}_{model_name}_{report_datetime.strftime('%Y%m%d_%H%M%S')}.xlsx"
     wb.save(workbook_path)
 
@@ -320,9 +400,378 @@ def performance_report(model,model_name, read_times, inference_times, warm_up_ti
     os.rename(workbook_path, os.path.join(reports_path, workbook_path))
 
     print(f"{{ \"Workbook\": \"{os.path.join(reports_path, workbook_path)}\" }}")
+    return workbook_path
+
+def _percentile(sorted_values, q):
+    # Same interpolation as Excel PERCENTILE.INC
+    if not sorted_values:
+        return None
+    rank = q * (len(sorted_values) - 1)
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+def summary_statistics(values):
+    sorted_values = sorted(values)
+    if not sorted_values:
+        return {}
+    return {
+        "Average": sum(sorted_values) / len(sorted_values),
+        "Median": _percentile(sorted_values, 0.5),
+        "90th Percentile": _percentile(sorted_values, 0.9),
+        "95th Percentile": _percentile(sorted_values, 0.95),
+        "99th Percentile": _percentile(sorted_values, 0.99),
+        "Minimum": sorted_values[0],
+        "Maximum": sorted_values[-1],
+    }
+
+def downsample_lttb(values, threshold):
+    """Largest-Triangle-Three-Buckets downsampling, returns list of (run, value) with 1-based runs"""
+    count = len(values)
+    if threshold >= count or threshold < 3:
+        return [(idx + 1, value) for idx, value in enumerate(values)]
+
+    sampled = [(1, values[0])]
+    bucket_size = (count - 2) / (threshold - 2)
+    prev_index = 0
+    for bucket in range(threshold - 2):
+        # Average point of the next bucket is the third vertex of the triangle
+        next_start = int((bucket + 1) * bucket_size) + 1
+        next_end = max(min(int((bucket + 2) * bucket_size) + 1, count), next_start + 1)
+        next_x = (next_start + next_end - 1) / 2
+        next_y = sum(values[next_start:next_end]) / (next_end - next_start)
+
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        prev_y = values[prev_index]
+        max_area = -1
+        max_index = start
+        for idx in range(start, end):
+            area = abs((prev_index - next_x) * (values[idx] - prev_y) - (prev_index - idx) * (next_y - prev_y))
+            if area > max_area:
+                max_area = area
+                max_index = idx
+        sampled.append((max_index + 1, values[max_index]))
+        prev_index = max_index
+    sampled.append((count, values[-1]))
+    return sampled
+
+# Latency distribution analysis resolution
+HISTOGRAM_BINS = 50
+CDF_POINTS = 200
+TAIL_POINTS = 100
+# Multimodality detection: histogram bins at least, share of runs a mode has to hold, bimodality coefficient threshold
+MIN_MODE_BINS = 5
+MIN_MODE_SHARE = 0.05
+BIMODALITY_THRESHOLD = 5 / 9
+
+def latency_distribution(samples, bin_edges=None):
+    """Log-scaled histogram, empirical CDF, tail quantiles and multimodality estimation of a latency series"""
+    import numpy as np
+
+    values = np.asarray(samples, dtype=np.float64)
+    values = values[values > 0]
+    if values.size < 4:
+        return None
+    if bin_edges is None:
+        bin_edges = np.geomspace(values.min(), values.max() * (1 + 1e-9), HISTOGRAM_BINS + 1)
+    counts, _ = np.histogram(values, bins=bin_edges)
+
+    cdf_levels = np.linspace(0, 1, CDF_POINTS)
+    tail_levels = 1 - np.geomspace(0.1, max(0.1 / values.size, 1e-6), TAIL_POINTS)
+
+    # Sarle's bimodality coefficient on log latency, > 5/9 hints at multimodality
+    log_values = np.log(values)
+    n = log_values.size
+    deviation = log_values - log_values.mean()
+    std = deviation.std()
+    bimodality = None
+    if std > 0 and n > 3:
+        skewness = (deviation ** 3).mean() / std ** 3
+        kurtosis = (deviation ** 4).mean() / std ** 4 - 3
+        bimodality = (skewness ** 2 + 1) / (kurtosis + 3 * (n - 1) ** 2 / ((n - 2) * (n - 3)))
+
+    # Modes are peaks of the smoothed log-histogram which are separated by a deep enough valley and hold
+    # enough runs. Bin count follows the sample count (Freedman-Diaconis), with fixed fine bins few samples
+    # per bin make noise look like peaks
+    q75, q25 = np.percentile(log_values, [75, 25])
+    span = log_values.max() - log_values.min()
+    width = 2 * (q75 - q25) / np.cbrt(n)
+    mode_bins = int(np.clip(np.ceil(span / width) if width > 0 else MIN_MODE_BINS, MIN_MODE_BINS, HISTOGRAM_BINS))
+    mode_counts, mode_edges = np.histogram(log_values, bins=mode_bins)
+    smoothed = np.convolve(mode_counts, np.array([1, 2, 1]) / 4, mode='same')
+    peaks = [idx for idx in range(len(smoothed))
+             if (idx == 0 or smoothed[idx] > smoothed[idx - 1])
+             and (idx == len(smoothed) - 1 or smoothed[idx] >= smoothed[idx + 1])]
+    modes = peaks[:1]
+    for peak in peaks[1:]:
+        valley = smoothed[modes[-1]:peak + 1].min()
+        if valley < 0.5 * min(smoothed[modes[-1]], smoothed[peak]):
+            modes.append(peak)
+        elif smoothed[peak] > smoothed[modes[-1]]:
+            modes[-1] = peak
+    # Runs between neighbouring valleys belong to a mode, small groups are tails rather than modes
+    bounds = [0] + [modes[idx] + int(np.argmin(smoothed[modes[idx]:modes[idx + 1] + 1])) for idx in range(len(modes) - 1)] + [len(mode_counts)]
+    shares = [mode_counts[bounds[idx]:bounds[idx + 1]].sum() / n for idx in range(len(modes))]
+    modes = [mode for mode, share in zip(modes, shares) if share >= MIN_MODE_SHARE] or modes[:1]
+
+    median = float(np.median(values))
+    mad = float(np.median(np.abs(values - median)))
+    outliers = float((values > median + 3 * 1.4826 * mad).mean()) if mad > 0 else 0.0
+
+    return {
+        'bin_edges': bin_edges,
+        'histogram': counts / values.size,
+        'cdf_levels': cdf_levels,
+        'cdf': np.quantile(values, cdf_levels),
+        'tail_levels': tail_levels,
+        'tail': np.quantile(values, tail_levels),
+        'modes': [float(np.exp((mode_edges[idx] + mode_edges[idx + 1]) / 2)) for idx in modes],
+        'bimodality': bimodality,
+        # Separated peaks alone are noisy at small sample counts, the coefficient has to agree
+        'multimodal': len(modes) > 1 and (bimodality is None or bimodality > BIMODALITY_THRESHOLD),
+        'tail_ratio': float(np.quantile(values, 0.99)) / median if median > 0 else None,
+        'outliers': outliers,
+    }
+
+def _distribution_sheet(sheet, samples, batches):
+    """Fills the distribution sheet, uses only append() so it works with write-only workbooks"""
+    import numpy as np
+    from openpyxl.chart import LineChart, ScatterChart, Reference, Series
+    from openpyxl.chart.layout import Layout, ManualLayout
+    from openpyxl.utils import get_column_letter
+
+    values = [item for batch in batches for item in samples[batch] if item > 0]
+    if len(values) < 4:
+        sheet.append(["Not enough samples for distribution analysis"])
+        return
+    # Shared bins so batch sizes can be overlaid on one chart
+    bin_edges = np.geomspace(min(values), max(values) * (1 + 1e-9), HISTOGRAM_BINS + 1)
+    # Batches with less than 4 positive samples have no distribution
+    analyzed = [(batch, latency_distribution(samples[batch], bin_edges)) for batch in batches]
+    batches = [batch for batch, item in analyzed if item is not None]
+    distributions = [item for _, item in analyzed if item is not None]
+    if not distributions:
+        sheet.append(["Not enough samples for distribution analysis"])
+        return
+
+    sheet.column_dimensions[get_column_letter(1)].width = 30
+    sheet.append(["Latency distribution"])
+    sheet.append(["Metric"] + [f"Batch {batch}" for batch in batches])
+    sheet.append(["Multimodal"] + ["Yes" if item['multimodal'] else "No" for item in distributions])
+    sheet.append(["Modes"] + [len(item['modes']) for item in distributions])
+    sheet.append(["Mode Latencies (s)"] + [", ".join(f"{mode:.6f}" for mode in item['modes']) for item in distributions])
+    sheet.append(["Bimodality Coefficient"] + [item['bimodality'] for item in distributions])
+    sheet.append(["99th Percentile / Median"] + [item['tail_ratio'] for item in distributions])
+    sheet.append(["Outliers (> Median + 3 MAD)"] + [item['outliers'] for item in distributions])
+    sheet.append([])
+
+    sheet.append(["Histogram (log-scaled bins, share of runs)"])
+    sheet.append(["Bin Center (s)"] + [f"Batch {batch}" for batch in batches])
+    histogram_row = 12
+    for idx in range(HISTOGRAM_BINS):
+        sheet.append([float(np.sqrt(bin_edges[idx] * bin_edges[idx + 1]))] + [float(item['histogram'][idx]) for item in distributions])
+    sheet.append([])
+
+    sheet.append(["Empirical CDF"])
+    header = ["Percentile"]
+    for batch in batches:
+        header.append(f"Time (Batch {batch})")
+    sheet.append(header)
+    cdf_row = histogram_row + HISTOGRAM_BINS + 3
+    for idx in range(CDF_POINTS):
+        sheet.append([float(distributions[0]['cdf_levels'][idx])] + [float(item['cdf'][idx]) for item in distributions])
+    sheet.append([])
+
+    sheet.append(["Tail (90th percentile and above)"])
+    sheet.append(["Percentile"] + [f"Time (Batch {batch})" for batch in batches])
+    tail_row = cdf_row + CDF_POINTS + 3
+    for idx in range(TAIL_POINTS):
+        sheet.append([float(distributions[0]['tail_levels'][idx])] + [float(item['tail'][idx]) for item in distributions])
+
+    anchor_col = get_column_letter(len(batches) + 3)
+    chart = LineChart()
+    chart.title = "Latency histogram"
+    chart.x_axis.title = "Time (s), log-scaled bins"
+    chart.y_axis.title = "Share of runs"
+    chart.x_axis.delete = False
+    chart.y_axis.delete = False
+    chart.x_axis.number_format = '0.00E+00'
+    for batch_index in range(len(batches)):
+        column = 2 + batch_index
+        chart.series.append(Series(values=Reference(sheet, min_col=column, min_row=histogram_row, max_row=histogram_row + HISTOGRAM_BINS - 1), title=f"Batch {batches[batch_index]}"))
+    chart.set_categories(Reference(sheet, min_col=1, min_row=histogram_row, max_row=histogram_row + HISTOGRAM_BINS - 1))
+    chart.width = 25
+    chart.legend.position = 'b'
+    chart.layout = Layout(manualLayout=ManualLayout(x=0.02, y=0.02, h=0.65, w=0.9))
+    sheet.add_chart(chart, anchor_col + "1")
+
+    for title, first_row, points, anchor_row, min_level in [("Empirical CDF", cdf_row, CDF_POINTS, 16, 0), ("Tail latency", tail_row, TAIL_POINTS, 31, 0.9)]:
+        chart = ScatterChart()
+        chart.title = title
+        chart.x_axis.title = "Time (s)"
+        chart.y_axis.title = "Percentile"
+        chart.x_axis.scaling.logBase = 10
+        chart.y_axis.scaling.min = min_level
+        chart.y_axis.scaling.max = 1
+        chart.x_axis.delete = False
+        chart.y_axis.delete = False
+        y_values = Reference(sheet, min_col=1, min_row=first_row, max_row=first_row + points - 1)
+        for batch_index in range(len(batches)):
+            x_values = Reference(sheet, min_col=2 + batch_index, min_row=first_row, max_row=first_row + points - 1)
+            series = Series(y_values, x_values, title=f"Batch {batches[batch_index]}")
+            series.marker.symbol = "none"
+            chart.series.append(series)
+        chart.width = 25
+        chart.legend.position = 'b'
+        chart.layout = Layout(manualLayout=ManualLayout(x=0.02, y=0.02, h=0.65, w=0.9))
+        sheet.add_chart(chart, anchor_col + str(anchor_row))
+
+    for batch_index in range(len(batches)):
+        if distributions[batch_index]['multimodal']:
+            print(f'{{ "Warning": "Multimodal latency distribution for batch {batches[batch_index]}, modes at {distributions[batch_index]["modes"]}" }},')
+
+def streaming_performance_report(model, model_name, read_times, inference_times, warm_up_times, batches, extra_sheets=None):
+  workbook_path = None
+  try:
+    import openpyxl
+    from openpyxl.chart import LineChart, ScatterChart, Reference, Series
+    from openpyxl.chart.layout import Layout, ManualLayout
+    from openpyxl.utils import get_column_letter
+
+    # Write-only workbook streams rows to disk, sheets have to be filled in order
+    wb = openpyxl.Workbook(write_only=True)
+    main_sheet = wb.create_sheet("Overview")
+    read_sheet = wb.create_sheet("Read")
+    inference_sheet = wb.create_sheet("Inference")
+    distribution_sheet = wb.create_sheet("Distribution")
+    samples_sheet = wb.create_sheet("Samples")
+    _extra_sheets(wb, extra_sheets)
+
+    metrics = ["Average", "Median", "90th Percentile", "95th Percentile", "99th Percentile", "Minimum", "Maximum"]
+    percentiles = ["Average", "Median", "90th Percentile", "95th Percentile", "99th Percentile"]
+
+    read_samples = [item for item in read_times[:-1] if not isinstance(item, dict)]
+    read_stats = summary_statistics(read_samples)
+    read_sheet.append(["Reading times"])
+    for metric in metrics:
+        read_sheet.append([metric, read_stats.get(metric)])
+    read_sheet.append(["Run", "Time (s)"])
+    offset_row = len(metrics) + 3
+    for idx, item in enumerate(read_samples):
+        read_sheet.append([idx + 1, item])
+
+    chart = LineChart()
+    chart.series.append(Series(values=Reference(read_sheet, min_col=2, min_row=offset_row, max_col=2, max_row=offset_row + max(len(read_samples), 1) - 1), title="Reading times"))
+    chart.title = "Reading times"
+    chart.x_axis.title = "Run"
+    chart.y_axis.title = "Time (s)"
+    chart.x_axis.delete = False
+    chart.y_axis.delete = False
+    chart.legend = None
+    chart.layout = Layout(manualLayout=ManualLayout(x=0.02, y=0.02, h=0.75, w=0.9))
+    read_sheet.add_chart(chart, "D1")
+    main_sheet.add_chart(deepcopy(chart), "F35")
+
+    # Precomputed summary table, same layout as the regular report
+    samples = {batch: [item for item in inference_times[batch] if not isinstance(item, dict)] for batch in batches}
+    stats = {batch: summary_statistics(samples[batch]) for batch in batches}
+    y_axis_max = max([stats[batch].get("Maximum", 0) for batch in batches] + [0])
+
+    inference_sheet.column_dimensions[get_column_letter(1)].width = 30
+    inference_sheet.append(["Inference times"])
+    inference_sheet.append(["Metric"] + [f"Batch {batch}" for batch in batches])
+    offset_col = 2
+    offset_stat_row = 3
+    for metric in metrics:
+        inference_sheet.append([metric] + [stats[batch].get(metric) for batch in batches])
+    for metric in percentiles:
+        inference_sheet.append([f"IPS ({metric})"] + [1 / stats[batch][metric] if stats[batch].get(metric) else None for batch in batches])
+    for metric in percentiles:
+        inference_sheet.append([f"BPS ({metric})"] + [batch / stats[batch][metric] if stats[batch].get(metric) else None for batch in batches])
+    inference_sheet.append(["Warm Up Time"] + [warm_up_times.get(batch) for batch in batches])
+    inference_sheet.append(["Samples"] + [len(samples[batch]) for batch in batches])
+
+    # Downsampled series feeding the run chart, raw samples are only on the Samples sheet
+    inference_sheet.append([])
+    inference_sheet.append([f"Downsampled to {CHART_POINTS} points"])
+    header = ["Point"]
+    for batch in batches:
+        header.extend([f"Run (Batch {batch})", f"Time (Batch {batch})"])
+    inference_sheet.append(header)
+    offset_row = offset_stat_row + len(metrics) + 2 * len(percentiles) + 5
+    downsampled = [downsample_lttb(samples[batch], CHART_POINTS) for batch in batches]
+    points = max([len(item) for item in downsampled] + [1])
+    for idx in range(points):
+        row = [idx + 1]
+        for batch_index in range(len(batches)):
+            row.extend(downsampled[batch_index][idx] if idx < len(downsampled[batch_index]) else (None, None))
+        inference_sheet.append(row)
+
+    batch_titles = Reference(inference_sheet, min_col=offset_col, min_row=offset_stat_row - 1, max_col=offset_col + len(batches) - 1, max_row=offset_stat_row - 1)
+    charts = [
+        ("Metrics", "Time (s)", metrics, 0, 25, get_column_letter(len(batches) + 2) + "1", "F5"),
+        ("IPS", "Inferences Per Second", percentiles, len(metrics), 15, get_column_letter(len(batches) + 2) + "16", "F20"),
+        ("BPS", "Batches Per Second", percentiles, len(metrics) + len(percentiles), 15, get_column_letter(len(batches) + 11) + "16", "P20"),
+    ]
+    for title, y_title, chart_metrics, first_row, width, anchor, main_anchor in charts:
+        chart = LineChart()
+        chart.title = title
+        chart.x_axis.title = "Batch Size"
+        chart.y_axis.title = y_title
+        chart.x_axis.delete = False
+        chart.y_axis.delete = False
+        for metric_index in range(len(chart_metrics)):
+            row = offset_stat_row + first_row + metric_index
+            series = Series(values=Reference(inference_sheet, min_col=offset_col, min_row=row, max_col=offset_col + len(batches) - 1, max_row=row), title=f"{chart_metrics[metric_index]}")
+            series.marker.symbol = "circle"
+            series.marker.size = 6
+            chart.series.append(series)
+        chart.set_categories(batch_titles)
+        chart.legend.position = 'b'
+        chart.layout = Layout(manualLayout=ManualLayout(x=0.02, y=0.02, h=0.65, w=0.9))
+        chart.width = width
+        inference_sheet.add_chart(chart, anchor)
+        main_sheet.add_chart(deepcopy(chart), main_anchor)
+
+    chart = ScatterChart()
+    chart.title = "Inference times"
+    chart.x_axis.title = "Run"
+    chart.y_axis.title = "Time (s)"
+    chart.y_axis.scaling.min = 0
+    chart.y_axis.scaling.max = y_axis_max
+    chart.x_axis.delete = False
+    chart.y_axis.delete = False
+    for batch_index in range(len(batches)):
+        last_row = offset_row + max(len(downsampled[batch_index]), 1) - 1
+        x_values = Reference(inference_sheet, min_col=offset_col + 2 * batch_index, min_row=offset_row, max_row=last_row)
+        y_values = Reference(inference_sheet, min_col=offset_col + 2 * batch_index + 1, min_row=offset_row, max_row=last_row)
+        series = Series(y_values, x_values, title=f"Batch {batches[batch_index]}")
+        series.marker.symbol = "none"
+        chart.series.append(series)
+    chart.width = 15
+    chart.legend.position = 'b'
+    chart.layout = Layout(manualLayout=ManualLayout(x=0.02, y=0.02, h=0.65, w=0.9))
+    inference_sheet.add_chart(chart, get_column_letter(2 * len(batches) + 3) + "33")
+    main_sheet.add_chart(deepcopy(chart), "P35")
+
+    try:
+        _distribution_sheet(distribution_sheet, samples, batches)
+    except Exception as e:
+        print(f'{{ "Error": "Failed to generate distribution analysis {e}" }},')
+
+    samples_sheet.append(["Run"] + [f"Batch {batch}" for batch in batches])
+    for idx in range(max([len(samples[batch]) for batch in batches] + [0])):
+        samples_sheet.append([idx + 1] + [samples[batch][idx] if idx < len(samples[batch]) else None for batch in batches])
+
+    report_datetime = datetime.datetime.now()
+    main_sheet.column_dimensions[get_column_letter(1)].width = 30
+    _overview_info(main_sheet, model, model_name, batches, report_datetime, merge=False)
+
+    workbook_path = _save_workbook(wb, model_name, report_datetime)
 
   except Exception as e:
-    print(f'{{ "Error": "Failed to load openpyxl {e}" }}')
+    print(f'{{ "Error": "Failed to generate streaming report {e}" }}')
   return workbook_path
 
 def _run(cmd, timeout=5):
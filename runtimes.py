@@ -0,0 +1,60 @@
+import sys
+
+# Backends are not sharing a base class per runtime, so runtime is detected
+# by the attributes every backend of the same runtime has
+def detect_runtime(model):
+  if isinstance(getattr(model, 'sess_data', None), dict):
+    return 'ort'
+  if hasattr(model, 'core') and hasattr(model, 'compiled_model'):
+    return 'ov'
+  if 'torch' in sys.modules and hasattr(model, 'device'):
+    return 'torch'
+  if 'migraphx' in sys.modules:
+    return 'migx'
+  return None
+
+def ort_session_options(model):
+  import onnxruntime as ort
+  options = model.sess_data.get('sess_options')
+  if options is None:
+    options = ort.SessionOptions()
+    model.sess_data['sess_options'] = options
+  return options
+
+def ov_device(model):
+  return getattr(model, 'device', 'CPU')
+
+def torch_module(model):
+  import torch
+  module = getattr(model, 'model', None)
+  # Ultralytics YOLO wraps the network into .model, the wrapper is a Module too but its __call__ runs the predictor
+  if module is not None and (not isinstance(module, torch.nn.Module) or hasattr(module, 'predictor')):
+    module = getattr(module, 'model', None)
+  return module if isinstance(module, torch.nn.Module) else None
+
+def set_input(model, array):
+  """Replaces model input with a NCHW float32 batch, keeping the input structure prepare() created"""
+  current = getattr(model, 'input_data', None)
+  if isinstance(current, dict):
+    name = next(iter(current)) if current else 'images'
+    model.input_data = {name: array}
+  elif detect_runtime(model) == 'torch':
+    import torch
+    tensor = torch.from_numpy(array).to(model.device)
+    if current is not None and current.dtype != tensor.dtype:
+      tensor = tensor.to(current.dtype)
+    model.input_data = tensor
+  else:
+    model.input_data = array
+
+def first_output(result):
+  """First output of inference() as numpy array (ORT list, OV OVDict, torch tensor)"""
+  if isinstance(result, (list, tuple)):
+    result = result[0]
+  elif hasattr(result, 'to_tuple'):
+    result = result.to_tuple()[0]
+  if hasattr(result, 'detach'):
+    result = result.detach().cpu().numpy()
+  if not hasattr(result, 'shape'):
+    raise Exception(f'Inference result of type {type(result).__name__} is not a raw output tensor')
+  return result
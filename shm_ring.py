@@ -0,0 +1,171 @@
+import os
+import sys
+import json
+import time
+import multiprocessing as mp
+from time import perf_counter
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+import numpy as np
+
+DEFAULT_SLOTS = 4
+DEFAULT_FRAMES = 256
+FRAME_SHAPE = (3, 640, 640)
+# head, tail, slots
+HEADER = 3
+ALIGNMENT = 64
+
+class ShmRing:
+  """Single producer, single consumer ring of batch slots in shared memory
+
+  Producer and consumer only publish their own counter (head and tail) after the slot is written or
+  read, so no lock is needed; several producers use a ring each. Slots are handed out as numpy views.
+  """
+  def __init__(self, name=None, slots=DEFAULT_SLOTS, shape=(1,) + FRAME_SHAPE, dtype=np.float32, create=True):
+    self.slots = slots
+    self.shape = tuple(shape)
+    self.dtype = np.dtype(dtype)
+    self.slot_size = -(-int(np.prod(self.shape)) * self.dtype.itemsize // ALIGNMENT) * ALIGNMENT
+    # Header and per-slot timestamps share the first aligned block
+    self.data_offset = -(-(HEADER + slots) * 8 // ALIGNMENT) * ALIGNMENT
+    size = self.data_offset + self.slot_size * slots
+    self.shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+    self.name = self.shm.name
+    self.owner = create
+    self.header = np.ndarray((HEADER,), dtype=np.int64, buffer=self.shm.buf)
+    self.timestamps = np.ndarray((slots,), dtype=np.float64, buffer=self.shm.buf, offset=HEADER * 8)
+    self.views = [np.ndarray(self.shape, dtype=self.dtype, buffer=self.shm.buf, offset=self.data_offset + idx * self.slot_size) for idx in range(slots)]
+    if create:
+      self.header[:] = [0, 0, slots]
+
+  def spec(self):
+    """Picklable description for attaching from another process"""
+    return {'name': self.name, 'slots': self.slots, 'shape': self.shape, 'dtype': self.dtype.str}
+
+  @classmethod
+  def attach(cls, spec):
+    return cls(spec['name'], spec['slots'], spec['shape'], spec['dtype'], create=False)
+
+  @contextmanager
+  def put(self):
+    """Waits for a free slot and yields its view, the slot is published on exit"""
+    # Latency counts from the request to send, waiting for a free slot included, same as a blocking Queue.put()
+    start = perf_counter()
+    head = int(self.header[0])
+    while head - int(self.header[1]) >= self.slots:
+      time.sleep(0)
+    slot = head % self.slots
+    yield self.views[slot]
+    self.timestamps[slot] = start
+    self.header[0] = head + 1
+
+  @contextmanager
+  def get(self):
+    """Waits for a published slot and yields (view, send request timestamp), the slot is freed on exit"""
+    tail = int(self.header[1])
+    while int(self.header[0]) <= tail:
+      time.sleep(0)
+    slot = tail % self.slots
+    yield self.views[slot], float(self.timestamps[slot])
+    self.header[1] = tail + 1
+
+  def close(self):
+    # Views keep the buffer exported, they have to go before the mapping is closed
+    self.views = self.header = self.timestamps = None
+    self.shm.close()
+    if self.owner:
+      self.shm.unlink()
+
+def _frames(shape):
+  return np.random.default_rng(0).random(shape, dtype=np.float32)
+
+def _produce_shm(spec, messages):
+  ring = ShmRing.attach(spec)
+  source = _frames(ring.shape)
+  for _ in range(messages):
+    with ring.put() as view:
+      # Decoder output is written straight into the slot
+      np.copyto(view, source)
+  ring.close()
+
+def _produce_queue(queue, shape, messages):
+  source = _frames(shape)
+  for _ in range(messages):
+    queue.put((perf_counter(), source))
+
+def _consume(receive, messages, batch):
+  latencies = []
+  start = None
+  for _ in range(messages):
+    timestamp = receive()
+    now = perf_counter()
+    start = start if start is not None else timestamp
+    latencies.append(now - timestamp)
+  elapsed = perf_counter() - start
+  frame_bytes = int(np.prod(FRAME_SHAPE)) * 4
+  return {
+    'Throughput (FPS)': messages * batch / elapsed,
+    'Throughput (MB/s)': messages * batch * frame_bytes / elapsed / 1024 / 1024,
+    'Latency Median (s)': float(np.median(latencies)),
+    'Latency 99th Percentile (s)': float(np.percentile(latencies, 99)),
+  }
+
+def benchmark(batch, frames=DEFAULT_FRAMES, slots=DEFAULT_SLOTS):
+  """Producer process to consumer throughput and latency of the shared memory ring and of multiprocessing.Queue,
+  both consumers copy every message into the same model input buffer"""
+  messages = max(16, frames // batch)
+  shape = (batch,) + FRAME_SHAPE
+  results = {'Batch': batch, 'Messages': messages, 'Slots': slots}
+  inputs = np.empty(shape, dtype=np.float32)
+
+  ring = ShmRing(slots=slots, shape=shape)
+  try:
+    producer = mp.Process(target=_produce_shm, args=(ring.spec(), messages), daemon=True)
+    producer.start()
+    def receive():
+      with ring.get() as (view, timestamp):
+        # Slot is read in place while it is still owned by the consumer, the producer reuses it after the block
+        np.copyto(inputs, view)
+      return timestamp
+    results['Shared Memory'] = _consume(receive, messages, batch)
+    producer.join()
+  finally:
+    ring.close()
+
+  queue = mp.Queue(maxsize=slots)
+  producer = mp.Process(target=_produce_queue, args=(queue, shape, messages), daemon=True)
+  producer.start()
+  def receive_queue():
+    timestamp, frames = queue.get()
+    np.copyto(inputs, frames)
+    return timestamp
+  results['Queue'] = _consume(receive_queue, messages, batch)
+  producer.join()
+  return results
+
+def run_benchmark(batch, frames=DEFAULT_FRAMES, slots=DEFAULT_SLOTS):
+  """Runs benchmark() in a separate interpreter, the harness script is not import safe for spawned processes"""
+  import subprocess
+  result = subprocess.run([sys.executable, os.path.abspath(__file__), '--batch', str(batch), '--frames', str(frames), '--slots', str(slots)],
+                          capture_output=True, text=True)
+  if result.returncode != 0:
+    raise Exception(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else f'exit code {result.returncode}')
+  return json.loads(result.stdout)
+
+def benchmark_rows(results):
+  """Builds "IPC" sheet rows from {batch: results}"""
+  metrics = ['Throughput (FPS)', 'Throughput (MB/s)', 'Latency Median (s)', 'Latency 99th Percentile (s)']
+  sheet = [['Batch', 'Transport'] + metrics + ['Messages', 'Slots']]
+  for batch, result in results.items():
+    for transport in ['Shared Memory', 'Queue']:
+      sheet.append([batch, transport] + [result[transport][metric] for metric in metrics] + [result['Messages'], result['Slots']])
+    sheet.append([batch, 'Shared Memory Speedup', result['Shared Memory']['Throughput (FPS)'] / result['Queue']['Throughput (FPS)']])
+    sheet.append([])
+  return sheet
+
+if __name__ == '__main__':
+  arguments = {'--batch': 1, '--frames': DEFAULT_FRAMES, '--slots': DEFAULT_SLOTS}
+  for key in arguments:
+    if key in sys.argv:
+      arguments[key] = int(sys.argv[sys.argv.index(key) + 1])
+  print(json.dumps(benchmark(arguments['--batch'], arguments['--frames'], arguments['--slots'])))
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+import os
+import sys
+import gc
+import json
+import runpy
+import subprocess
+from time import perf_counter
+
+script_folder = os.path.dirname(os.path.abspath(__file__))
+test_perf_path = os.path.join(script_folder, 'test_perf.py')
+
+def help_message():
+  print("""
+Suite Runner - runs many test_perf.py cases in one invocation
+
+Usage: python suite_runner.py <suite.json> [--fake] [--case <pattern>] [--batch-size <list>] [--only-prepare]
+
+Suite file:
+  {
+    "name": "cpu_matrix",
+    "batches": [1, 4],                     default batch sizes of every case
+    "runs": 100,                           default inference runs of every case
+    "arguments": ["--stream-report"],      default extra test_perf.py arguments
+    "cases": [
+      "models.yolo8n.ort",
+      "models.synth.*",                    every backend of a family
+      {"case": "models.yolo8n.ov", "batches": [1, 8], "runs": 200, "arguments": ["--breakdown"]},
+      {"case": "models.yolo8n.ort_ov", "isolate": true}
+    ]
+  }
+
+Cases run in this interpreter one after another, grouped by runtime across families, so exported
+models, generated inputs and imported frameworks are reused. Torch cases and cases with
+"isolate": true run in a separate interpreter, torch keeps process-wide settings (threads, oneDNN
+fusion, compile caches) between cases; "isolate": false runs a torch case in-process, after the
+other runtimes. --batch-size and --only-prepare override the suite for every case. Results of all
+cases are combined into one suite workbook and JSON file.
+""")
+
+def expand(pattern):
+  """models.<family>.* lists backend modules of a family without importing them"""
+  if not pattern.endswith('.*'):
+    return [pattern]
+  directory = os.path.join(script_folder, *pattern[:-2].split('.'))
+  names = sorted(name[:-3] for name in os.listdir(directory) if name.endswith('.py') and name != 'common.py' and not name.startswith('_'))
+  return [f'{pattern[:-2]}.{name}' for name in names]
+
+def load_suite(path):
+  with open(path, 'r') as f:
+    suite = json.load(f)
+  defaults = {'batches': suite.get('batches', [1]), 'runs': suite.get('runs'), 'arguments': suite.get('arguments', []), 'isolate': suite.get('isolate')}
+  cases = []
+  for entry in suite.get('cases', []):
+    entry = {'case': entry} if isinstance(entry, str) else dict(entry)
+    for case in expand(entry['case']):
+      case = dict(defaults, **{key: value for key, value in entry.items() if key != 'case'}, case=case)
+      if case['isolate'] is None:
+        case['isolate'] = runtime_group(case['case']) == 'torch'
+      cases.append(case)
+  return suite.get('name', os.path.splitext(os.path.basename(path))[0]), cases
+
+def runtime_group(case):
+  # Backend file names start with the runtime: ort_cuda_fp16 -> ort, ov_fp16 -> ov, migx_cache -> migx
+  parts = case.split('.')
+  return parts[-1].split('_')[0]
+
+def order(cases):
+  """Isolated cases last, in-process cases grouped by runtime (shared imports) and then by family (shared exports),
+  torch runs after every other runtime as it changes process-wide settings"""
+  return sorted(cases, key=lambda item: (item['isolate'], runtime_group(item['case']) == 'torch', runtime_group(item['case']),
+                                         '.'.join(item['case'].split('.')[:-1]), item['case']))
+
+def arguments(case):
+  argv = [case['case'], '--batch-size', ','.join(map(str, case['batches']))]
+  if case.get('runs'):
+    argv += ['--runs', str(case['runs'])]
+  return argv + list(case['arguments'])
+
+def _samples(values):
+  # test_perf appends a summary dict after the samples
+  return [value for value in values if isinstance(value, float)]
+
+def run_in_process(case):
+  saved_argv = sys.argv
+  sys.argv = [test_perf_path] + arguments(case)
+  result = {'Case': case['case'], 'Mode': 'in-process'}
+  start = perf_counter()
+  try:
+    namespace = runpy.run_path(test_perf_path, run_name='__main__')
+    result['Description'] = str(namespace['model'])
+    result['First Read'] = namespace.get('first_read_time')
+    result['Warm Up'] = namespace.get('warm_up_times', {})
+    result['Inference'] = {batch: _samples(values) for batch, values in namespace.get('inference_times', {}).items()}
+    result['Workbook'] = namespace.get('report_path')
+    result['Status'] = 'Done'
+  except SystemExit as e:
+    # test_perf exits on --only-prepare and when a backend cannot be loaded
+    result['Status'] = 'Done' if not e.code else 'Failed'
+  except Exception as e:
+    print(f'{{ "Error": "Case {case["case"]} failed {e}" }},')
+    result['Status'] = 'Failed'
+    result['Error'] = str(e)
+  finally:
+    sys.argv = saved_argv
+    namespace = None
+    gc.collect()
+  result['Time'] = perf_counter() - start
+  return result
+
+def run_isolated(case):
+  """Runs the case in-process in a child interpreter, its result comes back as JSON with the same fields"""
+  import tempfile
+  start = perf_counter()
+  with tempfile.TemporaryDirectory() as directory:
+    result_path = os.path.join(directory, 'result.json')
+    completed = subprocess.run([sys.executable, os.path.abspath(__file__), '--isolated-case', json.dumps(case), result_path], cwd=os.getcwd())
+    try:
+      with open(result_path, 'r') as f:
+        result = json.load(f)
+      # JSON object keys are strings, batch sizes are numbers everywhere else
+      for field in ('Warm Up', 'Inference'):
+        result[field] = {int(batch): value for batch, value in result.get(field, {}).items()}
+    except Exception:
+      result = {'Case': case['case'], 'Status': 'Failed', 'Error': f'exit code {completed.returncode}'}
+  result['Mode'] = 'isolated'
+  result['Time'] = perf_counter() - start
+  return result
+
+def run_suite(path, fake=False, case_filter=None, batches=None, only_prepare=False):
+  name, cases = load_suite(path)
+  cases = order([case for case in cases if case_filter is None or case_filter in case['case']])
+  for case in cases:
+    if batches:
+      case['batches'] = batches
+    if only_prepare:
+      case['arguments'] = list(case['arguments']) + ['--only-prepare']
+  print(f'{{ "Suite": "{name}", "Cases": {len(cases)} }},')
+  results = []
+  for case in cases:
+    print(f'{{ "Suite Case": "{case["case"]}", "Command": "{" ".join(arguments(case))}", "Isolate": {str(case["isolate"]).lower()} }},')
+    if fake:
+      continue
+    results.append(run_isolated(case) if case['isolate'] else run_in_process(case))
+  if fake:
+    return results
+  try:
+    import reports
+    reports.suite_report(name, results)
+  except Exception as e:
+    print(f'{{ "Error": "Failed to generate suite report {e}" }},')
+  return results
+
+if __name__ == '__main__':
+  if len(sys.argv) > 3 and sys.argv[1] == '--isolated-case':
+    result = run_in_process(json.loads(sys.argv[2]))
+    with open(sys.argv[3], 'w') as f:
+      json.dump(result, f, default=str)
+    exit(0 if result['Status'] == 'Done' else 1)
+  if len(sys.argv) < 2 or sys.argv[1] in ('--help', '-h', '-help'):
+    help_message()
+    exit(0)
+  case_filter = sys.argv[sys.argv.index('--case') + 1] if '--case' in sys.argv else None
+  batches = [int(x) for x in sys.argv[sys.argv.index('--batch-size') + 1].split(',')] if '--batch-size' in sys.argv else None
+  run_suite(sys.argv[1], '--fake' in sys.argv, case_filter, batches, '--only-prepare' in sys.argv)
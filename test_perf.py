@@ -3,6 +3,12 @@ import sys
 from time import perf_counter
 import platform
 
+if '--list' in sys.argv:
+  # Static scan of the models tree with cached runtime probes, no backend is imported
+  import discovery
+  discovery.print_list('--refresh' in sys.argv)
+  exit(0)
+
 model_name = sys.argv[1] if len(sys.argv) > 1 else 'test_model'
 
 print(f'{{ "Model": "{model_name}",')
@@ -41,15 +47,16 @@ if '--batch-size' in sys.argv:
     print(f'{{ "Error": "Failed to set batch size {e}, using default [{', '.join(batches)}]" }},')
 
 mul_time = []
-def checkpoint(do_reset = True):
+# excluded is the time spent outside of the measured work since the first checkpoint (e.g. feeding inputs)
+def checkpoint(do_reset = True, excluded = 0.0):
   global mul_time
   if do_reset:
     mul_time = []
-  mul_time.append(perf_counter())
+  mul_time.append(perf_counter() - excluded)
 
-def spent(category):
+def spent(category, excluded = 0.0):
   global mul_time
-  mul_time.append(perf_counter())
+  mul_time.append(perf_counter() - excluded)
   spent_time = mul_time[-1] - mul_time[0]
   print(f'{{ "{category}" : "{spent_time}" }},')
 
@@ -60,10 +67,63 @@ if '--runs' in sys.argv:
   except Exception as e:
     print(f'{{ "Error": "Failed to set runs {e}, using default {model.total_inference_runs} runs" }},')
 
+artifact_cache = None
+if '--artifact-cache' in sys.argv:
+  try:
+    import artifact_cache as artifact_cache_module
+    max_size = artifact_cache_module.DEFAULT_CACHE_SIZE
+    if '--artifact-cache-size' in sys.argv:
+      max_size = int(sys.argv[sys.argv.index('--artifact-cache-size') + 1]) * 1024 * 1024
+    artifact_cache = artifact_cache_module.attach(model, max_size)
+  except Exception as e:
+    print(f'{{ "Error": "Failed to attach artifact cache {e}" }},')
+
+if '--dataset' in sys.argv:
+  try:
+    import dataset
+    dataset_size = dataset.DEFAULT_POOL_SIZE
+    if '--dataset-size' in sys.argv:
+      dataset_size = int(sys.argv[sys.argv.index('--dataset-size') + 1])
+    dataset.attach(model, dataset_size)
+  except Exception as e:
+    print(f'{{ "Error": "Failed to attach input dataset {e}" }},')
+
+def open_input_dataset():
+  # Pool is created for the prepared input shape before measuring, a failure leaves the prepared input in place
+  if model.input_dataset is None:
+    return
+  try:
+    model.input_dataset.open(model)
+  except Exception as e:
+    print(f'{{ "Error": "Failed to open input dataset {e}" }},')
+    model.input_dataset = None
+
+torch_settings = {}
+if any(item.startswith('--torch-') and item not in ('--torch-tuning', '--torch-mode', '--torch-modes', '--torch-precision') for item in sys.argv):
+  try:
+    import torch_tuning
+    torch_settings = torch_tuning.settings_from_args(sys.argv)
+    torch_tuning.enable(model, torch_settings)
+    print(f'{{ "Torch Settings": "{", ".join(f"{key}={value}" for key, value in torch_settings.items())}" }},')
+  except Exception as e:
+    print(f'{{ "Error": "Failed to apply torch settings {e}" }},')
+
+dynamic_batch_compare = '--dynamic-batch-compare' in sys.argv
+if '--dynamic-batch' in sys.argv or dynamic_batch_compare:
+  if model.supports_dynamic_batch:
+    model.dynamic_batch = True
+  else:
+    print(f'{{ "Error": "Model {model_name} does not support dynamic batch, using static batch sizes" }},')
+
 checkpoint()
-for batch in batches:
-  print(f'{{ "Preparing Batch Size": {batch} }},')
-  model.prepare_batch(batch)
+if '--prepare-workers' in sys.argv:
+  # Export and compilation run in isolated processes, this process only loads finished artifacts
+  import prepare_service
+  prepare_service.prepare(model_name, model, batches, int(sys.argv[sys.argv.index('--prepare-workers') + 1]))
+else:
+  for batch in batches:
+    print(f'{{ "Preparing Batch Size": {batch} }},')
+    model.prepare_batch(batch)
 spent("Total Preparing Batches")
 
 if '--only-prepare' in sys.argv:
@@ -74,6 +134,13 @@ if '--only-prepare' in sys.argv:
   print('] }')
   exit(0)
 
+# Measuring timer resolution and cost of the harness loop itself
+import calibration
+harness_calibration = calibration.calibrate(checkpoint, lambda: mul_time)
+harness_overhead = harness_calibration['Harness Overhead (median)']
+subtract_overhead = '--subtract-overhead' in sys.argv
+print(f'{{ "Timer Resolution": {harness_calibration["Timer Tick (minimum)"]}, "Harness Overhead": {harness_overhead}, "Overhead Subtracted": {str(subtract_overhead).lower()} }},')
+
 checkpoint()
 model.read1st()
 spent("Model 1st Read")
@@ -119,13 +186,54 @@ print('},')
 
 read_times.append({"Minimum": min_time, "Maximum": max_time, "Average": avg_time})
 
+if artifact_cache is not None:
+  # 1st read populates the cache on miss, following reads start warm
+  print(f'{{ "Cold Read": {first_read_time}, "Warm Read": {avg_time} }},')
+
 model.batch_size = None
 inference_times = {}
 warm_up_times = {}
+report_sheets = {}
+report_sheets["Calibration"] = calibration.calibration_rows(harness_calibration, subtract_overhead)
+
+breakdowns = {}
+graph_optimizations = {}
+preprocessing = {}
+postprocessing = {}
+pipelines = {}
+zero_copy_comparisons = {}
+ipc_benchmarks = {}
+torch_tunings = {}
+torch_modes_comparisons = {}
+torch_precisions = {}
+quantizations = {}
+ov_async_benchmarks = {}
+if hasattr(model, 'torch_mode'):
+  import torch_modes
+  print(f'{{ "Torch Mode": "{torch_modes.MODES[model.torch_mode]}" }},')
+zero_copy_inference = '--zero-copy' in sys.argv
+if zero_copy_inference or '--zero-copy-compare' in sys.argv:
+  import zero_copy
+op_profiles = {}
+if '--op-profile' in sys.argv:
+  import op_profile
+  op_profile_runs = op_profile.DEFAULT_PROFILE_RUNS
+  if '--op-profile-runs' in sys.argv:
+    try:
+      op_profile_runs = int(sys.argv[sys.argv.index('--op-profile-runs') + 1])
+    except Exception as e:
+      print(f'{{ "Error": "Failed to set operator profiling runs {e}, using default {op_profile_runs} runs" }},')
 
 for batch in batches:
   print(f"{{ \"Running Batch\": {batch} }},")
-  if model.batch_size is None or model.batch_size != batch:
+  if model.dynamic_batch and model.batch_size is not None and model.batch_size != batch:
+    # Same session serves every batch size, only the new input shape is warmed up
+    model.batch_size = batch
+    checkpoint()
+    model.warm_up()
+    spent(f"Model Warm Up {batch}")
+    warm_up_times[batch] = mul_time[-1] - mul_time[0]
+  elif model.batch_size is None or model.batch_size != batch:
     model.shutdown()
     model.batch_size = batch
     checkpoint()
@@ -136,11 +244,19 @@ for batch in batches:
 
   model.reset_inference_run()
   model.prepare()
+  open_input_dataset()
+  if zero_copy_inference:
+    try:
+      zero_copy.enable(model)
+    except Exception as e:
+      print(f'{{ "Error": "Failed to bind zero-copy buffers {e}" }},')
   checkpoint()
   while model.next_inference_run():
     model.inference()
-    checkpoint(False)
-  spent(f"Total Inference {batch}")
+    checkpoint(False, model.input_feed_time)
+  spent(f"Total Inference {batch}", model.input_feed_time)
+  if zero_copy_inference:
+    zero_copy.disable(model)
 
   inference_times[batch] = []
   for item in range(1, len(mul_time) - 1):
@@ -155,6 +271,10 @@ for batch in batches:
     min_time = min(spent_time, min_time)
   avg_time = (mul_time[-1] - mul_time[0]) / (len(mul_time) - 1)
 
+  if subtract_overhead:
+    inference_times[batch] = calibration.subtract_overhead(inference_times[batch], harness_overhead)
+    min_time, max_time, avg_time = calibration.subtract_overhead([min_time, max_time, avg_time], harness_overhead)
+
   print('{ "Inference Times": [')
   for item in inference_times[batch][:-1]:
     print(f'{{ "Time" : "{item}" }},')
@@ -169,16 +289,223 @@ for batch in batches:
   print(f'"Average" : "{avg_time}"')
   print('},')
 
+  if '--op-profile' in sys.argv:
+    try:
+      op_profiles[batch] = op_profile.profile_model(model, op_profile_runs)
+      for row in op_profiles[batch][1][:5]:
+        print(f'{{ "Hotspot": "{row["node_name"]}", "Op Type": "{row["op_type"]}", "Share": {row["share"]} }},')
+    except Exception as e:
+      print(f'{{ "Error": "Failed to profile operators {e}" }},')
+
+  if '--breakdown' in sys.argv:
+    try:
+      import inference_breakdown
+      breakdowns[batch] = inference_breakdown.measure(model, model.total_inference_runs)
+      medians = ', '.join([f'"{phase}": {sorted(values)[len(values) // 2]}' for phase, values in breakdowns[batch][1].items()])
+      print(f'{{ "Breakdown {batch}": {{ {medians} }} }},')
+    except Exception as e:
+      print(f'{{ "Error": "Failed to measure inference breakdown {e}" }},')
+
+  if '--ort-opt-levels' in sys.argv:
+    try:
+      import ort_optimization
+      graph_optimizations[batch] = ort_optimization.compare(model, model.total_inference_runs)
+      for title, read_stats, inference_stats in graph_optimizations[batch]:
+        print(f'{{ "Graph Optimization": "{title}", "Session Creation": {read_stats["Median"]}, "Inference": {inference_stats["Median"]} }},')
+    except Exception as e:
+      print(f'{{ "Error": "Failed to compare graph optimization levels {e}" }},')
+
+  if '--preprocess' in sys.argv:
+    try:
+      import preprocess
+      preprocess_workers = int(sys.argv[sys.argv.index('--preprocess-workers') + 1]) if '--preprocess-workers' in sys.argv else None
+      corpus_size = int(sys.argv[sys.argv.index('--corpus-size') + 1]) if '--corpus-size' in sys.argv else preprocess.DEFAULT_CORPUS_SIZE
+      preprocessing[batch] = preprocess.benchmark(model, workers=preprocess_workers, corpus_size=corpus_size)
+      print(f'{{ "Preprocessing FPS": {preprocessing[batch]["Preprocessing FPS"]}, "Inference FPS": {preprocessing[batch]["Inference FPS"]}, "End-to-End FPS": {preprocessing[batch]["End-to-End FPS"]} }},')
+    except Exception as e:
+      print(f'{{ "Error": "Failed to benchmark preprocessing {e}" }},')
+
+  if '--postprocess' in sys.argv:
+    try:
+      import postprocess
+      postprocessing[batch] = postprocess.benchmark(model)
+      print(f'{{ "NumPy Postprocess": {postprocessing[batch]["NumPy Postprocess"]["Median"]}, "Raw Output": {postprocessing[batch]["Raw Output (bytes)"]}, "In-Graph NMS Output": {postprocessing[batch].get("In-Graph NMS Output (bytes)", "null")} }},')
+    except Exception as e:
+      print(f'{{ "Error": "Failed to benchmark postprocessing {e}" }},')
+
+  if '--pipeline' in sys.argv:
+    try:
+      import pipeline
+      import preprocess
+      preprocess_workers = int(sys.argv[sys.argv.index('--preprocess-workers') + 1]) if '--preprocess-workers' in sys.argv else None
+      corpus_size = int(sys.argv[sys.argv.index('--corpus-size') + 1]) if '--corpus-size' in sys.argv else preprocess.DEFAULT_CORPUS_SIZE
+      pipeline_depth = int(sys.argv[sys.argv.index('--pipeline-depth') + 1]) if '--pipeline-depth' in sys.argv else pipeline.DEFAULT_DEPTH
+      pipelines[batch] = pipeline.benchmark(model, depth=pipeline_depth, workers=preprocess_workers, corpus_size=corpus_size)
+      print(f'{{ "Serial FPS": {pipelines[batch]["Serial"]["Throughput (FPS)"]}, "Pipelined FPS": {pipelines[batch]["Pipelined"]["Throughput (FPS)"]} }},')
+    except Exception as e:
+      print(f'{{ "Error": "Failed to benchmark pipeline {e}" }},')
+
+  if '--zero-copy-compare' in sys.argv:
+    try:
+      zero_copy_comparisons[batch] = zero_copy.compare(model)
+      for path, result in zero_copy_comparisons[batch].items():
+        print(f'{{ "Path": "{path}", "Median": {result["Time"]["Median"]}, "Allocated per Iteration": {result["Allocated per Iteration (bytes)"]}, "GC Collections per Iteration": {result["GC Collections per Iteration"]} }},')
+    except Exception as e:
+      print(f'{{ "Error": "Failed to compare zero-copy inference {e}" }},')
+
+  if '--torch-tuning' in sys.argv:
+    try:
+      import torch_tuning
+      torch_tunings[batch] = torch_tuning.compare(model, threads=torch_settings.get('threads'))
+      for title, stats in torch_tunings[batch]:
+        print(f'{{ "Torch Setting": "{title}", "Median": {stats["Median"]} }},')
+    except Exception as e:
+      print(f'{{ "Error": "Failed to compare torch settings {e}" }},')
+
+  if '--torch-modes' in sys.argv:
+    try:
+      import torch_modes
+      torch_modes_comparisons[batch] = torch_modes.compare(model)
+      for mode, stats in torch_modes_comparisons[batch].items():
+        print(f'{{ "Torch Mode": "{torch_modes.MODES[mode]}", "Median": {stats["Median"]} }},')
+    except Exception as e:
+      print(f'{{ "Error": "Failed to compare torch modes {e}" }},')
+
+  if '--torch-precision' in sys.argv:
+    try:
+      import torch_precision
+      torch_precisions[batch] = torch_precision.compare(model)
+      for title, result in torch_precisions[batch].items():
+        print(f'{{ "Precision": "{title}", "Median": {result["Time"]["Median"]}, "Relative Deviation": {result["Relative Deviation"]}, "Detection Agreement": {result["Detection Agreement"]} }},')
+    except Exception as e:
+      print(f'{{ "Error": "Failed to compare torch precisions {e}" }},')
+
+  if '--quantization-compare' in sys.argv:
+    try:
+      import quantization
+      quantizations[batch] = quantization.compare(model)
+      int8 = quantizations[batch]['INT8']
+      print(f'{{ "FP32 Median": {quantizations[batch]["FP32"]["Time"]["Median"]}, "INT8 Median": {int8["Time"]["Median"]}, "Relative Deviation": {int8["Relative Deviation"]}, "Detection Agreement": {int8["Detection Agreement"]} }},')
+    except Exception as e:
+      print(f'{{ "Error": "Failed to compare quantized model {e}" }},')
+
+  if '--ov-async' in sys.argv:
+    try:
+      import ov_async
+      ov_async_duration = float(sys.argv[sys.argv.index('--ov-async-duration') + 1]) if '--ov-async-duration' in sys.argv else ov_async.DEFAULT_DURATION
+      ov_async_requests = int(sys.argv[sys.argv.index('--ov-async-requests') + 1]) if '--ov-async-requests' in sys.argv else None
+      ov_async_benchmarks[batch] = ov_async.benchmark(model, ov_async_duration, ov_async_requests)
+      print(f'{{ "Async Infer Requests": {ov_async_benchmarks[batch]["Infer Requests"]}, "Async FPS": {ov_async_benchmarks[batch]["Throughput (FPS)"]}, "Sync FPS": {ov_async_benchmarks[batch]["Sync Throughput (FPS)"]}, "Request Latency": {ov_async_benchmarks[batch]["Request Latency"]["Median"]} }},')
+    except Exception as e:
+      print(f'{{ "Error": "Failed to benchmark OpenVINO async mode {e}" }},')
+
+  if '--ipc' in sys.argv:
+    try:
+      import shm_ring
+      ipc_benchmarks[batch] = shm_ring.run_benchmark(batch)
+      print(f'{{ "Shared Memory FPS": {ipc_benchmarks[batch]["Shared Memory"]["Throughput (FPS)"]}, "Queue FPS": {ipc_benchmarks[batch]["Queue"]["Throughput (FPS)"]} }},')
+    except Exception as e:
+      print(f'{{ "Error": "Failed to benchmark IPC {e}" }},')
+
+if dynamic_batch_compare and model.dynamic_batch:
+  # Static sweep for comparison: one export, session and compilation per batch size
+  static_times = {}
+  static_warm_up_times = {}
+  model.dynamic_batch = False
+  for batch in batches:
+    print(f"{{ \"Running Static Batch\": {batch} }},")
+    model.prepare_batch(batch)
+    model.shutdown()
+    model.batch_size = batch
+    checkpoint()
+    model.read()
+    model.warm_up()
+    spent(f"Static Model Warm Up {batch}")
+    static_warm_up_times[batch] = mul_time[-1] - mul_time[0]
+    model.reset_inference_run()
+    model.prepare()
+    open_input_dataset()
+    checkpoint()
+    while model.next_inference_run():
+      model.inference()
+      checkpoint(False, model.input_feed_time)
+    spent(f"Total Static Inference {batch}", model.input_feed_time)
+    static_times[batch] = [mul_time[item] - mul_time[item - 1] for item in range(1, len(mul_time) - 1)]
+    if subtract_overhead:
+      static_times[batch] = calibration.subtract_overhead(static_times[batch], harness_overhead)
+  model.dynamic_batch = True
+  import reports
+  report_sheets["Dynamic Batch"] = reports.comparison_rows(batches, "Static", static_times, static_warm_up_times, "Dynamic", inference_times, warm_up_times)
+
+if artifact_cache is not None:
+  try:
+    report_sheets["Artifact Cache"] = artifact_cache.report_rows(first_read_time, read_times[-1]["Average"])
+  except Exception as e:
+    print(f'{{ "Error": "Failed to update artifact cache {e}" }},')
+
+if preprocessing:
+  import preprocess
+  report_sheets["Preprocessing"] = preprocess.benchmark_rows(preprocessing)
+
+if postprocessing:
+  import postprocess
+  report_sheets["Postprocessing"] = postprocess.benchmark_rows(postprocessing)
+
+if pipelines:
+  import pipeline
+  report_sheets["Pipeline"] = pipeline.benchmark_rows(pipelines)
+
+if zero_copy_comparisons:
+  report_sheets["Zero Copy"] = zero_copy.comparison_rows(zero_copy_comparisons)
+
+if torch_tunings:
+  import torch_tuning
+  report_sheets["Torch Tuning"] = torch_tuning.comparison_rows(torch_tunings)
+
+if torch_modes_comparisons:
+  import torch_modes
+  report_sheets["Torch Modes"] = torch_modes.comparison_rows(torch_modes_comparisons)
+
+if torch_precisions:
+  import torch_precision
+  report_sheets["Torch Precision"] = torch_precision.comparison_rows(torch_precisions)
+
+if quantizations:
+  import quantization
+  report_sheets["Quantization"] = quantization.comparison_rows(quantizations)
+
+if ov_async_benchmarks:
+  import ov_async
+  report_sheets["OpenVINO Async"] = ov_async.benchmark_rows(ov_async_benchmarks)
+
+if ipc_benchmarks:
+  import shm_ring
+  report_sheets["IPC"] = shm_ring.benchmark_rows(ipc_benchmarks)
+
+if graph_optimizations:
+  import ort_optimization
+  report_sheets["Graph Optimization"] = ort_optimization.comparison_rows(graph_optimizations)
+
+if breakdowns:
+  import inference_breakdown
+  report_sheets["Breakdown"] = inference_breakdown.breakdown_rows(breakdowns)
+if op_profiles:
+  import op_profile
+  report_sheets["Hotspots"] = op_profile.hotspots_rows(op_profiles)
+
 checkpoint()
 model.shutdown()
 spent("Model Shutdown")
 
+if torch_settings:
+  torch_tuning.disable(model)
+
 total_time = perf_counter() - script_run_time
 print(f"{{ \"Total Time\": {total_time} }},")
 
 try:
   import reports
-  reports.performance_report(model, model_name, read_times, inference_times, warm_up_times, batches)
+  report_path = reports.performance_report(model, model_name, read_times, inference_times, warm_up_times, batches, streaming=True if '--stream-report' in sys.argv else None, extra_sheets=report_sheets)
 except Exception as e:
   print(f'{{ "Error": "Failed to generate XLS report {e}" }},')
 
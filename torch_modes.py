@@ -0,0 +1,89 @@
+import sys
+from time import perf_counter
+from reports import summary_statistics
+
+DEFAULT_RUNS = 20
+WARM_UP_RUNS = 3
+
+# Scope of a torch inference call, from the network alone to the whole ultralytics predictor
+MODES = {
+  'raw': 'Raw Forward',
+  'nms': 'Forward + NMS',
+  'predictor': 'Full Predictor',
+}
+
+def mode_from_args(default):
+  if '--torch-mode' in sys.argv:
+    mode = sys.argv[sys.argv.index('--torch-mode') + 1]
+    if mode not in MODES:
+      raise Exception(f'Unknown torch mode {mode}, expected one of {", ".join(MODES)}')
+    return mode
+  return default
+
+def describe(description, mode):
+  return f'{description} ({MODES[mode]})'
+
+def non_max_suppression(predictions):
+  from postprocess import CONF_THRESHOLD, IOU_THRESHOLD, MAX_DETECTIONS
+  try:
+    from ultralytics.utils.nms import non_max_suppression as nms
+  except ImportError:
+    from ultralytics.utils.ops import non_max_suppression as nms
+  # Same thresholds as the harness postprocessing, so results compare with ORT and OpenVINO in-graph NMS
+  return nms(predictions, CONF_THRESHOLD, IOU_THRESHOLD, max_det=MAX_DETECTIONS)
+
+def run(model, mode):
+  """Runs model.model (ultralytics YOLO) on model.input_data in the given scope, caller controls grad mode"""
+  if mode == 'predictor':
+    # Predictor converts inputs to the precision of its backend, half inputs need a half backend
+    return model.model(model.input_data, verbose=False, half=model.input_data.dtype.is_floating_point and model.input_data.element_size() == 2)
+  # Backends running a converted network keep it apart from the ultralytics wrapper
+  network = model.network if getattr(model, 'network', None) is not None else model.model.model
+  predictions = network(model.input_data)
+  if mode == 'nms':
+    return non_max_suppression(predictions)
+  return predictions
+
+def _measure(model, runs):
+  import torch
+  for _ in range(WARM_UP_RUNS):
+    model.inference()
+  times = []
+  for _ in range(runs):
+    start = perf_counter()
+    model.inference()
+    if str(model.device).startswith('cuda'):
+      torch.cuda.synchronize()
+    times.append(perf_counter() - start)
+  return summary_statistics(times)
+
+def compare(model, runs=DEFAULT_RUNS):
+  """Every mode on the prepared input of the current batch size"""
+  if not hasattr(model, 'torch_mode'):
+    raise Exception('Torch mode comparison is supported only for torch backends')
+  # inference() of the backend is measured, so its grad mode and autocast context apply to every mode
+  original = model.torch_mode
+  results = {}
+  try:
+    for mode in MODES:
+      if mode != 'predictor' or model.model is not None:
+        model.torch_mode = mode
+        results[mode] = _measure(model, runs)
+  finally:
+    model.torch_mode = original
+  return results
+
+def comparison_rows(comparisons):
+  """Builds "Torch Modes" sheet rows from {batch: results}, wrapper costs are differences of medians"""
+  sheet = [['Batch', 'Mode', 'Average (s)', 'Median (s)', '99th Percentile (s)', 'Throughput (FPS)', 'Share of Full Predictor']]
+  for batch, results in comparisons.items():
+    predictor = results['predictor']['Median'] if 'predictor' in results else None
+    for mode, stats in results.items():
+      sheet.append([batch, MODES[mode], stats['Average'], stats['Median'], stats['99th Percentile'], batch / stats['Median'] if stats['Median'] else None, stats['Median'] / predictor if predictor else None])
+    nms = results['nms']['Median'] - results['raw']['Median']
+    sheet.append([batch, 'NMS (Forward + NMS - Raw Forward)', None, nms, None, None, nms / predictor if predictor else None])
+    if predictor:
+      wrapper = predictor - results['nms']['Median']
+      sheet.append([batch, 'Ultralytics Wrapper (Full Predictor - Forward + NMS)', None, wrapper, None, None, wrapper / predictor])
+    sheet.append([])
+  return sheet
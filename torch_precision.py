@@ -0,0 +1,156 @@
+import gc
+import os
+import copy
+from time import perf_counter
+import numpy as np
+from runtimes import detect_runtime, torch_module, first_output
+from reports import summary_statistics
+
+DEFAULT_RUNS = 10
+WARM_UP_RUNS = 3
+DEFAULT_CALIBRATION_SIZE = 32
+
+def cpu_capability():
+  import torch
+  try:
+    return torch.backends.cpu.get_cpu_capability()
+  except Exception:
+    return None
+
+def bf16_supported():
+  """Native BF16 kernels (AVX512-BF16 or AMX) are used by oneDNN, otherwise BF16 is emulated"""
+  import torch
+  try:
+    return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+  except Exception:
+    return None
+
+def quantize_dynamic(module):
+  import torch
+  # Only Linear and recurrent layers have dynamic INT8 kernels, convolutions stay FP32
+  return torch.ao.quantization.quantize_dynamic(copy.deepcopy(module).eval(), {torch.nn.Linear}, dtype=torch.qint8)
+
+def _export(module, example):
+  import torch
+  if hasattr(torch.export, 'export_for_training'):
+    return torch.export.export_for_training(module, (example,)).module()
+  return torch.export.export(module, (example,)).module()
+
+def quantize_static(module, calibration):
+  """PT2E post-training static INT8 for x86 (oneDNN) kernels, calibration is a list of same shaped input tensors"""
+  import torch
+  from torch.ao.quantization.quantize_pt2e import prepare_pt2e, convert_pt2e
+  from torch.ao.quantization.quantizer.x86_inductor_quantizer import X86InductorQuantizer, get_default_x86_inductor_quantization_config
+  quantizer = X86InductorQuantizer()
+  quantizer.set_global(get_default_x86_inductor_quantization_config())
+  with torch.no_grad():
+    prepared = prepare_pt2e(_export(copy.deepcopy(module).eval(), calibration[0]), quantizer)
+    for batch in calibration:
+      prepared(batch)
+  return convert_pt2e(prepared)
+
+def compile_quantized(module):
+  """torch.compile of a converted PT2E module with Inductor weight freezing scoped to its calls"""
+  import torch
+  compiled = torch.compile(module)
+
+  class FrozenCompiled(torch.nn.Module):
+    def __init__(self):
+      super().__init__()
+      self.compiled = compiled
+    def forward(self, *args):
+      # Constant folding of the quantized weights lets Inductor lower Q/DQ patterns to INT8 oneDNN kernels.
+      # Compilation happens on the first call (and on recompiles), so the process-wide flag is patched per call
+      with torch._inductor.config.patch(freezing=True):
+        return self.compiled(*args)
+
+  return FrozenCompiled()
+
+def save_quantized(module, example, path):
+  import torch
+  os.makedirs(os.path.dirname(path), exist_ok=True)
+  temp_path = f'{path}.{os.getpid()}.tmp'
+  torch.export.save(torch.export.export(module, (example,)), temp_path)
+  os.replace(temp_path, path)
+
+def load_quantized(path):
+  import torch
+  return torch.export.load(path).module()
+
+def calibration_tensors(batch_size, count=DEFAULT_CALIBRATION_SIZE):
+  import torch
+  import dataset
+  return [torch.from_numpy(batch) for batch in dataset.calibration_batches(batch_size, count)]
+
+def weights_bytes(module):
+  return sum(item.numel() * item.element_size() for item in module.state_dict().values() if hasattr(item, 'element_size'))
+
+def _measure(run, runs):
+  for _ in range(WARM_UP_RUNS):
+    run()
+  times = []
+  for _ in range(runs):
+    start = perf_counter()
+    run()
+    times.append(perf_counter() - start)
+  return summary_statistics(times)
+
+def compare(model, runs=DEFAULT_RUNS, calibration_size=DEFAULT_CALIBRATION_SIZE):
+  """FP32, BF16 autocast, dynamic and static INT8 raw forward of a copy of the network on CPU"""
+  if detect_runtime(model) != 'torch' or torch_module(model) is None:
+    raise Exception('Precision comparison is supported only for FP32 torch backends')
+  if str(model.device) != 'cpu':
+    raise Exception(f'Precision comparison targets CPU execution, model runs on {model.device}')
+  import torch
+  import accuracy
+  from zero_copy import rss
+  module = copy.deepcopy(torch_module(model)).float().eval()
+  if hasattr(module, 'fuse'):
+    module = module.fuse(verbose=False)
+  input_data = model.input_data.detach().float().contiguous()
+  variants = [
+    ('FP32', lambda: module, None),
+    ('BF16 Autocast', lambda: module, torch.bfloat16),
+    ('INT8 Dynamic', lambda: quantize_dynamic(module), None),
+    ('INT8 Static (PT2E + Inductor)', lambda: compile_quantized(quantize_static(module, calibration_tensors(model.batch_size, calibration_size))), None),
+  ]
+  results = {}
+  reference = None
+  for title, create, autocast in variants:
+    try:
+      gc.collect()
+      rss_before = rss()
+      start = perf_counter()
+      network = create()
+      def run():
+        with torch.no_grad(), torch.autocast('cpu', dtype=autocast, enabled=autocast is not None):
+          return network(input_data)
+      output = first_output(run())
+      setup = perf_counter() - start
+      result = {'Time': _measure(run, runs), 'Setup (s)': setup, 'Weights (bytes)': weights_bytes(network)}
+      # Process RSS accumulates earlier variants, growth while creating and running this one is reported
+      rss_after = rss()
+      result['RSS Increase (bytes)'] = rss_after - rss_before if None not in (rss_before, rss_after) else None
+      output = output.astype(np.float32)
+      if reference is None:
+        reference = output
+      result.update(accuracy.compare_outputs(reference, output))
+      results[title] = result
+    except Exception as e:
+      print(f'{{ "Error": "Failed to measure {title} {e}" }},')
+  return results
+
+def comparison_rows(comparisons):
+  """Builds "Torch Precision" sheet rows from {batch: results}, deviations are against FP32"""
+  import torch
+  metrics = ['Setup (s)', 'Weights (bytes)', 'RSS Increase (bytes)', 'Max Abs Deviation', 'Mean Abs Deviation', 'Relative Deviation', 'Reference Detections', 'Detections', 'Detection Agreement']
+  sheet = [['CPU Capability', cpu_capability()], ['Native BF16', bf16_supported()], ['Threads', torch.get_num_threads()], []]
+  sheet.append(['Batch', 'Precision', 'Average (s)', 'Median (s)', '99th Percentile (s)', 'Throughput (FPS)', 'Speedup vs FP32'] + metrics)
+  for batch, results in comparisons.items():
+    baseline = results['FP32']['Time']['Median'] if 'FP32' in results else None
+    for title, result in results.items():
+      stats = result['Time']
+      sheet.append([batch, title, stats['Average'], stats['Median'], stats['99th Percentile'], batch / stats['Median'] if stats['Median'] else None,
+                    baseline / stats['Median'] if baseline and stats['Median'] else None] + [result.get(metric) for metric in metrics])
+    sheet.append([])
+  return sheet
@@ -0,0 +1,188 @@
+import os
+import copy
+from time import perf_counter
+from runtimes import detect_runtime, torch_module
+from reports import summary_statistics
+
+DEFAULT_RUNS = 20
+WARM_UP_RUNS = 3
+
+def physical_cores():
+  try:
+    import psutil
+    cores = psutil.cpu_count(logical=False)
+    if cores:
+      return cores
+  except ImportError:
+    pass
+  return max(1, (os.cpu_count() or 2) // 2)
+
+def settings_from_args(argv):
+  """{setting: value} from --torch-* command line flags"""
+  settings = {}
+  for flag, setting in [('--torch-inference-mode', 'inference_mode'), ('--torch-channels-last', 'channels_last'), ('--torch-fuse', 'fuse'), ('--torch-onednn-graph', 'onednn_graph')]:
+    if flag in argv:
+      settings[setting] = True
+  for flag, setting in [('--torch-threads', 'threads'), ('--torch-interop-threads', 'interop_threads')]:
+    if flag in argv:
+      settings[setting] = int(argv[argv.index(flag) + 1])
+  return settings
+
+def fuse(module):
+  # Ultralytics models fold BatchNorm into Conv weights in place
+  if hasattr(module, 'fuse'):
+    fused = module.fuse(verbose=False)
+    return fused if fused is not None else module
+  return module
+
+def check_output(output):
+  """Raw forward returns tensors, anything else means a wrapper (e.g. ultralytics predictor) was called"""
+  import torch
+  first = output[0] if isinstance(output, (list, tuple)) and output else output
+  if not isinstance(first, torch.Tensor):
+    raise Exception(f'Forward returned {type(first).__name__} instead of a tensor, network module is not unwrapped')
+  return output
+
+def trace(module, input_data):
+  """Frozen TorchScript of the network, oneDNN Graph fuses its partitions on CPU"""
+  import torch
+  torch.jit.enable_onednn_fusion(True)
+  with torch.no_grad():
+    check_output(module(input_data))
+    traced = torch.jit.freeze(torch.jit.trace(module.eval(), input_data, check_trace=False, strict=False))
+    # oneDNN Graph compiles fused partitions during the profiling runs
+    for _ in range(WARM_UP_RUNS):
+      traced(input_data)
+  return traced
+
+_restore = {}
+
+def enable(model, settings):
+  """Applies settings to the model instance: threads immediately, weights after every read(), inputs after every prepare()"""
+  if detect_runtime(model) != 'torch':
+    raise Exception('Torch tuning is supported only for torch backends')
+  import torch
+  # Thread count and oneDNN fusion are process-wide, disable() restores them for later in-process runs
+  _restore.update(threads=torch.get_num_threads(), onednn_graph=torch.jit.onednn_fusion_enabled())
+  if 'threads' in settings:
+    torch.set_num_threads(settings['threads'])
+  if 'interop_threads' in settings:
+    # Allowed only once and before any inter-op parallel work started, so it can not be restored
+    torch.set_num_interop_threads(settings['interop_threads'])
+  channels_last = settings.get('channels_last', False)
+  if settings.get('onednn_graph') and str(model.device) != 'cpu':
+    raise Exception('oneDNN Graph fusion is available only on CPU')
+  read, prepare, inference = model.read, model.prepare, model.inference
+  state = {}
+
+  def tuned_read():
+    read()
+    module = torch_module(model)
+    if module is None:
+      return
+    if settings.get('fuse'):
+      fuse(module)
+    if channels_last:
+      module.to(memory_format=torch.channels_last)
+    state.clear()
+
+  def tuned_prepare():
+    prepare()
+    if channels_last and model.input_data.dim() == 4:
+      model.input_data = model.input_data.contiguous(memory_format=torch.channels_last)
+    if settings.get('onednn_graph') and state.get('shape') != tuple(model.input_data.shape):
+      # Traced graph is specialized to the input shape, warm up and measured loop share it
+      state['traced'], state['shape'] = trace(torch_module(model), model.input_data), tuple(model.input_data.shape)
+
+  def tuned_inference():
+    if channels_last and model.input_data.dim() == 4 and not model.input_data.is_contiguous(memory_format=torch.channels_last):
+      # Inputs replaced by the rotating dataset come in contiguous format
+      model.input_data = model.input_data.contiguous(memory_format=torch.channels_last)
+    if 'traced' in state:
+      # Scripted network replaces the ultralytics wrapper, only raw forward is measured
+      with torch.no_grad():
+        return state['traced'](model.input_data)
+    if settings.get('inference_mode'):
+      with torch.inference_mode():
+        return inference()
+    return inference()
+
+  model.read, model.prepare, model.inference = tuned_read, tuned_prepare, tuned_inference
+
+def disable(model):
+  for name in ('read', 'prepare', 'inference'):
+    model.__dict__.pop(name, None)
+  if _restore:
+    import torch
+    torch.set_num_threads(_restore['threads'])
+    torch.jit.enable_onednn_fusion(_restore['onednn_graph'])
+    _restore.clear()
+
+def _measure(run, runs):
+  for _ in range(WARM_UP_RUNS):
+    run()
+  times = []
+  for _ in range(runs):
+    start = perf_counter()
+    run()
+    times.append(perf_counter() - start)
+  return summary_statistics(times)
+
+def compare(model, runs=DEFAULT_RUNS, threads=None):
+  """Raw forward of a copy of the network with every setting added on top of the previous ones"""
+  if detect_runtime(model) != 'torch':
+    raise Exception('Torch tuning comparison is supported only for torch backends')
+  if str(model.device) != 'cpu':
+    raise Exception(f'Torch tuning comparison targets CPU execution, model runs on {model.device}')
+  import torch
+  source = torch_module(model)
+  if source is None:
+    raise Exception('Torch network module is not found')
+  # Fusing and layout changes are irreversible, the measured model keeps its weights
+  module = copy.deepcopy(source).eval()
+  input_data = model.input_data.detach().clone().contiguous()
+  with torch.no_grad():
+    check_output(module(input_data))
+  threads = threads or physical_cores()
+  original_threads = torch.get_num_threads()
+  original_fusion = torch.jit.onednn_fusion_enabled()
+  results = []
+  try:
+    with torch.no_grad():
+      results.append(('No Grad (baseline)', _measure(lambda: module(input_data), runs)))
+    def forward():
+      with torch.inference_mode():
+        return module(input_data)
+    results.append(('+ Inference Mode', _measure(forward, runs)))
+    module.to(memory_format=torch.channels_last)
+    input_data = input_data.contiguous(memory_format=torch.channels_last)
+    results.append(('+ Channels Last', _measure(forward, runs)))
+    module = fuse(module)
+    results.append(('+ Fused Conv+BN', _measure(forward, runs)))
+    torch.set_num_threads(threads)
+    results.append((f'+ {threads} Threads (default {original_threads})', _measure(forward, runs)))
+    try:
+      traced = trace(module, input_data)
+      with torch.no_grad():
+        results.append(('+ oneDNN Graph (frozen TorchScript)', _measure(lambda: traced(input_data), runs)))
+    except Exception as e:
+      print(f'{{ "Error": "Failed to trace model for oneDNN Graph {e}" }},')
+    finally:
+      torch.jit.enable_onednn_fusion(original_fusion)
+  finally:
+    torch.set_num_threads(original_threads)
+  return results
+
+def comparison_rows(comparisons):
+  """Builds "Torch Tuning" sheet rows from {batch: results}, settings are cumulative"""
+  sheet = [['Batch', 'Setting', 'Average (s)', 'Median (s)', '99th Percentile (s)', 'Throughput (FPS)', 'Gain vs Previous (%)', 'Gain vs Baseline (%)']]
+  for batch, results in comparisons.items():
+    baseline = results[0][1]['Median']
+    previous = baseline
+    for title, stats in results:
+      median = stats['Median']
+      sheet.append([batch, title, stats['Average'], median, stats['99th Percentile'], batch / median if median else None,
+                    100 * (previous - median) / previous, 100 * (baseline - median) / baseline])
+      previous = median
+    sheet.append([])
+  return sheet
@@ -0,0 +1,149 @@
+import os
+import numpy as np
+
+# Inputs which stay float32 in float16 models, by ONNX type constraints (None means every input)
+FLOAT32_INPUTS = {
+  'Resize': [2],
+  'Range': None,
+}
+
+def _dims(value_info):
+  return value_info.type.tensor_type.shape.dim
+
+def fix_input_shapes(model, shapes):
+  """Replaces symbolic input dimensions by the given shapes and re-infers shapes of the graph"""
+  import onnx
+  for value in model.graph.input:
+    if value.name not in shapes:
+      continue
+    dims = _dims(value)
+    if len(dims) != len(shapes[value.name]):
+      raise Exception(f'Input {value.name} has rank {len(dims)}, shape {shapes[value.name]} given')
+    for dim, size in zip(dims, shapes[value.name]):
+      dim.Clear()
+      # Names keep a dimension symbolic, e.g. ['batch', 3, 640, 640]
+      if isinstance(size, str):
+        dim.dim_param = size
+      else:
+        dim.dim_value = size
+  # Stale intermediate shapes would mix symbolic and static sizes, inference rebuilds them
+  del model.graph.value_info[:]
+  inferred = onnx.shape_inference.infer_shapes(model)
+  inferred_outputs = {value.name: value for value in inferred.graph.output}
+  for value in model.graph.output:
+    source = inferred_outputs.get(value.name)
+    if source is not None and len(_dims(source)) == len(_dims(value)):
+      for dim, inferred_dim in zip(_dims(value), _dims(source)):
+        if inferred_dim.HasField('dim_value'):
+          dim.Clear()
+          dim.dim_value = inferred_dim.dim_value
+  model.graph.value_info.extend(inferred.graph.value_info)
+  return model
+
+def _to_float16(tensor):
+  from onnx import numpy_helper
+  value = numpy_helper.to_array(tensor)
+  # Values outside of float16 range saturate instead of becoming inf
+  converted = np.clip(value, np.finfo(np.float16).min, np.finfo(np.float16).max).astype(np.float16)
+  tensor.CopyFrom(numpy_helper.from_array(converted, tensor.name))
+
+def convert_float16(model, keep_io_types=True):
+  """Converts float32 weights, constants and casts to float16, graph inputs and outputs stay float32 when keep_io_types"""
+  from onnx import helper, TensorProto
+  graph = model.graph
+  for tensor in graph.initializer:
+    if tensor.data_type == TensorProto.FLOAT:
+      _to_float16(tensor)
+  nodes = []
+  renames = {}
+  if keep_io_types:
+    for value in graph.input:
+      if value.type.tensor_type.elem_type == TensorProto.FLOAT:
+        renames[value.name] = f'{value.name}_fp16'
+        nodes.append(helper.make_node('Cast', [value.name], [renames[value.name]], name=f'{value.name}_cast_fp16', to=TensorProto.FLOAT16))
+  else:
+    for value in graph.input:
+      if value.type.tensor_type.elem_type == TensorProto.FLOAT:
+        value.type.tensor_type.elem_type = TensorProto.FLOAT16
+
+  outputs = {value.name for value in graph.output if value.type.tensor_type.elem_type == TensorProto.FLOAT}
+  for node in graph.node:
+    node.input[:] = [renames.get(name, name) for name in node.input]
+    for attribute in node.attribute:
+      if node.op_type == 'Cast' and attribute.name == 'to' and attribute.i == TensorProto.FLOAT:
+        attribute.i = TensorProto.FLOAT16
+      elif attribute.type == attribute.TENSOR and attribute.t.data_type == TensorProto.FLOAT:
+        _to_float16(attribute.t)
+    if node.op_type in FLOAT32_INPUTS:
+      indices = FLOAT32_INPUTS[node.op_type]
+      for idx, name in enumerate(node.input):
+        if name and (indices is None or idx in indices):
+          cast = f'{node.name or node.output[0]}_input{idx}_fp32'
+          nodes.append(helper.make_node('Cast', [name], [cast], name=cast, to=TensorProto.FLOAT))
+          node.input[idx] = cast
+      if indices is None:
+        # Float32 only operators produce float32, outputs go back to float16
+        for idx, name in enumerate(node.output):
+          node.output[idx] = f'{name}_fp32'
+          nodes.append(node)
+          nodes.append(helper.make_node('Cast', [node.output[idx]], [name], name=f'{name}_cast_fp16', to=TensorProto.FLOAT16))
+          node = None
+          break
+        if node is None:
+          continue
+    if keep_io_types:
+      for idx, name in enumerate(node.output):
+        if name in outputs:
+          node.output[idx] = f'{name}_fp16'
+          nodes.append(node)
+          nodes.append(helper.make_node('Cast', [node.output[idx]], [name], name=f'{name}_cast_fp32', to=TensorProto.FLOAT))
+          node = None
+          break
+      if node is None:
+        continue
+    nodes.append(node)
+  # Cast nodes are inserted in front of their consumers, topological order is kept by sorting
+  del graph.node[:]
+  graph.node.extend(_topological_order(nodes, [value.name for value in graph.input] + [tensor.name for tensor in graph.initializer]))
+  if not keep_io_types:
+    for value in graph.output:
+      if value.type.tensor_type.elem_type == TensorProto.FLOAT:
+        value.type.tensor_type.elem_type = TensorProto.FLOAT16
+  for value in graph.value_info:
+    if value.type.tensor_type.elem_type == TensorProto.FLOAT:
+      value.type.tensor_type.elem_type = TensorProto.FLOAT16
+  return model
+
+def _topological_order(nodes, available):
+  available = set(available) | {''}
+  ordered, pending = [], list(nodes)
+  while pending:
+    remaining = []
+    for node in pending:
+      if all(name in available for name in node.input):
+        ordered.append(node)
+        available.update(node.output)
+      else:
+        remaining.append(node)
+    if len(remaining) == len(pending):
+      # Inputs from outer scopes (subgraphs), original order is kept for the rest
+      ordered.extend(remaining)
+      break
+    pending = remaining
+  return ordered
+
+def derive(source_path, target_path, input_shapes=None, half_precision=False):
+  """Writes a variant of an exported float32 model: static input shapes and/or float16 weights with float32 IO"""
+  import onnx
+  model = onnx.load(source_path)
+  if input_shapes:
+    fix_input_shapes(model, input_shapes)
+  if half_precision:
+    convert_float16(model)
+    # Intermediate types changed, shapes and types are inferred again by the runtime
+    del model.graph.value_info[:]
+  onnx.checker.check_model(model)
+  temp_path = f'{target_path}.{os.getpid()}.tmp'
+  onnx.save(model, temp_path)
+  os.replace(temp_path, target_path)
+  return target_path
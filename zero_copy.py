@@ -0,0 +1,160 @@
+import gc
+import os
+import tracemalloc
+from time import perf_counter
+import numpy as np
+from runtimes import detect_runtime
+from reports import summary_statistics
+
+DEFAULT_RUNS = 100
+
+def rss():
+  try:
+    import psutil
+    return psutil.Process().memory_info().rss
+  except ImportError:
+    pass
+  try:
+    with open('/proc/self/statm', 'r') as f:
+      return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+  except Exception:
+    return None
+
+def _minor_faults():
+  try:
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_minflt
+  except ImportError:
+    return None
+
+def _bind_ort(model):
+  import onnxruntime as ort
+  from inference_breakdown import ort_device
+  sess = model.sess
+  device = ort_device(sess)
+  # Shapes and types of outputs are taken from one regular run
+  outputs = sess.run([], input_feed=model.input_data)
+  binding = sess.io_binding()
+  for name, array in model.input_data.items():
+    binding.bind_ortvalue_input(name, ort.OrtValue.ortvalue_from_numpy(np.ascontiguousarray(array), device, 0))
+  buffers = []
+  for item, output in zip(sess.get_outputs(), outputs):
+    if device == 'cpu':
+      # Output OrtValue wraps the numpy buffer, results land in it without a copy
+      buffer = np.empty_like(output)
+      binding.bind_ortvalue_output(item.name, ort.OrtValue.ortvalue_from_numpy(buffer))
+    else:
+      buffer = ort.OrtValue.ortvalue_from_shape_and_type(output.shape, output.dtype, device, 0)
+      binding.bind_ortvalue_output(item.name, buffer)
+    buffers.append(buffer)
+  def run():
+    sess.run_with_iobinding(binding)
+    return buffers
+  return run
+
+def _bind_ov(model):
+  import openvino as ov
+  request = model.compiled_model.create_infer_request()
+  for name, array in model.input_data.items():
+    request.set_tensor(name, ov.Tensor(np.ascontiguousarray(array), shared_memory=True))
+  request.infer()
+  buffers = []
+  for idx in range(len(model.compiled_model.outputs)):
+    tensor = request.get_output_tensor(idx)
+    if model.compiled_model.outputs[idx].get_partial_shape().is_static:
+      buffer = np.empty_like(tensor.data)
+      request.set_output_tensor(idx, ov.Tensor(buffer, shared_memory=True))
+    else:
+      # Dynamic outputs are reallocated by the plugin, they are returned as views
+      buffer = tensor.data
+    buffers.append(buffer)
+  def run():
+    request.infer()
+    return buffers
+  return run
+
+def bind(model):
+  """Returns a callable running inference on buffers bound once to the current input_data"""
+  runtime = detect_runtime(model)
+  if runtime == 'ort':
+    return _bind_ort(model)
+  if runtime == 'ov':
+    return _bind_ov(model)
+  raise Exception(f'Zero-copy inference is not supported for runtime {runtime}')
+
+def enable(model):
+  """Replaces inference() of the model instance with the bound path, input_data must be prepared already"""
+  if getattr(model, 'input_dataset', None) is not None:
+    raise Exception('Zero-copy buffers are bound once, rotating input dataset replaces inputs every run')
+  model.inference = bind(model)
+
+def disable(model):
+  model.__dict__.pop('inference', None)
+
+def _measure(run, runs):
+  collections = [0]
+  def on_gc(phase, info):
+    if phase == 'start':
+      collections[0] += 1
+  times, rss_samples = [], []
+  faults = _minor_faults()
+  gc.callbacks.append(on_gc)
+  try:
+    for _ in range(runs):
+      start = perf_counter()
+      run()
+      times.append(perf_counter() - start)
+      rss_samples.append(rss())
+  finally:
+    gc.callbacks.remove(on_gc)
+  end_faults = _minor_faults()
+
+  # Allocation tracing slows down every allocation, so it has its own pass
+  tracemalloc.start()
+  try:
+    allocated = []
+    for _ in range(min(runs, 20)):
+      tracemalloc.reset_peak()
+      before = tracemalloc.get_traced_memory()[0]
+      run()
+      allocated.append(tracemalloc.get_traced_memory()[1] - before)
+  finally:
+    tracemalloc.stop()
+
+  rss_deltas = [abs(rss_samples[idx] - rss_samples[idx - 1]) for idx in range(1, len(rss_samples))] if None not in rss_samples else []
+  return {
+    'Time': summary_statistics(times),
+    'Allocated per Iteration (bytes)': float(np.median(allocated)),
+    'GC Collections per Iteration': collections[0] / runs,
+    'Minor Page Faults per Iteration': (end_faults - faults) / runs if faults is not None else None,
+    'RSS Churn per Iteration (bytes)': float(np.mean(rss_deltas)) if rss_deltas else None,
+    'RSS Range (bytes)': max(rss_samples) - min(rss_samples) if None not in rss_samples else None,
+  }
+
+def compare(model, runs=DEFAULT_RUNS):
+  """Regular inference() against the zero-copy bound path for the current batch size"""
+  model.prepare()
+  outputs = model.inference()
+  results = {'Regular': _measure(model.inference, runs)}
+  # Native allocations of the runtime are not visible to tracemalloc, every regular call returns new output arrays
+  if hasattr(outputs, 'to_tuple'):
+    outputs = outputs.to_tuple()
+  results['Regular']['Output Allocations per Iteration (bytes)'] = sum(np.asarray(item).nbytes for item in outputs)
+  run = bind(model)
+  run()
+  results['Zero-Copy'] = _measure(run, runs)
+  results['Zero-Copy']['Output Allocations per Iteration (bytes)'] = 0
+  return results
+
+def comparison_rows(comparisons):
+  """Builds "Zero Copy" sheet rows from {batch: results}"""
+  metrics = ['Output Allocations per Iteration (bytes)', 'Allocated per Iteration (bytes)', 'GC Collections per Iteration', 'Minor Page Faults per Iteration', 'RSS Churn per Iteration (bytes)', 'RSS Range (bytes)']
+  sheet = [['Batch', 'Path', 'Average (s)', 'Median (s)', '99th Percentile (s)'] + metrics + ['Median vs Regular (%)']]
+  for batch, results in comparisons.items():
+    baseline = results['Regular']['Time']['Median']
+    for path, result in results.items():
+      stats = result['Time']
+      sheet.append([batch, path, stats['Average'], stats['Median'], stats['99th Percentile']] + [result[metric] for metric in metrics] +
+                   [100 * (stats['Median'] - baseline) / baseline])
+    sheet.append([])
+  return sheet